@@ -2,16 +2,639 @@
 # Copyright (c) 2025 x-so
 # Licensed under the MIT License (see LICENSE for details)
 
+import time
+STARTED = time.perf_counter()
+
+import sys
+
+# Command-line use (python UpKeep.py run ...) goes straight to the headless engine without loading Tk
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] != "--profile-startup":
+    from upkeep_engine.cli import main as cli_main
+    sys.exit(cli_main(sys.argv[1:]))
+
 import tkinter as tk
 from tkinter import ttk, filedialog
-import subprocess
+from tkinter import font as tkfont
 import threading
 import os
 import json
+import queue
+import asyncio
+import re
+from bisect import bisect_left
+
+from upkeep_engine import (InterpreterRegistry, ReportStore, ScriptCatalog, ScriptScheduler, diff_reports, format_diff,
+                           load_collectors, run_diagnostics, run_job)
+from upkeep_engine import SettingsStore
+from upkeep_engine.batchlex import TAGS, lex_line
+from upkeep_engine.interpreters import BATCH_EXTENSIONS
+from upkeep_engine.fuzzy import fuzzy_filter
+from upkeep_engine.history import HISTORY_NAME, OUTPUT_TAIL_BYTES, OutputCapture, RunHistory, file_hash, run_record
+from upkeep_engine.lineindex import LineIndex
+from upkeep_engine.outputstore import OutputStore
+from upkeep_engine.remote import fan_out, host_failed
+from upkeep_engine.resultcache import ResultCache
+from upkeep_engine.pipelines import format_step, load_pipelines, pipeline_succeeded, run_pipeline
+from upkeep_engine.procstat import ProcessSampler, format_bytes, format_sample
+from upkeep_engine.profiling import StartupProfiler
+from upkeep_engine.schedules import MaintenanceScheduler, load_schedules
+from upkeep_engine.tempclean import TempCleaner, format_progress, format_result, largest_directories
+from upkeep_engine.updater import UpdateError, Updater
+
+class LargeFileViewer:
+    # Read-only window over a memory-mapped file. Only the lines that fit in the
+    # window are ever inserted into the Text widget.
+    max_line_chars = 2000
+
+    def __init__(self, app, path, sections=None):
+        self.app = app
+        self.index = LineIndex(path)
+        self.sections = sections or {}
+        self.top_line = 0
+        self.match_line = None
+        self.search_result = None
+        theme = app.themes[app.current_theme]
+
+        self.window = tk.Toplevel(app.root)
+        self.window.geometry("900x600")
+        self.window.overrideredirect(True)
+        self.window.configure(bg=theme["bg"])
+
+        title_bar = tk.Frame(self.window, bg=theme["title_bg"], height=30)
+        title_bar.pack(fill="x")
+        tk.Label(title_bar, text=os.path.basename(path), fg=theme["title_fg"],
+                bg=theme["title_bg"], font=("Arial", 12)).pack(side="left", padx=10)
+        tk.Button(title_bar, text="✕", command=self.close,
+                 bg=theme["title_bg"], fg=theme["title_fg"],
+                 bd=0, font=("Arial", 12), activebackground="#ff4444").pack(side="right", padx=5)
+        title_bar.bind("<Button-1>", lambda e: app.start_drag(e, self.window))
+        title_bar.bind("<B1-Motion>", lambda e: app.do_drag(e, self.window))
+
+        toolbar = ttk.Frame(self.window, padding=5)
+        toolbar.pack(fill="x")
+        ttk.Label(toolbar, text="Line:").pack(side="left")
+        self.line_entry = ttk.Entry(toolbar, width=10)
+        self.line_entry.pack(side="left", padx=(2, 5))
+        self.line_entry.bind("<Return>", lambda e: self.jump_to_line())
+        ttk.Label(toolbar, text="Find:").pack(side="left")
+        self.find_entry = ttk.Entry(toolbar, width=30)
+        self.find_entry.pack(side="left", padx=(2, 5))
+        self.find_entry.bind("<Return>", lambda e: self.find(backwards=False))
+        ttk.Button(toolbar, text="Next", command=lambda: self.find(backwards=False)).pack(side="left")
+        ttk.Button(toolbar, text="Previous", command=lambda: self.find(backwards=True)).pack(side="left", padx=5)
+        if self.sections:
+            self.section_var = tk.StringVar(value="Jump to section")
+            ttk.OptionMenu(toolbar, self.section_var, self.section_var.get(), *self.sections,
+                           command=self.jump_to_section).pack(side="left", padx=5)
+
+        self.status_label = ttk.Label(self.window, padding=(5, 0))
+        self.status_label.pack(side="bottom", fill="x")
+
+        body = ttk.Frame(self.window, padding=5)
+        body.pack(fill="both", expand=True)
+        self.scrollbar = ttk.Scrollbar(body, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.text = tk.Text(body, bg=theme["text_bg"], fg=theme["text_fg"], font=("Consolas", 9),
+                            wrap="none", state="disabled")
+        self.text.pack(side="left", fill="both", expand=True)
+        self.text.tag_configure("match", background="#d7ba7d", foreground="black")
+        self.line_height = max(tkfont.Font(font=self.text["font"]).metrics("linespace"), 1)
+
+        self.text.bind("<Configure>", lambda e: self.render())
+        self.text.bind("<MouseWheel>", lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.text.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.text.bind("<Button-5>", lambda e: self.scroll(3))
+        for widget in (self.text, self.window):
+            widget.bind("<Up>", lambda e: self.scroll(-1))
+            widget.bind("<Down>", lambda e: self.scroll(1))
+            widget.bind("<Prior>", lambda e: self.scroll(-self.visible_rows()))
+            widget.bind("<Next>", lambda e: self.scroll(self.visible_rows()))
+            widget.bind("<Control-Home>", lambda e: self.show_line(0))
+            widget.bind("<Control-End>", lambda e: self.show_line(self.index.line_count()))
+
+        self.index.build_in_background()
+        self.poll_index()
+
+    def visible_rows(self):
+        return max(self.text.winfo_height() // self.line_height, 1)
+
+    def poll_index(self):
+        if not self.window.winfo_exists():
+            return
+        self.render()
+        if not self.index.complete:
+            self.window.after(200, self.poll_index)
+
+    def render(self):
+        total = self.index.line_count()
+        rows = self.visible_rows()
+        self.top_line = max(min(self.top_line, total - rows), 0)
+        lines = self.index.lines(self.top_line, rows, self.max_line_chars)
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("end", "\n".join(lines))
+        if self.match_line is not None and self.top_line <= self.match_line < self.top_line + rows:
+            row = self.match_line - self.top_line + 1
+            needle = self.find_entry.get()
+            start = self.text.search(needle, f"{row}.0", f"{row}.end", nocase=True)
+            if start:
+                self.text.tag_add("match", start, f"{start}+{len(needle)}c")
+        self.text.configure(state="disabled")
+        if total:
+            self.scrollbar.set(self.top_line / total, min((self.top_line + rows) / total, 1.0))
+        else:
+            self.scrollbar.set(0, 1)
+        progress = "" if self.index.complete else f" (indexing {self.index.scanned * 100 // max(self.index.size, 1)}%)"
+        self.status_label.configure(
+            text=f"Lines {self.top_line + 1}-{min(self.top_line + rows, total)} of {total}{progress}")
+
+    def scroll(self, delta):
+        self.show_line(self.top_line + delta)
+        return "break"
+
+    def show_line(self, line):
+        self.top_line = max(line, 0)
+        self.render()
+        return "break"
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.show_line(int(float(value) * self.index.line_count()))
+        elif action == "scroll":
+            step = self.visible_rows() if unit == "pages" else 1
+            self.scroll(int(value) * step)
+
+    def jump_to_line(self):
+        try:
+            line = int(self.line_entry.get()) - 1
+        except ValueError:
+            return
+        self.match_line = None
+        self.show_line(line - self.visible_rows() // 2)
+
+    def jump_to_section(self, name):
+        offset = self.sections[name][0]
+        self.match_line = None
+        self.show_line(self.index.line_at(offset))
+
+    def find(self, backwards=False):
+        needle = self.find_entry.get()
+        if not needle or self.search_result is not None:
+            return
+        origin = self.match_line if self.match_line is not None else self.top_line - (1 if not backwards else 0)
+        start = origin if backwards else origin + 1
+        self.status_label.configure(text=f"Searching for '{needle}'...")
+        self.search_result = []
+        # Searching a few hundred MB takes a moment; keep the UI responsive meanwhile
+        threading.Thread(target=lambda: self.search_result.append(
+            self.index.search(needle, start, backwards=backwards)), daemon=True).start()
+        self.poll_search(needle)
+
+    def poll_search(self, needle):
+        if not self.window.winfo_exists():
+            return
+        if not self.search_result:
+            self.window.after(50, self.poll_search, needle)
+            return
+        line = self.search_result[0]
+        self.search_result = None
+        if line is None:
+            self.render()
+            self.status_label.configure(text=f"'{needle}' not found")
+            return
+        self.match_line = line
+        self.show_line(line - self.visible_rows() // 2)
+
+    def close(self):
+        self.index.close()
+        self.window.destroy()
+
+class HistoryWindow:
+    # Per-script latency statistics plus a paged list of past runs, newest first
+    page_size = 100
+
+    def __init__(self, app, history):
+        self.app = app
+        self.history = history
+        self.page_starts = [None]
+        self.next_offset = 0
+        self.stats_result = None
+        theme = app.themes[app.current_theme]
+
+        self.window = tk.Toplevel(app.root)
+        self.window.geometry("900x600")
+        self.window.overrideredirect(True)
+        self.window.configure(bg=theme["bg"])
+
+        title_bar = tk.Frame(self.window, bg=theme["title_bg"], height=30)
+        title_bar.pack(fill="x")
+        tk.Label(title_bar, text="Run History", fg=theme["title_fg"],
+                bg=theme["title_bg"], font=("Arial", 12)).pack(side="left", padx=10)
+        tk.Button(title_bar, text="✕", command=self.window.destroy,
+                 bg=theme["title_bg"], fg=theme["title_fg"],
+                 bd=0, font=("Arial", 12), activebackground="#ff4444").pack(side="right", padx=5)
+        title_bar.bind("<Button-1>", lambda e: app.start_drag(e, self.window))
+        title_bar.bind("<B1-Motion>", lambda e: app.do_drag(e, self.window))
+
+        body = ttk.Frame(self.window, padding=10)
+        body.pack(fill="both", expand=True)
+
+        self.stats_label = ttk.Label(body, text="Per-script statistics (loading...)")
+        self.stats_label.pack(anchor="w")
+        stats_columns = ("runs", "failure_rate", "p50", "p95", "max")
+        self.stats_tree = ttk.Treeview(body, columns=stats_columns, height=8)
+        self.stats_tree.heading("#0", text="Script")
+        for column, heading in zip(stats_columns, ("Runs", "Failure rate", "p50 (s)", "p95 (s)", "Max (s)")):
+            self.stats_tree.heading(column, text=heading)
+            self.stats_tree.column(column, width=90, anchor="e")
+        self.stats_tree.pack(fill="x", pady=(0, 10))
+
+        ttk.Label(body, text="Runs").pack(anchor="w")
+        run_columns = ("started", "duration", "exit_code", "stdout", "stderr", "cpu", "peak_rss")
+        self.runs_tree = ttk.Treeview(body, columns=run_columns)
+        self.runs_tree.heading("#0", text="Script")
+        for column, heading in zip(run_columns, ("Started", "Duration (s)", "Exit code", "Stdout bytes", "Stderr bytes",
+                                                   "CPU (s)", "Peak RSS")):
+            self.runs_tree.heading(column, text=heading)
+            self.runs_tree.column(column, width=110, anchor="e")
+        self.runs_tree.pack(fill="both", expand=True)
+        self.runs_tree.bind("<Double-1>", self.show_output)
+
+        pager = ttk.Frame(body)
+        pager.pack(fill="x", pady=(5, 0))
+        self.newer_button = ttk.Button(pager, text="Newer", command=self.newer_page)
+        self.newer_button.pack(side="left")
+        self.older_button = ttk.Button(pager, text="Older", command=self.older_page)
+        self.older_button.pack(side="left", padx=5)
+        self.page_label = ttk.Label(pager)
+        self.page_label.pack(side="left", padx=5)
+
+        self.page_records = []
+        self.show_page()
+        # Statistics read the whole file the first time; do that off the UI thread
+        threading.Thread(target=lambda: setattr(self, "stats_result", self.history.stats()), daemon=True).start()
+        self.poll_stats()
+
+    def poll_stats(self):
+        if not self.window.winfo_exists():
+            return
+        if self.stats_result is None:
+            self.window.after(100, self.poll_stats)
+            return
+        self.stats_label.configure(text="Per-script statistics")
+        for script, stats in sorted(self.stats_result.items()):
+            self.stats_tree.insert("", "end", text=script, values=(
+                stats["runs"], f"{stats['failure_rate']:.1%}", self.seconds(stats["p50"]),
+                self.seconds(stats["p95"]), self.seconds(stats["max"])))
+
+    def seconds(self, value):
+        return "" if value is None else f"{value:.2f}"
+
+    def show_page(self):
+        self.page_records, self.next_offset = self.history.page(self.page_starts[-1], self.page_size)
+        self.runs_tree.delete(*self.runs_tree.get_children())
+        for index, record in enumerate(self.page_records):
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record["started"])) if record.get("started") else ""
+            resources = record.get("resources") or {}
+            self.runs_tree.insert("", "end", iid=str(index), text=record.get("script", ""), values=(
+                started, self.seconds(record.get("duration")), record.get("exit_code"),
+                record.get("stdout_bytes", 0), record.get("stderr_bytes", 0),
+                resources.get("cpu_seconds", ""), format_bytes(resources["peak_rss"]) if resources.get("peak_rss") else ""))
+        self.page_label.configure(text=f"Page {len(self.page_starts)}")
+        self.newer_button.state(["!disabled"] if len(self.page_starts) > 1 else ["disabled"])
+        self.older_button.state(["!disabled"] if self.next_offset else ["disabled"])
+
+    def older_page(self):
+        if self.next_offset:
+            self.page_starts.append(self.next_offset)
+            self.show_page()
+
+    def newer_page(self):
+        if len(self.page_starts) > 1:
+            self.page_starts.pop()
+            self.show_page()
+
+    def show_output(self, event):
+        selection = self.runs_tree.selection()
+        if not selection:
+            return
+        record = self.page_records[int(selection[0])]
+        self.app.write_output(f"--- {record.get('script')} output (last {OUTPUT_TAIL_BYTES} bytes) ---\n")
+        self.app.write_output(record.get("output", "") + "\n")
+
+class ActionList:
+    # Base of the Dev Mode launcher and its Settings editor. A fixed pool of widget slots
+    # shows the configured actions that match the find box, scrolled by whole rows.
+    # Scrolling, filtering and edits relabel the slots; nothing is rebuilt.
+    columns = 1
+
+    def __init__(self, app):
+        self.app = app
+        self.matches = list(range(len(app.extra_button_configs)))
+        self.top_row = 0
+        self.slots = []
+        self.find_var = tk.StringVar()
+        self.find_var.trace_add("write", lambda *args: self.refilter())
+
+    def bind_scrolling(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        widget.bind("<Button-4>", lambda e: self.scroll(-1))
+        widget.bind("<Button-5>", lambda e: self.scroll(1))
+
+    def refilter(self, keep_position=False):
+        names = [config['name'] for config in self.app.extra_button_configs]
+        self.matches = fuzzy_filter(self.find_var.get(), names)
+        if not keep_position:
+            self.top_row = 0
+        self.render()
+
+    def total_rows(self):
+        return -(-len(self.matches) // self.columns)
+
+    def render(self):
+        rows = self.visible_rows()
+        needed = rows * self.columns
+        while len(self.slots) < needed:
+            self.slots.append(self.make_slot(len(self.slots)))
+        total = self.total_rows()
+        self.top_row = max(min(self.top_row, total - rows), 0)
+        for slot in range(len(self.slots)):
+            index = self.action_at(slot) if slot < needed else None
+            if index is None:
+                self.hide(slot)
+            else:
+                self.fill(slot, index)
+        if total:
+            self.scrollbar.set(self.top_row / total, min((self.top_row + rows) / total, 1.0))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def action_at(self, slot):
+        # Index into extra_button_configs of the action a slot shows, or None
+        position = self.top_row * self.columns + slot
+        return self.matches[position] if position < len(self.matches) else None
+
+    def update_action(self, index):
+        # One action was edited: only a visible slot showing it changes
+        if self.find_var.get().strip():
+            self.refilter(keep_position=True)  # The new name may match differently
+            return
+        for slot in range(len(self.slots)):
+            if self.action_at(slot) == index:
+                self.fill(slot, index)
+
+    def scroll(self, delta):
+        self.top_row = max(self.top_row + delta, 0)
+        self.render()
+        return "break"
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.top_row = int(float(value) * self.total_rows())
+            self.render()
+        elif action == "scroll":
+            self.scroll(int(value) * (self.visible_rows() if unit == "pages" else 1))
+
+class ActionLauncher(ActionList):
+    # The Dev Mode panel: a grid of buttons for the configured actions
+    columns = 2
+
+    def __init__(self, app, parent):
+        super().__init__(app)
+        self.row_height = None
+        self.frame = ttk.Frame(parent, padding=10)
+        self.find_entry = ttk.Entry(self.frame, textvariable=self.find_var, width=20)
+        self.find_entry.pack(side="top", fill="x", pady=(0, 5))
+        # Enter runs the best match
+        self.find_entry.bind("<Return>", lambda e: self.launch(0))
+        self.find_entry.bind("<Escape>", lambda e: self.find_var.set(""))
+        self.scrollbar = ttk.Scrollbar(self.frame, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.body = ttk.Frame(self.frame)
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.bind("<Configure>", lambda e: self.render())
+        self.bind_scrolling(self.body)
+
+    def visible_rows(self):
+        if self.row_height is None:
+            probe = ttk.Button(self.body, text="X", width=15)
+            self.row_height = probe.winfo_reqheight() + 10  # pady=5 above and below
+            probe.destroy()
+        return max(self.body.winfo_height() // self.row_height, 1)
+
+    def make_slot(self, slot):
+        button = ttk.Button(self.body, width=15, command=lambda: self.launch(slot))
+        button.bind("<Button-1>", lambda e: setattr(self.app, 'shift_click', False))
+        button.bind("<Shift-Button-1>", lambda e: setattr(self.app, 'shift_click', True))
+        self.bind_scrolling(button)
+        button.grid(row=slot // self.columns, column=slot % self.columns, padx=2, pady=5)
+        return button
+
+    def fill(self, slot, index):
+        button = self.slots[slot]
+        name = self.app.extra_button_configs[index]['name']
+        if button.cget("text") != name:
+            button.configure(text=name)
+        if not button.winfo_manager():
+            button.grid()
+
+    def hide(self, slot):
+        self.slots[slot].grid_remove()
+
+    def launch(self, slot):
+        index = self.action_at(slot)
+        if index is not None:
+            self.app.launch_action(self.app.extra_button_configs[index])
+
+class ActionEditor(ActionList):
+    # Settings rows (name, script or pipeline, remove) for the configured actions.
+    # Edits are written to the action straight away and shown on its launcher button.
+    rows = 8
+
+    def __init__(self, app, parent, script_options):
+        super().__init__(app)
+        self.theme = app.themes[app.current_theme]
+        self.script_options = script_options
+        # (option menu, variable, callback) per slot, kept in step with the catalog by on_catalog_change
+        self.menus = []
+        self.frame = tk.Frame(parent, bg=self.theme["bg"])
+        find_frame = tk.Frame(self.frame, bg=self.theme["bg"])
+        find_frame.pack(side="top", fill="x", pady=(0, 5))
+        tk.Label(find_frame, text="Find:", bg=self.theme["bg"], fg=self.theme["text_fg"],
+                font=("Arial", 10)).pack(side="left")
+        tk.Entry(find_frame, textvariable=self.find_var, bg=self.theme["text_bg"], fg=self.theme["text_fg"],
+                font=("Arial", 10)).pack(side="left", fill="x", expand=True, padx=5)
+        self.scrollbar = ttk.Scrollbar(self.frame, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.body = tk.Frame(self.frame, bg=self.theme["bg"])
+        self.body.pack(side="left", fill="both", expand=True)
+        self.bind_scrolling(self.body)
+
+    def visible_rows(self):
+        return self.rows
+
+    def make_slot(self, slot):
+        theme = self.theme
+        row = tk.Frame(self.body, bg=theme["bg"])
+        row.grid(row=slot, column=0, sticky="w", pady=2)
+        label = tk.Label(row, width=4, anchor="e", bg=theme["bg"], fg=theme["text_fg"], font=("Arial", 10))
+        label.pack(side="left")
+        entry = tk.Entry(row, width=16, bg=theme["text_bg"], fg=theme["text_fg"], font=("Arial", 10))
+        entry.pack(side="left", padx=5)
+        entry.bind("<KeyRelease>", lambda e: self.rename(slot))
+        var = tk.StringVar()
+        callback = lambda value: self.retarget(slot, value)
+        option_menu = ttk.OptionMenu(row, var, None, *self.script_options, command=callback)
+        option_menu.pack(side="left", padx=5)
+        tk.Button(row, text="✕", command=lambda: self.remove(slot), bg=theme["title_bg"], fg=theme["title_fg"],
+                 bd=0, font=("Arial", 10), activebackground="#ff4444").pack(side="left")
+        for widget in (row, label):
+            self.bind_scrolling(widget)
+        self.menus.append((option_menu, var, callback))
+        return {"row": row, "label": label, "entry": entry, "var": var}
+
+    def fill(self, slot, index):
+        widgets = self.slots[slot]
+        config = self.app.extra_button_configs[index]
+        widgets["label"].configure(text=f"{index + 1}.")
+        if widgets["entry"].get() != config['name']:
+            widgets["entry"].delete(0, tk.END)
+            widgets["entry"].insert(0, config['name'])
+        target = self.app.button_target(config)
+        if widgets["var"].get() != target:
+            widgets["var"].set(target)
+        if not widgets["row"].winfo_manager():
+            widgets["row"].grid()
+
+    def hide(self, slot):
+        self.slots[slot]["row"].grid_remove()
+
+    def rename(self, slot):
+        index = self.action_at(slot)
+        name = self.slots[slot]["entry"].get().strip()
+        if index is None or not name or name == self.app.extra_button_configs[index]['name']:
+            return
+        self.app.extra_button_configs[index]['name'] = name
+        self.app.action_changed(index)
+
+    def retarget(self, slot, value):
+        index = self.action_at(slot)
+        if index is not None:
+            self.app.set_button_target(self.app.extra_button_configs[index], value)
+            self.app.action_changed(index)
+
+    def remove(self, slot):
+        index = self.action_at(slot)
+        if index is not None:
+            del self.app.extra_button_configs[index]
+            self.app.actions_changed()
+
+    def show_last(self):
+        self.find_var.set("")
+        self.top_row = self.total_rows()
+        self.render()
+
+class BatchHighlighter:
+    # Colours batch syntax in a Text widget. Edits only mark the lines they touch with
+    # a "dirty" tag, which moves with the text as lines are added or removed. An idle
+    # pass then re-lexes dirty lines in the visible region (plus a margin), a chunk at
+    # a time, so a keystroke in a 50k-line script costs the same as in a short one.
+    margin_lines = 100
+    chunk_lines = 300
+    palettes = {
+        "light": {"bat_comment": "#008000", "bat_label": "#795e26", "bat_keyword": "#0000ff",
+                  "bat_command": "#267f99", "bat_variable": "#af00db", "bat_redirect": "#a31515",
+                  "bat_string": "#a31515"},
+        "dark": {"bat_comment": "#6a9955", "bat_label": "#dcdcaa", "bat_keyword": "#569cd6",
+                 "bat_command": "#4ec9b0", "bat_variable": "#9cdcfe", "bat_redirect": "#d7ba7d",
+                 "bat_string": "#ce9178"}
+    }
+
+    def __init__(self, text, theme):
+        self.text = text
+        self.pending = None
+        # Off for scripts that aren't batch files; their lines are left uncoloured
+        self.enabled = True
+        # Route the widget's Tcl command through dispatch() to see every insert and delete,
+        # including typing, paste and undo, which never pass through Python otherwise
+        self.original = text._w + "_unhighlighted"
+        text.tk.call("rename", text._w, self.original)
+        text.tk.createcommand(text._w, self.dispatch)
+        self.apply_theme(theme)
+
+    def apply_theme(self, theme):
+        for tag, colour in self.palettes[theme].items():
+            self.text.tag_configure(tag, foreground=colour)
+        # Variables inside a string keep their own colour
+        self.text.tag_raise("bat_variable", "bat_string")
+
+    def dispatch(self, *args):
+        call = self.text.tk.call
+        try:
+            first = None
+            if args[0] in ("insert", "delete", "replace") and len(args) > 1:
+                first = call(self.original, "index", args[1])
+            result = call((self.original,) + args)
+        except tk.TclError:
+            return ""
+        if first is not None:
+            line = int(first.split(".")[0])
+            if args[0] == "insert":
+                line_count = sum(chars.count("\n") for chars in args[2::2])
+            elif args[0] == "replace":
+                line_count = args[3].count("\n") if len(args) > 3 else 0
+            else:
+                line_count = 0
+            call(self.original, "tag", "add", "dirty", f"{line}.0", f"{line + line_count}.0 lineend +1c")
+            self.schedule()
+        elif args[0] == "edit" and args[1:2] in (("undo",), ("redo",)):
+            call(self.original, "tag", "add", "dirty", "1.0", "end")
+            self.schedule()
+        return result
+
+    def schedule(self):
+        if self.pending is None:
+            self.pending = self.text.after_idle(self.highlight)
+
+    def highlight(self):
+        self.pending = None
+        top = int(self.text.index("@0,0").split(".")[0])
+        bottom = int(self.text.index(f"@0,{self.text.winfo_height()}").split(".")[0])
+        budget = self.chunk_lines
+        # Visible lines first, then the margin above and below
+        for first, last in ((top, bottom), (max(top - self.margin_lines, 1), bottom + self.margin_lines)):
+            while budget > 0:
+                found = self.text.tag_nextrange("dirty", f"{first}.0", f"{last}.0 lineend +1c")
+                if not found:
+                    break
+                start = int(found[0].split(".")[0])
+                end_line, end_column = (int(part) for part in found[1].split("."))
+                stop = min(end_line if end_column else end_line - 1, last, start + budget - 1)
+                self.retag(start, max(stop, start))
+                budget -= max(stop, start) - start + 1
+                first = max(stop, start) + 1
+        if budget <= 0:
+            # More to do; yield to pending keystrokes and carry on in the next idle slot
+            self.schedule()
+
+    def retag(self, first, last):
+        end = f"{last}.0 lineend +1c"
+        for tag in TAGS + ("dirty",):
+            self.text.tag_remove(tag, f"{first}.0", end)
+        if not self.enabled:
+            return
+        ranges = {}
+        lines = self.text.get(f"{first}.0", f"{last}.0 lineend").split("\n")
+        for number, line in enumerate(lines, first):
+            for tag, start, stop in lex_line(line):
+                ranges.setdefault(tag, []).extend((f"{number}.{start}", f"{number}.{stop}"))
+        for tag, indexes in ranges.items():
+            self.text.tag_add(tag, *indexes)
 
 class UpKeepApp:
-    def __init__(self, root):
+    def __init__(self, root, profiler=None):
         self.root = root
+        self.profiler = profiler or StartupProfiler()
         self.root.geometry("1100x580")
         
         # Ensure folders exist
@@ -24,23 +647,20 @@ class UpKeepApp:
         
         # Load settings (default to dark mode)
         self.settings_file = os.path.join(self.settings_folder, "settings.json")
-        self.load_settings()
-        if not hasattr(self, 'current_theme'):  # If no settings file exists, default to dark
-            self.current_theme = 'dark'
-            self.show_extra_buttons = False
-            self.extra_button_configs = {f"Extra {i}": None for i in range(1, 11)}
-            self.save_settings()
+        with self.profiler.phase("settings_load"):
+            self.load_settings()
         
         # Apply initial theme
         self.root.configure(bg=self.themes[self.current_theme]["bg"])
         self.root.overrideredirect(True)
 
         # Style configuration
-        self.style = ttk.Style()
-        self.update_style()
-        self.style.layout("TNotebook", [])
-        self.style.configure("TNotebook", background=self.themes[self.current_theme]["bg"], borderwidth=0)
-        self.style.configure("TNotebook.Tab", padding=[10, 2], font=("Arial", 10))
+        with self.profiler.phase("style_setup"):
+            self.style = ttk.Style()
+            self.update_style()
+            self.style.layout("TNotebook", [])
+            self.style.configure("TNotebook", background=self.themes[self.current_theme]["bg"], borderwidth=0)
+            self.style.configure("TNotebook.Tab", padding=[10, 2], font=("Arial", 10))
 
         # Custom title bar
         self.title_bar = tk.Frame(self.root, bg=self.themes[self.current_theme]["title_bg"], height=30)
@@ -55,7 +675,7 @@ class UpKeepApp:
                                        bd=0, font=("Arial", 12))
         self.settings_button.pack(side="right", padx=5)
         
-        self.close_button = tk.Button(self.title_bar, text="✕", command=self.root.quit,
+        self.close_button = tk.Button(self.title_bar, text="✕", command=self.close_app,
                                     bg=self.themes[self.current_theme]["title_bg"], fg=self.themes[self.current_theme]["title_fg"], 
                                     bd=0, font=("Arial", 12), activebackground="#ff4444")
         self.close_button.pack(side="right", padx=5)
@@ -77,15 +697,81 @@ class UpKeepApp:
         self.info_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.info_frame, text="Patch Notes")
 
-        self.setup_tools_tab()
-        self.setup_files_tab()
-        self.setup_info_tab()
+        # Only Tools is built up front; the other tabs are built the first time they are shown
+        self.tab_builders = {
+            str(self.tools_frame): ("tab_tools", self.setup_tools_tab),
+            str(self.files_frame): ("tab_upeditor", self.setup_files_tab),
+            str(self.info_frame): ("tab_patch_notes", self.setup_info_tab)
+        }
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+
+        # Worker threads never touch Tk directly; they queue output and the UI
+        # thread drains it in batches (see poll_output)
+        self.output_queue = queue.Queue()
+        # Every output line, searchable; output_seqs maps each line in output_text to its store entry
+        self.output_store = OutputStore(self.output_store_lines)
+        self.output_seqs = []
+        self.output_follow = True
+        self.output_filter = (None, None)
+        self.latest_run = None
+        self.worker_run = threading.local()
+        self.search_matches = []
+        self.search_index = None
+        self.search_key = None
+        self.shift_click = False
+        self.queue_dirty = False
+        self.queue_refreshed = 0
+        self.scheduler = ScriptScheduler(self.execute_script, workers=self.max_workers,
+                                         on_change=self.mark_queue_dirty)
+        # Shells for the first runs start in the background now, off the UI thread
+        self.interpreter.start_sessions(self.shell_sessions, self.session_max_runs)
+
+        # One cached view of the scripts folder feeds the UpEditor list and the settings dialog.
+        # It is filled on first use rather than at startup.
+        self.catalog = ScriptCatalog(self.scripts_folder, self.interpreter.extensions)
+        self.catalog.subscribe(self.on_catalog_change)
+        self.catalog_polling = False
+
+        self.build_tab(self.tools_frame)
+
+        self.root.after(self.output_poll_ms, self.poll_output)
+        self.start_schedules()
+        if self.update_url:
+            # Network I/O stays off the UI thread; a result only ever shows up in the output pane
+            threading.Thread(target=self.check_for_updates, daemon=True).start()
+
+    def start_schedules(self):
+        # The timer thread sleeps until the next due run; due scripts go through the normal queue
+        self.timers = None
+        schedules = load_schedules(self.settings['schedules'],
+                                   on_error=lambda message: self.write_output(f"Skipped schedule {message}\n", "stderr"))
+        if not schedules:
+            return
+        self.timers = MaintenanceScheduler(
+            schedules, lambda schedule: self.run_script(os.path.join(self.scripts_folder, schedule.script),
+                                                        refresh=True),
+            self.settings_folder)
+        self.timers.start()
+
+    def on_tab_changed(self, event):
+        self.build_tab(self.notebook.nametowidget(self.notebook.select()))
+
+    def build_tab(self, frame):
+        builder = self.tab_builders.pop(str(frame), None)
+        if builder is None:
+            return
+        phase, setup = builder
+        with self.profiler.phase(phase):
+            setup()
+        if self.profiler.written:
+            self.profiler.write()
 
     def setup_tools_tab(self):
         self.button_frame_left = ttk.Frame(self.tools_frame, padding=10)
         self.button_frame_left.pack(side="left", fill="y")
 
-        self.button_frame_right = ttk.Frame(self.tools_frame, padding=10)
+        # Dev Mode actions; shown by update_extra_buttons
+        self.launcher = ActionLauncher(self, self.tools_frame)
 
         self.output_frame = ttk.Frame(self.tools_frame, padding=10)
         self.output_frame.pack(side="right", fill="both", expand=True)
@@ -96,17 +782,46 @@ class UpKeepApp:
         self.create_button(self.button_frame_left, "Check Disk", "checkdisk.bat")
         self.create_button(self.button_frame_left, "SFC Scan", "sfcscan.bat")
         self.create_button(self.button_frame_left, "Reset Winsock", "winsockreset.bat")
-        self.create_button(self.button_frame_left, "Clean Temp", "cleantemp.bat")
+        self.create_button(self.button_frame_left, "Clean Temp", None,
+                           lambda: self.clean_temp(self.clean_dry_run_var.get() or self.shift_click))
+        # Dry run lists what Clean Temp would free per folder without deleting anything
+        self.clean_dry_run_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.button_frame_left, text="Dry run", variable=self.clean_dry_run_var).pack()
         self.create_button(self.button_frame_left, "Reboot", "reboot.bat")
-        self.create_button(self.button_frame_left, "Diagnostic Report", "diagnostic.bat")
+        self.create_button(self.button_frame_left, "Diagnostic Report", None, self.run_diagnostic_report)
         self.create_button(self.button_frame_left, "View Report", None, self.view_latest_report)
+        self.create_button(self.button_frame_left, "Compare Reports", None, self.compare_reports)
+        self.create_button(self.button_frame_left, "Run History", None, self.open_history)
         self.create_button(self.button_frame_left, "App Info", "appinfo.bat")
 
+        search_frame = ttk.Frame(self.output_frame)
+        search_frame.pack(side="top", fill="x", pady=(0, 5))
+        ttk.Label(search_frame, text="Find:").pack(side="left")
+        self.search_entry = ttk.Entry(search_frame, width=24)
+        self.search_entry.pack(side="left", padx=(2, 5))
+        self.search_entry.bind("<Return>", lambda e: self.find_output(1))
+        self.search_entry.bind("<Shift-Return>", lambda e: self.find_output(-1))
+        self.search_regex_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(search_frame, text="Regex", variable=self.search_regex_var).pack(side="left")
+        self.stderr_only_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(search_frame, text="Only stderr", variable=self.stderr_only_var,
+                        command=self.render_output).pack(side="left", padx=(5, 0))
+        self.this_run_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(search_frame, text="Only this run", variable=self.this_run_var,
+                        command=self.render_output).pack(side="left", padx=(5, 0))
+        ttk.Button(search_frame, text="Previous", command=lambda: self.find_output(-1)).pack(side="left", padx=(5, 0))
+        ttk.Button(search_frame, text="Next", command=lambda: self.find_output(1)).pack(side="left", padx=(5, 0))
+        ttk.Button(search_frame, text="Latest", command=self.render_output).pack(side="left", padx=(5, 0))
+        self.search_status = ttk.Label(search_frame)
+        self.search_status.pack(side="left", padx=5)
+
         self.output_text = tk.Text(self.output_frame, height=15, width=70,
                                  bg=self.themes[self.current_theme]["text_bg"], 
                                  fg=self.themes[self.current_theme]["text_fg"],
                                  font=("Consolas", 9))
         self.output_text.pack(fill="both", expand=True)
+        self.output_text.tag_configure("stderr", foreground="#f14c4c")
+        self.output_text.tag_configure("match", background="#d7ba7d", foreground="black")
 
         scrollbar = ttk.Scrollbar(self.output_text)
         scrollbar.pack(side="right", fill="y")
@@ -120,6 +835,18 @@ class UpKeepApp:
                                      command=self.clear_output, width=15)
         self.clear_button.pack(side="right", padx=(0, 5))
 
+        self.cancel_button = ttk.Button(self.clear_frame, text="Cancel Job",
+                                      command=self.cancel_selected_job, width=15)
+        self.cancel_button.pack(side="right", padx=(0, 5))
+
+        # Running and queued jobs
+        self.queue_listbox = tk.Listbox(self.clear_frame, height=3,
+                                      bg=self.themes[self.current_theme]["text_bg"],
+                                      fg=self.themes[self.current_theme]["text_fg"],
+                                      font=("Consolas", 9))
+        self.queue_listbox.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        self.queue_jobs = []
+
         self.update_extra_buttons()
 
     def setup_files_tab(self):
@@ -129,12 +856,18 @@ class UpKeepApp:
         self.editor_frame = ttk.Frame(self.files_frame, padding=10)
         self.editor_frame.pack(side="right", fill="both", expand=True)
 
+        self.file_filter_var = tk.StringVar()
+        self.file_filter_entry = ttk.Entry(self.file_list_frame, textvariable=self.file_filter_var)
+        self.file_filter_entry.pack(fill="x", pady=(0, 5))
+        self.file_filter_var.trace_add("write", lambda *args: self.update_file_list())
+
         self.file_listbox = tk.Listbox(self.file_list_frame, bg=self.themes[self.current_theme]["text_bg"],
                                      fg=self.themes[self.current_theme]["text_fg"], font=("Arial", 10),
                                      width=30, height=20)
         self.file_listbox.pack(fill="y", expand=True)
         self.file_listbox.bind("<<ListboxSelect>>", self.on_file_select)
 
+        self.refresh_catalog()
         self.update_file_list()
 
         self.editor_text = tk.Text(self.editor_frame, height=15, width=70,
@@ -145,7 +878,13 @@ class UpKeepApp:
 
         editor_scrollbar = ttk.Scrollbar(self.editor_text)
         editor_scrollbar.pack(side="right", fill="y")
-        self.editor_text.config(yscrollcommand=editor_scrollbar.set)
+        self.highlighter = BatchHighlighter(self.editor_text, self.current_theme)
+
+        def on_editor_scroll(first, last):
+            editor_scrollbar.set(first, last)
+            self.highlighter.schedule()  # Newly visible lines may still need colouring
+
+        self.editor_text.config(yscrollcommand=on_editor_scroll)
         editor_scrollbar.config(command=self.editor_text.yview)
 
         self.editor_button_frame = ttk.Frame(self.editor_frame)
@@ -160,6 +899,9 @@ class UpKeepApp:
         self.open_script_button = ttk.Button(self.editor_button_frame, text="Open", command=self.open_script)
         self.open_script_button.pack(side="left", padx=5)
 
+        self.remote_button = ttk.Button(self.editor_button_frame, text="Run on Hosts", command=self.run_on_hosts)
+        self.remote_button.pack(side="left", padx=5)
+
     def setup_info_tab(self):
         # Create a frame for the patch notes content
         self.info_content_frame = ttk.Frame(self.info_frame, padding=10)
@@ -209,6 +951,13 @@ class UpKeepApp:
         # Make the text read-only
         self.patch_notes_text.config(state="disabled")
 
+    # Output pane batching
+    output_batch_lines = 2000
+    output_poll_ms = 50
+
+    # How often the scripts folder is checked for outside changes
+    catalog_poll_ms = 2000
+
     # Theme definitions
     themes = {
         "light": {
@@ -228,26 +977,56 @@ class UpKeepApp:
     }
 
     def load_settings(self):
-        try:
-            with open(self.settings_file, 'r') as f:
-                settings = json.load(f)
-                self.current_theme = settings.get('theme', 'dark')
-                self.show_extra_buttons = settings.get('extra_buttons', False)
-                self.extra_button_configs = settings.get('extra_button_configs', {f"Extra {i}": None for i in range(1, 11)})
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.current_theme = 'dark'
-            self.show_extra_buttons = False
-            self.extra_button_configs = {f"Extra {i}": None for i in range(1, 11)}
-            self.save_settings()
+        self.settings = SettingsStore(self.settings_file)
+        settings = self.settings
+        self.current_theme = settings['theme']
+        self.show_extra_buttons = settings['extra_buttons']
+        self.extra_button_configs = settings['extra_button_configs']
+        self.output_line_cap = settings['output_line_cap']
+        self.output_store_lines = settings['output_store_lines']
+        self.max_workers = settings['max_workers']
+        self.script_timeouts = settings['script_timeouts']
+        self.cached_scripts = settings['cached_scripts']
+        self.result_cache = ResultCache(settings['cache_entries'])
+        # Picks the interpreter for each script by its extension
+        self.interpreter = InterpreterRegistry(settings['interpreter'], settings['interpreters'])
+        self.shell_sessions = settings['shell_sessions']
+        self.session_max_runs = settings['session_max_runs']
+        self.interpreter_command = settings['interpreter']
+        self.diagnostic_collectors = settings['diagnostic_collectors']
+        self.report_retention = settings['report_retention']
+        self.editor_max_bytes = settings['editor_max_bytes']
+        self.sample_interval = settings['sample_interval']
+        self.agent_token = settings['agent_token']
+        self.remote_hosts = settings['remote_hosts']
+        self.remote_concurrency = settings['remote_concurrency']
+        self.remote_host_timeout = settings['remote_host_timeout']
+        self.update_url = settings['update_url']
+        self.temp_cleaner = settings['temp_cleaner']
+        self.pipeline_definitions = settings['pipelines']
+        self.sampler = ProcessSampler(self.sample_interval)
+        self.report_store = ReportStore(self.reports_folder, self.report_retention.get('keep_count'),
+                                        self.report_retention.get('keep_days'))
+        # Append-only; nothing is read from it until the History window opens
+        self.history = RunHistory(os.path.join(self.reports_folder, HISTORY_NAME))
 
     def save_settings(self):
         settings = {
             'theme': self.current_theme,
             'extra_buttons': self.show_extra_buttons,
-            'extra_button_configs': self.extra_button_configs
+            'extra_button_configs': self.extra_button_configs,
+            'output_line_cap': self.output_line_cap,
+            'max_workers': self.max_workers,
+            'script_timeouts': self.script_timeouts,
+            'interpreter': self.interpreter_command,
+            'diagnostic_collectors': self.diagnostic_collectors,
+            'report_retention': self.report_retention,
+            'editor_max_bytes': self.editor_max_bytes,
+            'sample_interval': self.sample_interval,
+            'remote_hosts': self.remote_hosts
         }
-        with open(self.settings_file, 'w') as f:
-            json.dump(settings, f)
+        # Debounced: the file is written on a background thread once changes settle
+        self.settings.update(settings)
 
     def toggle_theme(self):
         self.current_theme = 'dark' if self.current_theme == 'light' else 'light'
@@ -265,12 +1044,17 @@ class UpKeepApp:
                                      fg=self.themes[self.current_theme]["title_fg"])
         self.output_text.configure(bg=self.themes[self.current_theme]["text_bg"],
                                  fg=self.themes[self.current_theme]["text_fg"])
-        self.file_listbox.configure(bg=self.themes[self.current_theme]["text_bg"],
-                                  fg=self.themes[self.current_theme]["text_fg"])
-        self.editor_text.configure(bg=self.themes[self.current_theme]["text_bg"],
-                                 fg=self.themes[self.current_theme]["text_fg"])
-        self.patch_notes_text.configure(bg=self.themes[self.current_theme]["text_bg"],
-                                       fg=self.themes[self.current_theme]["text_fg"])  # Update patch notes theme
+        self.queue_listbox.configure(bg=self.themes[self.current_theme]["text_bg"],
+                                   fg=self.themes[self.current_theme]["text_fg"])
+        if hasattr(self, 'file_listbox'):  # UpEditor and Patch Notes may not be built yet
+            self.file_listbox.configure(bg=self.themes[self.current_theme]["text_bg"],
+                                      fg=self.themes[self.current_theme]["text_fg"])
+            self.editor_text.configure(bg=self.themes[self.current_theme]["text_bg"],
+                                     fg=self.themes[self.current_theme]["text_fg"])
+            self.highlighter.apply_theme(self.current_theme)
+        if hasattr(self, 'patch_notes_text'):
+            self.patch_notes_text.configure(bg=self.themes[self.current_theme]["text_bg"],
+                                           fg=self.themes[self.current_theme]["text_fg"])  # Update patch notes theme
         self.style.configure("TNotebook", background=self.themes[self.current_theme]["bg"])
         self.style.configure("TNotebook.Tab", background=self.themes[self.current_theme]["title_bg"],
                            foreground=self.themes[self.current_theme]["title_fg"])
@@ -319,40 +1103,41 @@ class UpKeepApp:
                                     font=("Arial", 10))
         self.theme_button.pack(pady=5)
 
+        tk.Button(self.settings_frame, text="Install Update", command=self.install_update,
+                 bg=self.themes[self.current_theme]["title_bg"], fg=self.themes[self.current_theme]["title_fg"],
+                 font=("Arial", 10)).pack(pady=5)
+
         self.extra_buttons_var = tk.BooleanVar(value=self.show_extra_buttons)
         tk.Checkbutton(self.settings_frame, text="Dev Mode", variable=self.extra_buttons_var,
                       command=self.toggle_extra_buttons, bg=self.themes[self.current_theme]["bg"],
                       fg=self.themes[self.current_theme]["text_fg"], font=("Arial", 10),
                       selectcolor=self.themes[self.current_theme]["text_bg"]).pack(pady=5)
 
-        tk.Label(self.settings_frame, text="Extra Button Configuration", bg=self.themes[self.current_theme]["bg"],
-                fg=self.themes[self.current_theme]["text_fg"], font=("Arial", 10, "bold")).pack(pady=(10, 5))
+        line_cap_frame = tk.Frame(self.settings_frame, bg=self.themes[self.current_theme]["bg"])
+        line_cap_frame.pack(pady=5)
+        tk.Label(line_cap_frame, text="Output line limit:", bg=self.themes[self.current_theme]["bg"],
+                fg=self.themes[self.current_theme]["text_fg"], font=("Arial", 10)).pack(side="left")
+        self.line_cap_entry = tk.Entry(line_cap_frame, width=8, bg=self.themes[self.current_theme]["text_bg"],
+                                     fg=self.themes[self.current_theme]["text_fg"], font=("Arial", 10))
+        self.line_cap_entry.insert(0, str(self.output_line_cap))
+        self.line_cap_entry.pack(side="left", padx=5)
 
-        self.button_entries = {}
-        self.button_script_vars = {}
-        script_options = ["None"] + [f for f in os.listdir(self.scripts_folder) if f.lower().endswith('.bat')]
-
-        for i in range(1, 11):
-            frame = tk.Frame(self.settings_frame, bg=self.themes[self.current_theme]["bg"])
-            frame.pack(fill="x", pady=2)
-
-            default_name = list(self.extra_button_configs.keys())[i-1]
-            tk.Label(frame, text=f"Button {i} Name:", bg=self.themes[self.current_theme]["bg"],
-                    fg=self.themes[self.current_theme]["text_fg"], font=("Arial", 10)).pack(side="left")
-            entry = tk.Entry(frame, bg=self.themes[self.current_theme]["text_bg"],
-                           fg=self.themes[self.current_theme]["text_fg"], font=("Arial", 10))
-            entry.insert(0, default_name)
-            entry.pack(side="left", padx=5)
-            self.button_entries[f"Extra {i}"] = entry
-
-            tk.Label(frame, text="Script:", bg=self.themes[self.current_theme]["bg"],
-                    fg=self.themes[self.current_theme]["text_fg"], font=("Arial", 10)).pack(side="left")
-            var = tk.StringVar(value=self.extra_button_configs.get(default_name, "None"))
-            option_menu = ttk.OptionMenu(frame, var, var.get(), *script_options,
-                                       command=lambda val, idx=i: self.update_button_script(idx, val))
-            option_menu.pack(side="left", padx=5)
-            self.button_script_vars[f"Extra {i}"] = var
+        tk.Label(self.settings_frame, text="Dev Mode Actions", bg=self.themes[self.current_theme]["bg"],
+                fg=self.themes[self.current_theme]["text_fg"], font=("Arial", 10, "bold")).pack(pady=(10, 5))
 
+        self.refresh_catalog()
+        # Pipelines go after the scripts, so catalog positions still line up with menu indexes
+        script_options = ["None"] + self.catalog.filter("") + [
+            self.pipeline_label + definition.get('name', '?') for definition in self.pipeline_definitions]
+        # Only the rows that fit are built; scrolling and edits update them in place
+        self.action_editor = ActionEditor(self, self.settings_frame, script_options)
+        self.action_editor.frame.pack(fill="x")
+        self.button_option_menus = self.action_editor.menus
+        self.action_editor.render()
+
+        tk.Button(self.settings_frame, text="Add Action", command=self.add_action,
+                 bg=self.themes[self.current_theme]["title_bg"], fg=self.themes[self.current_theme]["title_fg"],
+                 font=("Arial", 10)).pack(pady=(10, 0))
         tk.Button(self.settings_frame, text="Apply Changes", command=self.apply_button_changes,
                  bg=self.themes[self.current_theme]["title_bg"], fg=self.themes[self.current_theme]["title_fg"],
                  font=("Arial", 10)).pack(pady=10)
@@ -363,46 +1148,118 @@ class UpKeepApp:
         self.save_settings()
 
     def update_extra_buttons(self):
-        for widget in self.button_frame_right.winfo_children():
-            widget.destroy()
-        if self.button_frame_right.winfo_ismapped():
-            self.button_frame_right.pack_forget()
-        if self.show_extra_buttons:
-            self.button_frame_right.pack(side="left", fill="y")
-            for name, script in self.extra_button_configs.items():
-                if script and script != "None":
-                    self.create_button(self.button_frame_right, name, script)
-                else:
-                    self.create_button(self.button_frame_right, name, None,
-                                     lambda n=name: self.output_text.insert("end", f"{n} clicked (no script assigned)\n"))
+        # Shows or hides the launcher; its buttons are reused, never rebuilt
+        if not self.show_extra_buttons:
+            self.launcher.frame.pack_forget()
+        elif not self.launcher.frame.winfo_manager():
+            self.launcher.frame.pack(side="left", fill="both")
+            self.launcher.refilter(keep_position=True)
+
+    def launch_action(self, config):
+        if config.get('pipeline'):
+            self.run_named_pipeline(config['pipeline'])
+        elif config['script']:
+            self.run_script(os.path.join(self.scripts_folder, config['script']), refresh=self.shift_click)
+        else:
+            self.write_output(f"{config['name']} clicked (no script assigned)\n")
+
+    def action_changed(self, index):
+        self.launcher.update_action(index)
+        self.save_settings()
+
+    def actions_changed(self):
+        # Actions were added or removed, so positions shift in both lists
+        self.launcher.refilter(keep_position=True)
+        if hasattr(self, 'settings_window') and self.settings_window.winfo_exists():
+            self.action_editor.refilter(keep_position=True)
+        self.save_settings()
+
+    def add_action(self):
+        self.extra_button_configs.append(
+            {'name': f"Action {len(self.extra_button_configs) + 1}", 'script': None, 'pipeline': None})
+        self.actions_changed()
+        self.action_editor.show_last()
+
+    # Menu entries for pipelines carry this prefix; the config stores the bare name under 'pipeline'
+    pipeline_label = "Pipeline: "
 
-    def update_button_script(self, index, script):
-        old_name = f"Extra {index}"
-        new_name = self.button_entries[old_name].get()
-        self.extra_button_configs[new_name] = script
-        if old_name != new_name and old_name in self.extra_button_configs:
-            del self.extra_button_configs[old_name]
+    def button_target(self, config):
+        if config.get('pipeline'):
+            return self.pipeline_label + config['pipeline']
+        return config['script'] or "None"
+
+    def set_button_target(self, config, value):
+        config['script'] = config['pipeline'] = None
+        if value.startswith(self.pipeline_label):
+            config['pipeline'] = value[len(self.pipeline_label):]
+        elif value != "None":
+            config['script'] = value
 
     def apply_button_changes(self):
-        for old_name, entry in self.button_entries.items():
-            new_name = entry.get()
-            script = self.button_script_vars[old_name].get()
-            if new_name and new_name != old_name:
-                self.extra_button_configs[new_name] = script
-                if old_name in self.extra_button_configs:
-                    del self.extra_button_configs[old_name]
-            else:
-                self.extra_button_configs[old_name] = script
-        self.update_extra_buttons()
+        # Action edits are saved as they are made; this applies the remaining settings
+        try:
+            self.output_line_cap = max(100, int(self.line_cap_entry.get()))
+        except ValueError:
+            self.write_output("Output line limit must be a number\n")
+        self.trim_output()
         self.save_settings()
 
     def update_file_list(self):
+        # Full refill, only needed when the filter text changes; folder changes arrive as diffs
+        self.file_list_names = self.catalog.filter(self.file_filter_var.get())
         self.file_listbox.delete(0, tk.END)
-        scripts_dir = os.path.join(os.getcwd(), self.scripts_folder)
-        if os.path.exists(scripts_dir):
-            for file in os.listdir(scripts_dir):
-                if os.path.isfile(os.path.join(scripts_dir, file)) and file.lower().endswith('.bat'):
-                    self.file_listbox.insert(tk.END, file)
+        if self.file_list_names:
+            self.file_listbox.insert(tk.END, *self.file_list_names)
+
+    def refresh_catalog(self):
+        # Nothing lists the scripts folder until a view needs it; from then on it is polled
+        self.catalog.refresh()
+        if not self.catalog_polling:
+            self.catalog_polling = True
+            self.root.after(self.catalog_poll_ms, self.poll_catalog)
+
+    def poll_catalog(self):
+        self.catalog.refresh()
+        self.root.after(self.catalog_poll_ms, self.poll_catalog)
+
+    def on_catalog_change(self, added, removed):
+        if hasattr(self, 'file_listbox'):
+            query = self.file_filter_var.get().strip().lower()
+            for name in removed:
+                if name in self.file_list_names:
+                    index = self.file_list_names.index(name)
+                    del self.file_list_names[index]
+                    self.file_listbox.delete(index)
+            for name in added:
+                if query in name.lower():
+                    index = self.catalog.position(name, self.file_list_names)
+                    self.file_list_names.insert(index, name)
+                    self.file_listbox.insert(index, name)
+        if hasattr(self, 'settings_window') and self.settings_window.winfo_exists():
+            for option_menu, var, callback in self.button_option_menus:
+                menu = option_menu["menu"]
+                for name in removed:
+                    index = self.find_menu_entry(menu, name)
+                    if index is not None:
+                        menu.delete(index)
+                for name in added:
+                    # Entry 0 is "None"; scripts follow in catalog order
+                    menu.insert_command(self.catalog.position(name) + 1, label=name,
+                                        command=tk._setit(var, name, callback))
+
+    def find_menu_entry(self, menu, label):
+        last = menu.index("end")
+        for index in range(last + 1 if last is not None else 0):
+            if menu.entrycget(index, "label") == label:
+                return index
+        return None
+
+    def select_file(self, name):
+        self.file_listbox.select_clear(0, tk.END)
+        if name in self.file_list_names:
+            index = self.file_list_names.index(name)
+            self.file_listbox.select_set(index)
+            self.file_listbox.see(index)
 
     def on_file_select(self, event):
         selection = self.file_listbox.curselection()
@@ -410,6 +1267,9 @@ class UpKeepApp:
             return
         file_name = self.file_listbox.get(selection[0])
         full_path = os.path.join(os.getcwd(), self.scripts_folder, file_name)
+        if self.open_if_too_large(full_path):
+            return
+        self.highlighter.enabled = file_name.lower().endswith(BATCH_EXTENSIONS)
         self.editor_text.delete("1.0", tk.END)
         try:
             with open(full_path, 'r', encoding='utf-8') as f:
@@ -419,6 +1279,18 @@ class UpKeepApp:
             self.editor_text.insert("end", f"Error reading {file_name}: {str(e)}\n")
             self.current_script = None
 
+    def open_if_too_large(self, path):
+        # Big files go to the read-only viewer; loading them into editor_text would freeze the UI
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return False
+        if size <= self.editor_max_bytes:
+            return False
+        self.write_output(f"{os.path.basename(path)} is {size // 1024} KB, opening read-only\n")
+        self.open_viewer(path)
+        return True
+
     def save_script(self):
         if not hasattr(self, 'current_script') or not self.current_script:
             self.new_script()
@@ -427,10 +1299,11 @@ class UpKeepApp:
         try:
             with open(full_path, 'w', encoding='utf-8') as f:
                 f.write(self.editor_text.get("1.0", tk.END))
-            self.output_text.insert("end", f"Saved {self.current_script}\n")
-            self.update_file_list()
+            self.write_output(f"Saved {self.current_script}\n")
+            self.result_cache.invalidate(full_path)
+            self.catalog.add(self.current_script)
         except Exception as e:
-            self.output_text.insert("end", f"Error saving {self.current_script}: {str(e)}\n")
+            self.write_output(f"Error saving {self.current_script}: {str(e)}\n")
 
     def new_script(self):
         new_window = tk.Toplevel(self.root)
@@ -460,14 +1333,14 @@ class UpKeepApp:
 
         def create():
             name = name_entry.get()
-            if not name.lower().endswith('.bat'):
+            if not name.lower().endswith(self.interpreter.extensions):
                 name += '.bat'
             full_path = os.path.join(self.scripts_folder, name)
             if os.path.exists(full_path):
-                self.output_text.insert("end", f"Error: {name} already exists!\n")
+                self.write_output(f"Error: {name} already exists!\n")
             else:
                 try:
-                    template = (
+                    template = "" if not name.lower().endswith(BATCH_EXTENSIONS) else (
                         "@echo off\n"
                         "REM Simple Batch Script Template\n"
                         "echo Starting script...\n"
@@ -478,42 +1351,112 @@ class UpKeepApp:
                     )
                     with open(full_path, 'w', encoding='utf-8') as f:
                         f.write(template)
-                    self.update_file_list()
-                    self.file_listbox.select_set(self.file_listbox.size() - 1)
+                    self.catalog.add(name)
+                    self.select_file(name)
                     self.on_file_select(None)
-                    self.output_text.insert("end", f"Created {name} with template\n")
+                    self.write_output(f"Created {name} with template\n")
                 except Exception as e:
-                    self.output_text.insert("end", f"Error creating {name}: {str(e)}\n")
+                    self.write_output(f"Error creating {name}: {str(e)}\n")
             new_window.destroy()
 
         tk.Button(frame, text="Create", command=create,
                  bg=self.themes[self.current_theme]["title_bg"], fg=self.themes[self.current_theme]["title_fg"],
                  font=("Arial", 10)).pack(pady=5)
 
+    def run_on_hosts(self):
+        if not getattr(self, 'current_script', None):
+            self.write_output("Select a script to run on remote hosts\n")
+            return
+        script = self.current_script
+        window = tk.Toplevel(self.root)
+        window.geometry("420x150")
+        window.overrideredirect(True)
+        window.configure(bg=self.themes[self.current_theme]["bg"])
+
+        title_bar = tk.Frame(window, bg=self.themes[self.current_theme]["title_bg"], height=30)
+        title_bar.pack(fill="x")
+        tk.Label(title_bar, text=f"Run {script} on Hosts", fg=self.themes[self.current_theme]["title_fg"],
+                bg=self.themes[self.current_theme]["title_bg"], font=("Arial", 12)).pack(side="left", padx=10)
+        tk.Button(title_bar, text="✕", command=window.destroy,
+                 bg=self.themes[self.current_theme]["title_bg"], fg=self.themes[self.current_theme]["title_fg"],
+                 bd=0, font=("Arial", 12), activebackground="#ff4444").pack(side="right", padx=5)
+        title_bar.bind("<Button-1>", lambda e: self.start_drag(e, window))
+        title_bar.bind("<B1-Motion>", lambda e: self.do_drag(e, window))
+
+        frame = tk.Frame(window, bg=self.themes[self.current_theme]["bg"])
+        frame.pack(pady=10, padx=10, fill="both", expand=True)
+
+        tk.Label(frame, text="Hosts (host or host:port, comma-separated):", bg=self.themes[self.current_theme]["bg"],
+                fg=self.themes[self.current_theme]["text_fg"], font=("Arial", 10)).pack(pady=5)
+        hosts_entry = tk.Entry(frame, bg=self.themes[self.current_theme]["text_bg"],
+                               fg=self.themes[self.current_theme]["text_fg"], font=("Arial", 10))
+        hosts_entry.pack(pady=5, fill="x")
+        hosts_entry.insert(0, ", ".join(self.remote_hosts))
+
+        def start():
+            hosts = [h.strip() for h in hosts_entry.get().split(",") if h.strip()]
+            window.destroy()
+            if not hosts:
+                return
+            self.remote_hosts = hosts
+            self.save_settings()
+            job = self.scheduler.submit(os.path.join(self.reports_folder, f"{script} on {len(hosts)} hosts"),
+                                        action=lambda job: self.fan_out_script(script, hosts))
+            if job is None:
+                self.write_output(f"{script} is already running on those hosts\n")
+
+        tk.Button(frame, text="Run", command=start,
+                 bg=self.themes[self.current_theme]["title_bg"], fg=self.themes[self.current_theme]["title_fg"],
+                 font=("Arial", 10)).pack(pady=5)
+
+    def fan_out_script(self, script, hosts):
+        # Runs on a scheduler worker; every line is labelled with the host it came from
+        def on_event(host, event):
+            if event["event"] == "output":
+                self.write_output(f"[{host}] {event['line']}", "stderr" if event["stream"] == "stderr" else None)
+            elif event["event"] == "exit":
+                self.write_output(f"[{host}] exited with {event['code']} after {event['duration']:.2f}s"
+                                  + (" (timed out)" if event.get("timed_out") else "") + "\n",
+                                  "stderr" if event['code'] != 0 else None)
+            elif event["event"] == "error":
+                self.write_output(f"[{host}] error: {event['message']}\n", "stderr")
+
+        results = asyncio.run(fan_out(hosts, script, self.remote_concurrency, self.script_timeouts.get(script),
+                                      self.remote_host_timeout, self.agent_token, on_event))
+        failed = [host for host, result in results.items() if host_failed(result)]
+        self.write_output(f"{script}: {len(hosts) - len(failed)} of {len(hosts)} hosts succeeded"
+                          + (f"; failed: {', '.join(failed)}" if failed else "") + "\n\n")
+
     def open_script(self):
         file_path = filedialog.askopenfilename(
             initialdir=self.scripts_folder,
-            title="Open Batch Script",
-            filetypes=(("Batch files", "*.bat"), ("All files", "*.*"))
+            title="Open Script",
+            filetypes=(("Scripts", " ".join("*" + e for e in self.interpreter.extensions)), ("All files", "*.*"))
         )
         if file_path:
             file_name = os.path.basename(file_path)
+            if self.open_if_too_large(file_path):
+                return
+            self.highlighter.enabled = file_name.lower().endswith(BATCH_EXTENSIONS)
             self.editor_text.delete("1.0", tk.END)
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
                     self.editor_text.insert("end", f.read())
                 self.current_script = file_name
-                self.update_file_list()
-                for i in range(self.file_listbox.size()):
-                    if self.file_listbox.get(i) == file_name:
-                        self.file_listbox.select_clear(0, tk.END)
-                        self.file_listbox.select_set(i)
-                        break
-                self.output_text.insert("end", f"Opened {file_name}\n")
+                self.refresh_catalog()
+                self.select_file(file_name)
+                self.write_output(f"Opened {file_name}\n")
             except Exception as e:
                 self.editor_text.insert("end", f"Error opening {file_name}: {str(e)}\n")
                 self.current_script = None
 
+    def close_app(self):
+        if self.timers:
+            self.timers.stop()
+        self.interpreter.close()
+        self.settings.flush()
+        self.root.quit()
+
     def start_drag(self, event, window=None):
         window = window or self.root
         self.x = event.x
@@ -528,70 +1471,450 @@ class UpKeepApp:
         window.geometry(f"+{x}+{y}")
 
     def create_button(self, frame, text, script_path, command=None):
+        btn = ttk.Button(frame, width=15, text=text)
         if command is None and script_path:
             full_path = os.path.join(self.scripts_folder, script_path)
-            command = lambda: self.run_script(full_path)
-        btn = ttk.Button(frame, text=text, command=command, width=15)
+            command = lambda: self.run_script(full_path, refresh=self.shift_click)
+        # The press binding runs before the button's command fires on release, so commands
+        # can tell a Shift+click (fresh run of a cached script, or a Clean Temp dry run as a shortcut)
+        btn.bind("<Button-1>", lambda e: setattr(self, 'shift_click', False))
+        btn.bind("<Shift-Button-1>", lambda e: setattr(self, 'shift_click', True))
+        btn.config(command=command)
         btn.pack(pady=5)
 
-    def run_script(self, script_path):
+    def run_script(self, script_path, refresh=False):
         if not os.path.exists(script_path):
-            self.output_text.insert("end", f"Error: {script_path} not found!\n")
+            self.write_output(f"Error: {script_path} not found!\n")
             return
-        self.output_text.insert("end", f"Running {os.path.basename(script_path)}...\n")
-        thread = threading.Thread(target=self.execute_script, args=(script_path,))
-        thread.start()
-
-    def execute_script(self, script_path):
+        name = os.path.basename(script_path)
+        ttl = self.cached_scripts.get(name)
+        if ttl and not refresh and self.replay_cached(script_path, ttl):
+            return
+        job = self.scheduler.submit(script_path, timeout=self.script_timeouts.get(name))
+        if job is None:
+            self.write_output(f"{name} is already running or queued\n")
+            return
+        self.write_output(f"Queued {name}\n")
+
+    def replay_cached(self, script_path, ttl):
+        # Shows a fresh cached result instead of queueing the script; False if there is none
+        entry = self.result_cache.get(script_path, file_hash(script_path), ttl)
+        if entry is None:
+            return False
+        name = os.path.basename(script_path)
+        age = int(time.time() - entry['created'])
+        self.write_output(f"{name} (cached {age}s ago, Shift+click to refresh)\n")
+        for line, stream in entry['output']:
+            self.write_output(line, "stderr" if stream == "stderr" else None)
+        self.write_output("\n")
+        return True
+
+    def execute_script(self, job):
+        if job.cancelled:
+            return
+        # Output written from this worker thread belongs to this run (see write_output)
+        self.worker_run.run_id = job.run_id
+        self.write_output(f"Running {job.name}...\n")
         try:
-            process = subprocess.Popen(
-                ['cmd.exe', '/c', script_path],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            while True:
-                line = process.stdout.readline()
-                if not line and process.poll() is not None:
-                    break
-                if line:
-                    self.output_text.insert("end", line)
-                    self.output_text.see("end")
-            errors = process.stderr.read()
-            if errors:
-                self.output_text.insert("end", "Errors:\n" + errors)
-            process.wait()
-            process.stdout.close()
-            process.stderr.close()
-            self.output_text.insert("end", f"Finished running {os.path.basename(script_path)}\n\n")
-            self.output_text.see("end")
+            if job.action:
+                job.action(job)
+                return
+            content_hash = file_hash(job.script_path)
+            capture = OutputCapture()
+            # Only scripts listed in cached_scripts keep their whole output
+            cached = [] if job.name in self.cached_scripts else None
+
+            def on_output(line, stream):
+                capture.feed(line, stream)
+                if cached is not None:
+                    cached.append((line, stream))
+                self.write_output(line, "stderr" if stream == "stderr" else None, job.run_id)
+
+            self.sampler.watch(job)
+            try:
+                run_job(job, self.interpreter, on_output)
+            finally:
+                self.sampler.unwatch(job)
+            self.history.append(run_record(job, capture, content_hash))
+            if cached is not None:
+                self.result_cache.put_run(job, content_hash, cached)
+            if job.timed_out:
+                self.write_output(f"{job.name} timed out after {job.timeout}s and was stopped\n\n", "stderr")
+            elif job.cancelled:
+                self.write_output(f"Cancelled {job.name}\n\n", "stderr")
+            else:
+                self.write_output(f"Finished running {job.name}{self.resource_summary(job)}\n\n")
         except Exception as e:
-            self.output_text.insert("end", f"Error: {str(e)}\n")
+            self.write_output(f"Error: {str(e)}\n")
+        finally:
+            self.worker_run.run_id = None
+
+    def resource_summary(self, job):
+        if not job.resources or not job.resources['samples']:
+            return ""
+        return (f" (CPU {job.resources['cpu_seconds']:.1f}s, peak RSS "
+                f"{format_bytes(job.resources['peak_rss'])})")
+
+    def open_history(self):
+        HistoryWindow(self, self.history)
+
+    def run_diagnostic_report(self):
+        # Shares diagnostic.bat's scheduler slot so the report can't run twice at once
+        script_path = os.path.join(self.scripts_folder, "diagnostic.bat")
+        job = self.scheduler.submit(script_path, action=self.collect_diagnostics)
+        if job is None:
+            self.write_output("Diagnostic Report is already running or queued\n")
+            return
+        self.write_output("Queued Diagnostic Report\n")
+
+    def clean_temp(self, dry_run=False):
+        # Shares cleantemp.bat's scheduler slot, so the script and the built-in cleaner never overlap
+        script_path = os.path.join(self.scripts_folder, "cleantemp.bat")
+        job = self.scheduler.submit(script_path, action=lambda job: self.run_temp_cleaner(job, dry_run))
+        if job is None:
+            self.write_output("Clean Temp is already running or queued\n")
+            return
+        self.write_output("Queued Clean Temp" + (" (dry run)" if dry_run else "") + "\n")
+
+    def run_temp_cleaner(self, job, dry_run):
+        config = self.temp_cleaner
+        cleaner = TempCleaner(config.get('roots'), config.get('min_age', "1d"), config.get('include'),
+                              config.get('exclude'), config.get('workers', 8), config.get('remove_empty_dirs', True))
+        # Progress lines come at most once a second, however many files there are
+        on_progress = lambda progress: self.write_output(format_progress(progress) + "\n")
+        should_stop = lambda: job.cancelled
+        self.write_output(f"Scanning {', '.join(cleaner.roots)}...\n")
+        plan = cleaner.scan(on_progress, should_stop)
+        for folder, totals in largest_directories(plan):
+            self.write_output(f"{format_bytes(totals['bytes']):>10}  {folder} ({totals['files']} files)\n")
+        if job.cancelled:
+            self.write_output("Cancelled Clean Temp\n\n", "stderr")
+            return
+        if dry_run:
+            self.write_output("Dry run, nothing was deleted (untick \"Dry run\" to clean)\n\n")
+            return
+        result = cleaner.delete(plan, on_progress, should_stop)
+        self.write_output(format_result(result) + "\n\n", "stderr" if result['stopped'] else None)
+
+    def collect_diagnostics(self, job):
+        self.write_output("Starting System Diagnostic Report...\n")
+        report_path, summary = run_diagnostics(
+            self.reports_folder, load_collectors(self.diagnostic_collectors),
+            on_section=lambda result: self.write_output(
+                f"{result['section']}: {result['status']} ({result['duration']:.1f}s)\n",
+                None if result['status'] == "ok" else "stderr"),
+            should_stop=lambda: job.cancelled)
+        self.report_store.add(report_path, summary)
+        archived = self.report_store.apply_retention()
+        if archived:
+            self.write_output(f"Archived {len(archived)} old report(s) to {self.report_store.archive_folder}\n")
+        self.write_output(f"Report saved as: {report_path}\n\n")
+
+    def mark_queue_dirty(self):
+        # Called from worker threads; the listbox is refreshed on the next poll_output tick
+        self.queue_dirty = True
+
+    def refresh_queue_view(self):
+        self.queue_dirty = False
+        self.queue_refreshed = time.time()
+        selection = self.queue_listbox.curselection()
+        selected = self.queue_jobs[selection[0]] if selection and selection[0] < len(self.queue_jobs) else None
+        running, pending = self.scheduler.jobs()
+        self.queue_jobs = running + pending
+        self.queue_listbox.delete(0, tk.END)
+        for job in running:
+            status = f"Running  {job.name} ({int(self.queue_refreshed - job.started)}s)"
+            if job.sample:
+                status += f"  {format_sample(job.sample)}"
+            self.queue_listbox.insert(tk.END, status)
+        for job in pending:
+            self.queue_listbox.insert(tk.END, f"Queued   {job.name}")
+        if selected in self.queue_jobs:
+            self.queue_listbox.select_set(self.queue_jobs.index(selected))
+
+    def cancel_selected_job(self):
+        selection = self.queue_listbox.curselection()
+        if not selection or selection[0] >= len(self.queue_jobs):
+            self.write_output("Select a running or queued job to cancel\n")
+            return
+        job = self.queue_jobs[selection[0]]
+        # A running job that is cancelled ends up "cancelled" too, once its worker lets go
+        queued = job.state == "pending"
+        self.scheduler.cancel(job)
+        if queued and job.state == "cancelled":
+            self.write_output(f"Removed {job.name} from the queue\n")
+
+    def write_output(self, text, tag=None, run=None):
+        # Safe from any thread; the text shows up on the next poll_output tick. run defaults
+        # to the job the calling scheduler worker is running, if any.
+        if run is None:
+            run = getattr(self.worker_run, 'run_id', None)
+        self.output_queue.put((text, tag, run))
+
+    def poll_output(self):
+        chunks = []
+        try:
+            while len(chunks) < self.output_batch_lines:
+                chunks.append(self.output_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if chunks:
+            stream_filter, run_filter = self.output_filter
+            # Merge runs of the same tag so a whole batch is a single insert call
+            args = []
+            for text, tag, run in chunks:
+                if not text.endswith("\n"):
+                    text += "\n"  # Keeps widget lines and store lines one-to-one
+                stream = "stderr" if tag == "stderr" else "stdout"
+                first = self.output_store.append(text, stream, run)
+                if run is not None:
+                    self.latest_run = run
+                if not self.output_follow or (stream_filter and stream != stream_filter) or \
+                        (run_filter is not None and run != run_filter):
+                    continue
+                self.output_seqs.extend(range(first, self.output_store.next_seq))
+                if args and args[-1] == (tag or ()):
+                    args[-2] += text
+                else:
+                    args.extend([text, tag or ()])
+            if args:
+                self.output_text.insert("end", *args)
+                self.trim_output()
+                self.output_text.see("end")
+        # Redraw on changes, and once a second while jobs run so elapsed times tick
+        if self.queue_dirty or (self.scheduler.running and time.time() - self.queue_refreshed >= 1):
+            self.refresh_queue_view()
+        # Come straight back while there is a backlog, otherwise idle at the normal rate
+        delay = 1 if len(chunks) == self.output_batch_lines else self.output_poll_ms
+        self.root.after(delay, self.poll_output)
+
+    def trim_output(self):
+        # Every inserted line ends in a newline, so "end-2c" sits on the last line with text
+        line_count = int(self.output_text.index("end-2c").split(".")[0])
+        excess = line_count - self.output_line_cap
+        if excess > 0:
+            self.output_text.delete("1.0", f"{excess + 1}.0")
+            del self.output_seqs[:excess]
+
+    def output_filters(self):
+        # (stream, run) for the filter checkboxes; "this run" is the selected job, else the latest run
+        run = None
+        if self.this_run_var.get():
+            selection = self.queue_listbox.curselection()
+            if selection and selection[0] < len(self.queue_jobs):
+                run = self.queue_jobs[selection[0]].run_id
+            else:
+                run = self.latest_run
+        return ("stderr" if self.stderr_only_var.get() else None), run
+
+    def render_output(self, seqs=None):
+        # Refills output_text from the store: the latest lines passing the filters, or seqs.
+        # Without seqs the pane follows new output again. The filters are read here and then
+        # kept, so "this run" stays on the same run while others start.
+        self.output_follow = seqs is None
+        if seqs is None:
+            self.output_filter = self.output_filters()
+            self.search_key = None  # Search again on the next Find, with the new filters
+            seqs = self.output_store.tail(self.output_line_cap, *self.output_filter)
+        args = []
+        for seq in seqs:
+            text, stream, _ = self.output_store.line(seq)
+            tag = "stderr" if stream == "stderr" else ()
+            if args and args[-1] == tag:
+                args[-2] += text + "\n"
+            else:
+                args.extend([text + "\n", tag])
+        self.output_text.delete("1.0", "end")
+        if args:
+            self.output_text.insert("end", *args)
+        self.output_seqs = list(seqs)
+        if self.output_follow:
+            self.output_text.see("end")
+            self.search_status.configure(text="")
+
+    def find_output(self, step):
+        needle = self.search_entry.get()
+        if not needle:
+            return
+        stream_filter, run_filter = self.output_filter
+        key = (needle, self.search_regex_var.get(), stream_filter, run_filter)
+        if key != self.search_key:
+            try:
+                self.search_matches = self.output_store.search(needle, ignore_case=True, regex=key[1],
+                                                               stream=stream_filter, run=run_filter)
+            except re.error as e:
+                self.search_status.configure(text=f"Bad pattern: {e}")
+                return
+            self.search_key = key
+            # A new search starts from the newest match
+            self.search_index = len(self.search_matches)
+        # Lines dropped from the store since the search ran can no longer be shown
+        while self.search_matches and self.search_matches[0][0] < self.output_store.first_seq:
+            self.search_matches.pop(0)
+            self.search_index -= 1
+        if not self.search_matches:
+            self.search_status.configure(text="No matches")
+            return
+        self.search_index = min(max(self.search_index + step, 0), len(self.search_matches) - 1)
+        self.show_match(*self.search_matches[self.search_index])
+        self.search_status.configure(text=f"{self.search_index + 1} of {len(self.search_matches)}"
+                                     + ("" if len(self.search_matches) < 10000 else "+"))
+
+    def show_match(self, seq, start, end):
+        position = bisect_left(self.output_seqs, seq)
+        if position == len(self.output_seqs) or self.output_seqs[position] != seq:
+            # Older than what the pane holds: show a window of the store around the match
+            stream_filter, run_filter = self.output_filter
+            half = self.output_line_cap // 2
+            before = self.output_store.tail(half, stream_filter, run_filter, before=seq)
+            after = self.output_store.select(seq, seq + half * 4, stream_filter, run_filter)[:half]
+            self.render_output(before + after)
+            position = len(before)
+        line = position + 1
+        self.output_text.tag_remove("match", "1.0", "end")
+        self.output_text.tag_add("match", f"{line}.{start}", f"{line}.{end}")
+        self.output_text.see(f"{line}.{start}")
 
     def view_latest_report(self):
-        report_files = [f for f in os.listdir(self.reports_folder) if f.startswith("Diagnostic_Report_") and f.endswith(".txt")]
-        if not report_files:
-            self.output_text.insert("end", "No diagnostic reports found.\n")
-            self.output_text.see("end")
+        latest = self.report_store.latest()
+        if latest is None:
+            self.write_output("No diagnostic reports found.\n")
             return
-        latest_report = max(report_files, key=lambda f: os.path.getctime(os.path.join(self.reports_folder, f)))
-        report_path = os.path.join(self.reports_folder, latest_report)
+        report_path = self.report_store.path(latest)
+        if self.open_viewer(report_path, latest.get("sections")):
+            self.write_output(f"Opening {latest['name']}...\n")
+
+    def open_viewer(self, path, sections=None):
         try:
-            subprocess.Popen(['notepad.exe', report_path], creationflags=subprocess.CREATE_NO_WINDOW)
-            self.output_text.insert("end", f"Opening {latest_report} in Notepad...\n")
-            self.output_text.see("end")
+            LargeFileViewer(self, path, sections)
+            return True
         except Exception as e:
-            self.output_text.insert("end", f"Error opening report: {str(e)}\n")
-            self.output_text.see("end")
+            self.write_output(f"Error opening {os.path.basename(path)}: {str(e)}\n")
+            return False
+
+    def compare_reports(self):
+        recent = self.report_store.recent(2)
+        if len(recent) < 2:
+            self.write_output("Need at least two diagnostic reports to compare.\n")
+            return
+        old_path, new_path = (self.report_store.path(e) for e in recent)
+        job = self.scheduler.submit(os.path.join(self.reports_folder, "Compare Reports"),
+                                    action=lambda job: self.write_report_diff(old_path, new_path))
+        if job is None:
+            self.write_output("Compare Reports is already running\n")
+
+    def write_report_diff(self, old_path, new_path):
+        self.write_output(f"Changes from {os.path.basename(old_path)} to {os.path.basename(new_path)}:\n")
+        for line in format_diff(diff_reports(old_path, new_path)):
+            tag = "stderr" if line.startswith("- ") else None
+            self.write_output(line + "\n", tag)
+        self.write_output("\n")
+
+    def run_named_pipeline(self, name):
+        try:
+            pipeline = load_pipelines(self.pipeline_definitions).get(name)
+        except (KeyError, TypeError, ValueError) as e:
+            self.write_output(f"Error in pipelines: {e}\n", "stderr")
+            return
+        if pipeline is None:
+            self.write_output(f"Error: no pipeline named {name}\n", "stderr")
+            return
+        job = self.scheduler.submit(os.path.join(self.settings_folder, f"Pipeline {name}"),
+                                    action=lambda job: self.execute_pipeline(job, pipeline))
+        if job is None:
+            self.write_output(f"Pipeline {name} is already running or queued\n")
+            return
+        self.write_output(f"Queued pipeline {name}\n")
+
+    def execute_pipeline(self, job, pipeline):
+        # Runs on a scheduler worker. Steps print as whole blocks when they finish, so the
+        # output of steps running side by side never interleaves. Each step claims its script
+        # on the scheduler, so it shows in the queue and never overlaps another run of it.
+        def on_step_done(step, result):
+            self.write_output(format_step(step, result) + "\n", None if result["status"] in ("ok", "skipped") else "stderr")
+            for line, stream in result["output"]:
+                self.write_output(line, "stderr" if stream == "stderr" else None)
+
+        results = run_pipeline(pipeline, self.scripts_folder, self.interpreter, self.script_timeouts, self.history,
+                               on_step_start=lambda step: self.write_output(f"Started {step.id}\n"),
+                               on_step_done=on_step_done, should_stop=lambda: job.cancelled,
+                               scheduler=self.scheduler)
+        counts = {}
+        for result in results.values():
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        summary = ", ".join(f"{count} {status}" for status, count in counts.items())
+        self.write_output(f"Pipeline {pipeline.name} finished: {summary}\n\n",
+                          None if pipeline_succeeded(results) else "stderr")
+
+    def updater(self):
+        return Updater(os.path.dirname(os.path.abspath(__file__)), self.settings_folder, self.update_url)
+
+    def check_for_updates(self):
+        try:
+            info = self.updater().check()
+        except UpdateError:
+            return  # Offline or no update server; not worth interrupting anyone for
+        if info["available"]:
+            self.write_output(f"UpKeep {info['version']} is available (installed: {info['current']}). "
+                              "Use Settings > Install Update to get it.\n")
+
+    def install_update(self):
+        if not self.update_url:
+            self.write_output("Update checks are turned off (update_url is not set)\n")
+            return
+        job = self.scheduler.submit(os.path.join(self.settings_folder, "Install Update"),
+                                    action=lambda job: self.apply_update())
+        if job is None:
+            self.write_output("An update is already being installed\n")
+
+    def apply_update(self):
+        updater = self.updater()
+        try:
+            info = updater.check()
+            if not info["available"]:
+                self.write_output(f"UpKeep {info['current']} is up to date.\n\n")
+                return
+            updated = updater.apply(info, on_status=lambda text: self.write_output(text + "\n"))
+        except UpdateError as e:
+            self.write_output(f"Update failed: {e}\n\n", "stderr")
+            return
+        self.write_output(f"Updated {len(updated)} files to {info['version']}. Restart UpKeep to use it.\n\n")
 
     def clear_output(self):
         self.output_text.delete("1.0", "end")
+        self.output_store = OutputStore(self.output_store_lines)
+        self.output_seqs = []
+        self.output_follow = True
+        self.search_matches = []
+        self.search_key = None
+        self.search_status.configure(text="")
+
+def read_version():
+    try:
+        with open("version.json", "r") as f:
+            return json.load(f).get("version")
+    except (OSError, ValueError):
+        return None
 
 def main():
-    root = tk.Tk()
-    app = UpKeepApp(root)
+    # --profile-startup [FILE] writes per-phase startup timings (default: reports/startup_profile.json)
+    profile_path = None
+    if len(sys.argv) > 1 and sys.argv[1] == "--profile-startup":
+        profile_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join("reports", "startup_profile.json")
+    profiler = StartupProfiler(STARTED, profile_path, read_version() if profile_path else None)
+    profiler.mark("imports")
+    with profiler.phase("tk_init"):
+        root = tk.Tk()
+    with profiler.phase("app_init"):
+        app = UpKeepApp(root, profiler)
+    if profile_path:
+        def first_paint():
+            # Idle callbacks run after Tk's pending redraws, so this is when the window is on screen
+            profiler.mark("first_paint")
+            profiler.write()
+        root.after_idle(lambda: root.after(0, first_paint))
     root.mainloop()
+    app.settings.flush()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,426 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Benchmarks for UpKeep's hot paths, run from the repository root:
+#     python benchmarks/bench.py [--quick] [--output results.json]
+#     python benchmarks/bench.py --baseline benchmarks/baseline.json [--threshold 0.25]
+#     python benchmarks/bench.py --save-baseline benchmarks/baseline.json
+# Everything runs in a throwaway folder with synthetic scripts and reports, so
+# results don't depend on the machine's own scripts or settings. The engine
+# benchmarks (report lookup, catalog refresh, run_job launch) need no display.
+# The app is driven through its real methods (run_script, poll_output,
+# update_file_list, view_latest_report) on a real Tk. Linux without a display
+# gets an Xvfb server if one is installed; otherwise the GUI benchmarks are
+# skipped. With --baseline the exit code is 1 when any metric is worse than the
+# baseline by more than the threshold, or when a baseline metric was not
+# measured this time.
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from upkeep_engine.catalog import ScriptCatalog
+from upkeep_engine.diagnostics import report_name
+from upkeep_engine.interpreters import InterpreterRegistry
+from upkeep_engine.profiling import StartupProfiler
+from upkeep_engine.reports import ReportStore
+from upkeep_engine.runner import ScriptJob, run_job
+
+MARKER = "upkeep-bench-ready"
+OUTPUT_SIZES = (10000, 100000, 1000000)
+QUICK_OUTPUT_SIZES = (10000, 100000)
+
+class Results:
+    def __init__(self, quick):
+        self.metrics = {}
+        self.skipped = {}
+        self.quick = quick
+
+    def add(self, name, value, unit, better="lower"):
+        self.metrics[name] = {"value": round(value, 3), "unit": unit, "better": better}
+        print(f"  {name:<36} {value:>14,.2f} {unit}", flush=True)
+
+    def skip(self, name, reason):
+        self.skipped[name] = reason
+        print(f"  {name:<36} skipped: {reason}", flush=True)
+
+    def as_json(self):
+        with open(os.path.join(ROOT, "version.json"), "r", encoding="utf-8") as f:
+            version = json.load(f).get("version")
+        return {"version": version, "recorded": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(), "platform": platform.platform(), "quick": self.quick,
+                "metrics": self.metrics, "skipped": self.skipped}
+
+def write_settings(folder, interpreter, shell_sessions):
+    # Nothing that reaches the network or runs on its own timer; no replay from the result cache
+    settings = {"update_url": None, "schedules": [], "cached_scripts": {}, "interpreter": interpreter,
+                "shell_sessions": shell_sessions, "report_retention": {"keep_count": None, "keep_days": None}}
+    os.makedirs(os.path.join(folder, "settings"), exist_ok=True)
+    with open(os.path.join(folder, "settings", "settings.json"), "w", encoding="utf-8") as f:
+        json.dump(settings, f, indent=4)
+
+def make_scripts(folder, count):
+    scripts = os.path.join(folder, "scripts")
+    os.makedirs(scripts, exist_ok=True)
+    # Valid for both cmd.exe and sh
+    with open(os.path.join(scripts, "bench_first.bat"), "w", encoding="utf-8") as f:
+        f.write(f"echo {MARKER}\n")
+    for index in range(count):
+        with open(os.path.join(scripts, f"bench_{index:05d}.bat"), "w", encoding="utf-8") as f:
+            f.write(f"echo script {index}\n")
+
+def make_reports(folder, count):
+    reports = os.path.join(folder, "reports")
+    os.makedirs(reports, exist_ok=True)
+    newest = datetime(2025, 6, 1, 12, 0, 0)
+    body = "".join(f"[{section}]\n" + "value line\n" * 20 for section in ("System", "Network", "Processes", "Disks"))
+    for index in range(count):
+        generated = newest - timedelta(minutes=index)
+        with open(os.path.join(reports, report_name(generated)), "w", encoding="utf-8", newline="\n") as f:
+            f.write(f"Generated on: {generated:%Y-%m-%d %H:%M:%S}\n" + body)
+
+def ensure_display():
+    # Returns (Xvfb process or None, reason the GUI can't run or None)
+    if os.name == "nt" or sys.platform == "darwin" or os.environ.get("DISPLAY"):
+        return None, None
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        return None, "no display and Xvfb is not installed"
+    number = 99
+    while os.path.exists(f"/tmp/.X11-unix/X{number}") or os.path.exists(f"/tmp/.X{number}-lock"):
+        number += 1
+    process = subprocess.Popen([xvfb, f":{number}", "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            return None, "Xvfb did not start"
+        time.sleep(0.05)
+    os.environ["DISPLAY"] = f":{number}"
+    return process, None
+
+def pump(root, done, timeout=600):
+    # Runs Tk's event loop until done() is true
+    deadline = time.perf_counter() + timeout
+    while not done():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("benchmark step did not finish")
+        root.update()
+
+def bench_startup(results, repeat, interpreter, shell_sessions):
+    # Each run is a new process in a fresh folder; first_paint is measured the same way as
+    # UpKeep.py --profile-startup
+    first_paint, process_ms = [], []
+    for _ in range(repeat):
+        folder = tempfile.mkdtemp(prefix="upkeep-bench-start-")
+        try:
+            write_settings(folder, interpreter, shell_sessions)
+            profile_path = os.path.join(folder, "startup_profile.json")
+            started = time.perf_counter()
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--startup-child", profile_path],
+                           cwd=folder, check=True, timeout=120)
+            process_ms.append((time.perf_counter() - started) * 1000)
+            with open(profile_path, "r", encoding="utf-8") as f:
+                phases = {p["phase"]: p for p in json.load(f)["phases"]}
+            first_paint.append(phases["first_paint"]["at_ms"])
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+    results.add("startup_first_paint_ms", statistics.median(first_paint), "ms")
+    results.add("startup_process_ms", statistics.median(process_ms), "ms")
+
+def startup_child(profile_path):
+    import UpKeep
+    profiler = StartupProfiler(UpKeep.STARTED, profile_path)
+    profiler.mark("imports")
+    with profiler.phase("tk_init"):
+        root = UpKeep.tk.Tk()
+    with profiler.phase("app_init"):
+        app = UpKeep.UpKeepApp(root, profiler)
+
+    def first_paint():
+        profiler.mark("first_paint")
+        profiler.write()
+        app.close_app()
+
+    root.after_idle(lambda: root.after(0, first_paint))
+    root.mainloop()
+    root.destroy()
+
+def bench_launch(results, app, root, repeat):
+    # Click to first line of output on screen: queueing, the worker, the interpreter and the poll tick
+    path = os.path.join(app.scripts_folder, "bench_first.bat")
+    latencies = []
+    for _ in range(repeat + 1):
+        store = app.output_store
+        scanned = [store.next_seq]
+
+        def seen():
+            for seq in range(max(scanned[0], store.first_seq), store.next_seq):
+                if store.line(seq)[0].strip() == MARKER:
+                    return True
+            scanned[0] = store.next_seq
+            return False
+
+        started = time.perf_counter()
+        app.run_script(path, refresh=True)
+        pump(root, seen, timeout=60)
+        latencies.append((time.perf_counter() - started) * 1000)
+        pump(root, lambda: not any(app.scheduler.jobs()), timeout=60)
+    results.add("launch_first_line_first_ms", latencies[0], "ms")
+    results.add("launch_first_line_ms", statistics.median(latencies[1:]), "ms")
+
+def bench_output(results, app, root, sizes):
+    # Lines queued by workers until they are in the store and the Text widget
+    for size in sizes:
+        app.clear_output()
+        store = app.output_store
+        target = store.next_seq + size
+        for index in range(size):
+            app.output_queue.put((f"output line {index} from the throughput benchmark\n", None, None))
+        started = time.perf_counter()
+        pump(root, lambda: store.next_seq >= target)
+        root.update_idletasks()  # The final redraw counts too
+        elapsed = time.perf_counter() - started
+        results.add(f"output_lines_per_sec_{size // 1000}k", size / elapsed, "lines/s", "higher")
+    app.clear_output()
+
+def close_viewers(root):
+    for widget in root.winfo_children():
+        if widget.winfo_class() == "Toplevel":
+            widget.destroy()
+    root.update()
+
+def bench_reports(results, app, root, repeat):
+    import UpKeep
+    # First lookup without an index (every report is opened once), then a new store loading
+    # the saved index, then lookups against the loaded index
+    started = time.perf_counter()
+    app.view_latest_report()
+    results.add("latest_report_cold_ms", (time.perf_counter() - started) * 1000, "ms")
+    close_viewers(root)
+    app.report_store = UpKeep.ReportStore(app.reports_folder)
+    started = time.perf_counter()
+    app.view_latest_report()
+    results.add("latest_report_index_load_ms", (time.perf_counter() - started) * 1000, "ms")
+    close_viewers(root)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        app.view_latest_report()
+        timings.append((time.perf_counter() - started) * 1000)
+        close_viewers(root)
+    results.add("latest_report_warm_ms", statistics.median(timings), "ms")
+
+def bench_file_list(results, app, root, repeat):
+    started = time.perf_counter()
+    app.build_tab(app.files_frame)  # Scans the scripts folder and fills the list
+    results.add("upeditor_first_build_ms", (time.perf_counter() - started) * 1000, "ms")
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        app.update_file_list()
+        timings.append((time.perf_counter() - started) * 1000)
+    root.update()
+    results.add("update_file_list_ms", statistics.median(timings), "ms")
+
+def bench_store(results, reports_folder, repeat):
+    # ReportStore.latest without an index, with a saved index, and against the loaded index
+    timings = {}
+    for phase in ("cold", "index_load"):
+        started = time.perf_counter()
+        ReportStore(reports_folder).latest()
+        timings[phase] = (time.perf_counter() - started) * 1000
+    store = ReportStore(reports_folder)
+    store.latest()
+    warm = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        store.latest()
+        warm.append((time.perf_counter() - started) * 1000)
+    results.add("store_latest_cold_ms", timings["cold"], "ms")
+    results.add("store_latest_index_load_ms", timings["index_load"], "ms")
+    results.add("store_latest_warm_ms", statistics.median(warm), "ms")
+
+def bench_catalog(results, scripts_folder, repeat):
+    catalog = ScriptCatalog(scripts_folder)
+    started = time.perf_counter()
+    catalog.refresh()
+    results.add("catalog_first_refresh_ms", (time.perf_counter() - started) * 1000, "ms")
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        catalog.refresh()
+        timings.append((time.perf_counter() - started) * 1000000)
+    results.add("catalog_refresh_unchanged_us", statistics.median(timings), "us")
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        catalog.refresh(force=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    results.add("catalog_rescan_ms", statistics.median(timings), "ms")
+
+def bench_run_job(results, scripts_folder, repeat, interpreter, shell_sessions):
+    # run_job call to the first line of output, without the GUI's queue and poll tick. The
+    # first run starts right after the sessions are asked for, like a click just after startup.
+    path = os.path.join(scripts_folder, "bench_first.bat")
+    registry = InterpreterRegistry(interpreter)
+    registry.start_sessions(shell_sessions)
+    latencies = []
+    try:
+        for _ in range(repeat + 1):
+            seen = threading.Event()
+            first_line = []
+
+            def on_output(line, stream):
+                if not seen.is_set() and line.strip() == MARKER:
+                    first_line.append(time.perf_counter())
+                    seen.set()
+
+            started = time.perf_counter()
+            run_job(ScriptJob(path), registry, on_output)
+            if not seen.is_set():
+                raise RuntimeError(f"{path} did not print {MARKER}")
+            latencies.append((first_line[0] - started) * 1000)
+    finally:
+        registry.close()
+    results.add("run_job_first_line_first_ms", latencies[0], "ms")
+    results.add("run_job_first_line_ms", statistics.median(latencies[1:]), "ms")
+
+def run_engine(results, args, interpreter):
+    folder = tempfile.mkdtemp(prefix="upkeep-bench-engine-")
+    try:
+        make_scripts(folder, args.scripts)
+        make_reports(folder, args.reports)
+        bench_store(results, os.path.join(folder, "reports"), args.repeat)
+        bench_catalog(results, os.path.join(folder, "scripts"), args.repeat)
+        bench_run_job(results, os.path.join(folder, "scripts"), args.repeat, interpreter, args.shell_sessions)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+def run_gui(results, args, interpreter):
+    import UpKeep
+    folder = tempfile.mkdtemp(prefix="upkeep-bench-")
+    previous = os.getcwd()
+    try:
+        write_settings(folder, interpreter, args.shell_sessions)
+        make_scripts(folder, args.scripts)
+        make_reports(folder, args.reports)
+        os.chdir(folder)  # The app keeps scripts, reports and settings relative to the working folder
+        root = UpKeep.tk.Tk()
+        app = UpKeep.UpKeepApp(root)
+        root.update()
+        try:
+            bench_launch(results, app, root, args.repeat)
+            bench_output(results, app, root, QUICK_OUTPUT_SIZES if args.quick else OUTPUT_SIZES)
+            bench_reports(results, app, root, args.repeat)
+            bench_file_list(results, app, root, args.repeat)
+        finally:
+            app.close_app()
+            root.destroy()
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(folder, ignore_errors=True)
+
+def compare(current, baseline, threshold):
+    # Prints each metric against the baseline; returns the names that regressed and the
+    # baseline metrics that were not measured
+    regressed = []
+    missing = []
+    print(f"\n{'Metric':<36} {'Baseline':>14} {'Now':>14} {'Change':>9}")
+    for name, metric in current["metrics"].items():
+        base = baseline.get("metrics", {}).get(name)
+        if base is None or not base["value"]:
+            print(f"{name:<36} {'-':>14} {metric['value']:>14,.2f} {'new':>9}")
+            continue
+        change = (metric["value"] - base["value"]) / base["value"]
+        worse = change > threshold if metric["better"] == "lower" else -change > threshold
+        if worse:
+            regressed.append(name)
+        print(f"{name:<36} {base['value']:>14,.2f} {metric['value']:>14,.2f} {change:>+8.1%}"
+              + ("  REGRESSION" if worse else ""))
+    for name in baseline.get("metrics", {}):
+        if name not in current["metrics"]:
+            missing.append(name)
+            print(f"{name:<36} missing" + (" (benchmarks skipped)" if current["skipped"] else ""))
+    return regressed, missing
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark UpKeep's hot paths")
+    parser.add_argument("--quick", action="store_true", help="fewer repeats and no 1M-line output run")
+    parser.add_argument("--repeat", type=int, default=None, help="runs per timing, median reported (default 10, quick 3)")
+    parser.add_argument("--interpreter", default=None,
+                        help="command that runs the synthetic scripts, e.g. \"sh\" (default: the app's default)")
+    parser.add_argument("--shell-sessions", type=int, default=2, help="warm shell sessions, as the setting (0 = off)")
+    parser.add_argument("--scripts", type=int, default=5000, help="synthetic scripts for update_file_list")
+    parser.add_argument("--reports", type=int, default=10000, help="synthetic reports for view_latest_report")
+    parser.add_argument("--output", default=None, help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=None, help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative change that counts as a regression (default 0.25 = 25%%)")
+    parser.add_argument("--save-baseline", default=None, metavar="FILE", help="also write the results here")
+    parser.add_argument("--startup-child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.startup_child:
+        startup_child(args.startup_child)
+        return 0
+    if args.repeat is None:
+        args.repeat = 3 if args.quick else 10
+    interpreter = args.interpreter.split() if args.interpreter else None
+
+    results = Results(args.quick)
+    print("Engine benchmarks", flush=True)
+    run_engine(results, args, interpreter)
+    xvfb, reason = ensure_display()
+    try:
+        if reason is None:
+            try:
+                import tkinter
+                tkinter.Tk().destroy()
+            except Exception as e:  # No tkinter, or Tk can't open the display
+                reason = f"Tk is not usable: {e}"
+        if reason is not None:
+            for name in ("startup", "launch", "output", "reports", "file_list"):
+                results.skip(name, reason)
+        else:
+            print("Cold startup", flush=True)
+            bench_startup(results, args.repeat, interpreter, args.shell_sessions)
+            print("In-app benchmarks", flush=True)
+            run_gui(results, args, interpreter)
+    finally:
+        if xvfb is not None:
+            xvfb.kill()
+
+    output = results.as_json()
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(output, f, indent=4)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressed, missing = compare(output, baseline, args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} metric(s) regressed by more than {args.threshold:.0%}: {', '.join(regressed)}")
+        if missing:
+            # A skipped benchmark proves nothing; comparing against it must not pass silently
+            print(f"\n{len(missing)} baseline metric(s) were not measured: {', '.join(missing)}")
+        if regressed or missing:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Shared fixtures. The tests only use upkeep_engine, so they run headless and
+# without tkinter; shell-based tests use sh in place of cmd.exe.
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def diagnostic_report(sections, generated="Sun 06/01/2025 12:00:00.00"):
+    # Bytes in the exact layout scripts/diagnostic.bat produces: CRLF line endings,
+    # "echo [Section] >> file" leaves a space after each header, "echo." a blank line
+    lines = ["=== UpKeep System Diagnostic Report === ", f"Generated on: {generated} ",
+             "============================== ", ""]
+    for name, body in sections.items():
+        lines.append(f"[{name}] ")
+        lines.extend(body)
+        lines.append("")
+    return ("\r\n".join(lines) + "\r\n").encode("utf-8")
+
+@pytest.fixture
+def write_report(tmp_path):
+    def write(name, sections, **kwargs):
+        path = tmp_path / name
+        path.write_bytes(diagnostic_report(sections, **kwargs))
+        return str(path)
+    return write
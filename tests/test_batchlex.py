@@ -0,0 +1,58 @@
+import pytest
+
+from upkeep_engine.batchlex import lex_line
+
+def tokens(line):
+    return [(tag, line[start:end]) for tag, start, end in lex_line(line)]
+
+def test_comments_and_labels():
+    assert tokens("  rem note") == [("bat_comment", "  rem note")]
+    assert tokens(":: note") == [("bat_comment", ":: note")]
+    assert tokens(":retry") == [("bat_label", ":retry")]
+
+def test_goto_and_call_targets():
+    assert tokens("goto :end") == [("bat_keyword", "goto"), ("bat_label", ":end")]
+    assert tokens("call :sub 1") == [("bat_keyword", "call"), ("bat_label", ":sub")]
+    assert tokens("call other.bat") == [("bat_keyword", "call"), ("bat_command", "other.bat")]
+
+def test_if_else():
+    assert tokens("if errorlevel 1 (goto fail) else goto done") == [
+        ("bat_keyword", "if"), ("bat_keyword", "errorlevel"), ("bat_keyword", "goto"), ("bat_label", "fail"),
+        ("bat_keyword", "else"), ("bat_keyword", "goto"), ("bat_label", "done")]
+    assert tokens(") else (") == [("bat_keyword", "else")]
+
+def test_echo_ends_with_its_block():
+    assert tokens("if exist x (echo yes) else (echo no)") == [
+        ("bat_keyword", "if"), ("bat_keyword", "exist"), ("bat_keyword", "echo"),
+        ("bat_keyword", "else"), ("bat_keyword", "echo")]
+    # Outside a block a ")" is just text
+    assert tokens("echo done :) if") == [("bat_keyword", "echo")]
+
+@pytest.mark.parametrize("line, command", [
+    ("ipconfig /all | findstr IPv4", "findstr"),
+    ("cd %TEMP% & del /q *.tmp", "del"),
+    ("ping -n 1 host && tracert host", "tracert"),
+    ("copy a b || xcopy a b", "xcopy"),
+    ("echo y| chkdsk c: /f", "chkdsk"),
+])
+def test_commands_after_separators(line, command):
+    assert ("bat_command", command) in tokens(line)
+
+def test_command_words():
+    assert tokens("@sfc /scannow") == [("bat_command", "sfc")]
+    assert tokens("for %%f in (*.log) do del %%f") == [
+        ("bat_keyword", "for"), ("bat_variable", "%%f"), ("bat_keyword", "in"), ("bat_keyword", "do"),
+        ("bat_command", "del"), ("bat_variable", "%%f")]
+    assert tokens("dir > nul 2>&1") == [("bat_command", "dir"), ("bat_redirect", ">"), ("bat_redirect", "2>&1")]
+
+def test_variables_inside_strings():
+    assert tokens('set "LOG=%TEMP%\\upkeep_%DATE%.log"') == [
+        ("bat_keyword", "set"), ("bat_string", '"LOG=%TEMP%\\upkeep_%DATE%.log"'),
+        ("bat_variable", "%TEMP%"), ("bat_variable", "%DATE%")]
+    assert tokens('if "!name!"=="" exit') == [
+        ("bat_keyword", "if"), ("bat_string", '"!name!"'), ("bat_variable", "!name!"), ("bat_string", '""'),
+        ("bat_keyword", "exit")]
+
+def test_echo_text_keeps_variables_and_redirects():
+    assert tokens('echo "%~dp0" > out.txt') == [
+        ("bat_keyword", "echo"), ("bat_variable", "%~dp0"), ("bat_redirect", ">")]
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from upkeep_engine.catalog import ScriptCatalog
+
+@pytest.fixture
+def folder(tmp_path):
+    for name in ("b.bat", "A.cmd", "notes.txt"):
+        (tmp_path / name).write_text("")
+    (tmp_path / "sub.bat").mkdir()
+    return tmp_path
+
+@pytest.fixture
+def scans(monkeypatch):
+    # Counts directory listings made through os.scandir
+    count = [0]
+    scandir = os.scandir
+
+    def counting(path):
+        count[0] += 1
+        return scandir(path)
+    monkeypatch.setattr(os, "scandir", counting)
+    return count
+
+def touch_folder(folder, step):
+    # Moves the folder's mtime on explicitly; two changes can land within its granularity
+    stat = os.stat(folder)
+    os.utime(folder, ns=(stat.st_atime_ns, stat.st_mtime_ns + step * 1000000000))
+
+def test_unchanged_folder_is_not_rescanned(folder, scans):
+    catalog = ScriptCatalog(str(folder))
+    assert catalog.refresh() == (["A.cmd", "b.bat"], [])
+    assert catalog.names == ["A.cmd", "b.bat"]
+    assert catalog.refresh() == ([], []) and catalog.refresh() == ([], [])
+    assert scans[0] == 1
+    assert catalog.refresh(force=True) == ([], [])
+    assert scans[0] == 2
+
+def test_listeners_get_added_and_removed_names(folder):
+    catalog = ScriptCatalog(str(folder))
+    changes = []
+    catalog.subscribe(lambda added, removed: changes.append((added, removed)))
+    catalog.refresh()
+    (folder / "c.ps1").write_text("")
+    (folder / "b.bat").unlink()
+    touch_folder(folder, 1)
+    catalog.refresh()
+    catalog.refresh()
+    assert changes == [(["A.cmd", "b.bat"], []), (["c.ps1"], ["b.bat"])]
+    assert catalog.names == ["A.cmd", "c.ps1"]
+
+def test_direct_add_and_remove(folder):
+    catalog = ScriptCatalog(str(folder))
+    catalog.refresh()
+    changes = []
+    catalog.subscribe(lambda added, removed: changes.append((added, removed)))
+    catalog.add("a.bat")
+    catalog.add("a.bat")
+    catalog.add("readme.txt")
+    catalog.remove("b.bat")
+    catalog.remove("b.bat")
+    assert changes == [(["a.bat"], []), ([], ["b.bat"])]
+    assert catalog.names == ["a.bat", "A.cmd"]
+    assert catalog.filter(" A ") == ["a.bat", "A.cmd"]
+    assert catalog.position("B.bat") == 2
+
+def test_missing_folder(tmp_path):
+    catalog = ScriptCatalog(str(tmp_path / "missing"))
+    assert catalog.refresh() == ([], [])
+    assert catalog.names == []
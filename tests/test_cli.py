@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+from upkeep_engine.cli import EXIT_FAILED, EXIT_OK, EXIT_USAGE, main
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="runs the scripts with sh")
+
+@pytest.fixture
+def folders(tmp_path):
+    scripts = tmp_path / "scripts"
+    scripts.mkdir()
+    (scripts / "good.bat").write_text("echo hello\n")
+    (scripts / "bad.bat").write_text("echo oops >&2\nexit 3\n")
+    (scripts / "slow.bat").write_text("sleep 5\n")
+    return ["--scripts-folder", str(scripts), "--reports-folder", str(tmp_path / "reports"),
+            "--settings-file", str(tmp_path / "settings.json")]
+
+def run(folders, *scripts, options=()):
+    return main(folders + ["run", *scripts, "--interpreter", "sh", "--sample-interval", "0", *options])
+
+def events(out):
+    return [json.loads(line) for line in out.splitlines()]
+
+def test_run_success(folders, capsys):
+    assert run(folders, "good.bat") == EXIT_OK
+    assert "[good.bat] hello" in capsys.readouterr().out
+
+def test_run_failure_exit_code(folders, capsys):
+    assert run(folders, "good.bat", "bad.bat", options=["--json"]) == EXIT_FAILED
+    exits = {e["script"]: e["code"] for e in events(capsys.readouterr().out) if e["event"] == "exit"}
+    assert exits == {"good.bat": 0, "bad.bat": 3}
+
+def test_run_json_events(folders, capsys):
+    run(folders, "bad.bat", options=["--json"])
+    kinds = [(e["event"], e.get("stream")) for e in events(capsys.readouterr().out)]
+    assert kinds == [("start", None), ("output", "stderr"), ("exit", None)]
+
+def test_missing_script_starts_nothing(folders, tmp_path, capsys):
+    assert run(folders, "good.bat", "missing.bat") == EXIT_USAGE
+    captured = capsys.readouterr()
+    assert "missing.bat not found" in captured.err
+    assert captured.out == ""
+    assert not (tmp_path / "reports").exists()  # No run was recorded
+
+def test_duplicate_script_is_a_usage_error(folders, capsys):
+    assert run(folders, "good.bat", "good.bat") == EXIT_USAGE
+    assert "listed more than once" in capsys.readouterr().err
+
+def test_timeout_stops_script(folders, capsys):
+    assert run(folders, "slow.bat", options=["--timeout", "0.5", "--json"]) == EXIT_FAILED
+    exit_event = events(capsys.readouterr().out)[-1]
+    assert exit_event["event"] == "exit" and exit_event["timed_out"]
+    assert exit_event["duration"] < 4
+
+def test_history_after_run(folders, capsys):
+    run(folders, "good.bat")
+    run(folders, "good.bat")
+    capsys.readouterr()
+    assert main(folders + ["history", "--json"]) == EXIT_OK
+    stats = json.loads(capsys.readouterr().out)
+    assert stats["good.bat"]["runs"] == 2 and stats["good.bat"]["failures"] == 0
+
+def test_list_and_latest_report(folders, capsys):
+    assert main(folders + ["list", "bad"]) == EXIT_OK
+    assert capsys.readouterr().out.split() == ["bad.bat"]
+    assert main(folders + ["latest-report"]) == EXIT_FAILED
+
+def test_reports_with_a_bad_date(folders, capsys):
+    assert main(folders + ["reports", "--since", "notadate"]) == EXIT_USAGE
+    assert "notadate" in capsys.readouterr().err
+
+def test_diagnose_with_bad_collectors(folders, tmp_path, capsys):
+    assert main(folders + ["diagnose", "--collectors", str(tmp_path / "missing.json")]) == EXIT_USAGE
+    assert "missing.json" in capsys.readouterr().err
+    malformed = tmp_path / "collectors.json"
+    for definitions in ([{"command": ["uptime"]}], {"section": "Uptime"}, [{"section": "Uptime", "command": 5}]):
+        malformed.write_text(json.dumps(definitions))
+        assert main(folders + ["diagnose", "--collectors", str(malformed)]) == EXIT_USAGE
+        assert capsys.readouterr().err.startswith("Error in collectors")
+
+def test_diff_with_a_missing_report(folders, tmp_path, write_report, capsys):
+    old = write_report("old.txt", {"One": ["a"]})
+    assert main(folders + ["diff", old, str(tmp_path / "nope.txt")]) == EXIT_USAGE
+    assert "nope.txt not found" in capsys.readouterr().err
@@ -0,0 +1,55 @@
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from upkeep_engine.diagnostics import Collector, load_collectors, run_collector, run_diagnostics
+from upkeep_engine.reports import ReportStore, scan_sections
+
+def python(code):
+    return [sys.executable, "-c", code]
+
+def test_sections_run_concurrently_with_their_own_timeouts(tmp_path):
+    collectors = [
+        Collector("Fast", python("print('fast')"), 10),
+        Collector("Slow", python("import time; time.sleep(0.8); print('slow')"), 10),
+        Collector("Hung", python("import time; time.sleep(30)"), 0.5),
+        Collector("Missing", ["upkeep-no-such-command"], 10),
+    ]
+    started = time.monotonic()
+    path, summary = run_diagnostics(str(tmp_path), collectors, now=datetime(2025, 6, 1, 12, 0, 0))
+    # Run one after another this would take at least 0.8 + 0.5 seconds
+    assert time.monotonic() - started < 1.25
+    assert os.path.basename(path) == "Diagnostic_Report_20250601_120000.txt"
+    status = {s["section"]: s["status"] for s in summary["sections"]}
+    assert status == {"Fast": "ok", "Slow": "ok", "Hung": "timeout", "Missing": "error"}
+    # Sections are written in the order they finish
+    assert [s["section"] for s in summary["sections"]].index("Fast") < \
+        [s["section"] for s in summary["sections"]].index("Slow")
+
+def test_summary_offsets_match_the_report(tmp_path):
+    collectors = [Collector("One", python("print('a\\nb')")), Collector("Two", python("print('c')"))]
+    path, summary = run_diagnostics(str(tmp_path), collectors)
+    with open(path, "rb") as f:
+        data = f.read()
+    for section in summary["sections"]:
+        text = data[section["offset"]:section["offset"] + section["length"]].decode()
+        assert text.startswith(f"[{section['section']}]\n")
+    assert {name: value[0] for name, value in scan_sections(path).items()} == \
+        {s["section"]: s["offset"] for s in summary["sections"]}
+    with open(os.path.splitext(path)[0] + ".json") as f:
+        assert json.load(f)["report"] == os.path.basename(path)
+    # The store reuses the sidecar instead of scanning the report
+    entry = ReportStore(str(tmp_path)).latest()
+    assert set(entry["sections"]) == {"One", "Two"}
+
+def test_cancelled_collector():
+    result = run_collector(Collector("Hung", python("import time; time.sleep(30)"), 60), should_stop=lambda: True)
+    assert result["status"] == "cancelled"
+    assert result["output"].endswith("(cancelled)\n")
+
+def test_load_collectors():
+    assert load_collectors(None)[0].section == "System Information"
+    custom = load_collectors([{"section": "Uptime", "command": ["uptime"]}])
+    assert custom[0].to_dict() == {"section": "Uptime", "command": ["uptime"], "timeout": 120}
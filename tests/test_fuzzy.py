@@ -0,0 +1,35 @@
+from upkeep_engine.fuzzy import fuzzy_filter, fuzzy_score, word_starts
+
+def ranked(query, names):
+    return [names[index] for index in fuzzy_filter(query, names)]
+
+def test_word_starts():
+    assert word_starts("Flush DNS") == {0, 6}
+    assert word_starts("flush_dns.bat") == {0, 6, 10}
+    assert word_starts("FlushDns") == {0, 5}
+
+def test_word_starts_rank_first():
+    assert ranked("fdns", ["flushdns backup", "Flush DNS"]) == ["Flush DNS", "flushdns backup"]
+    assert ranked("sc", ["Disk Cleanup", "System Check"]) == ["System Check", "Disk Cleanup"]
+
+def test_contiguous_beats_scattered():
+    assert ranked("net", ["New Event Tool", "Network Info", "Reset Winsock"]) == ["Network Info", "New Event Tool"]
+    assert fuzzy_score("info", "Network Info") > fuzzy_score("info", "Install New Font Overlay")
+
+def test_non_matches_are_dropped():
+    names = ["Flush DNS", "Network Info", "Reboot"]
+    assert ranked("zzz", names) == []
+    # Characters must appear in order
+    assert ranked("snf", names) == []
+    assert fuzzy_score("dnsf", "Flush DNS") is None
+
+def test_empty_query_keeps_the_configured_order():
+    names = ["b", "a", "c"]
+    assert fuzzy_filter("  ", names) == [0, 1, 2]
+    assert fuzzy_score("", "anything") == 0
+
+def test_equal_scores_keep_the_configured_order():
+    assert ranked("extra", ["Extra 2", "Extra 1", "Extra 10"]) == ["Extra 2", "Extra 1", "Extra 10"]
+
+def test_case_and_spaces_are_ignored():
+    assert ranked("FLUSH dns", ["Reboot", "Flush DNS"]) == ["Flush DNS"]
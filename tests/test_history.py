@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from upkeep_engine.history import RunHistory
+
+def record(script, duration, exit_code=0, **extra):
+    return dict({"script": script, "duration": duration, "exit_code": exit_code, "timed_out": False}, **extra)
+
+@pytest.fixture
+def history(tmp_path):
+    history = RunHistory(str(tmp_path / "history" / "run_history.jsonl"))
+    history.block_size = 16  # Records span several blocks when paging backwards
+    return history
+
+def test_pages_are_newest_first(history):
+    for number in range(5):
+        history.append(record("a.bat", 1.0, number=number))
+    first, before = history.page(limit=2)
+    assert [r["number"] for r in first] == [4, 3] and before > 0
+    second, before = history.page(before=before, limit=2)
+    assert [r["number"] for r in second] == [2, 1]
+    last, before = history.page(before=before, limit=2)
+    assert [r["number"] for r in last] == [0] and before == 0
+    assert [r["number"] for r in history.page(limit=10)[0]] == [4, 3, 2, 1, 0]
+
+def test_missing_file(history):
+    assert history.page() == ([], 0)
+    assert history.stats() == {}
+
+def test_stats_per_script(history):
+    for duration in (1.0, 2.0, 3.0, 4.0):
+        history.append(record("a.bat", duration))
+    history.append(record("b.bat", 0.5, exit_code=1))
+    history.append(record("b.bat", None, exit_code=0, timed_out=True))
+    stats = history.stats()
+    assert stats["a.bat"] == {"runs": 4, "failures": 0, "failure_rate": 0.0, "p50": 3.0, "p95": 4.0, "max": 4.0}
+    assert stats["b.bat"]["runs"] == 2 and stats["b.bat"]["failure_rate"] == 1.0
+    assert stats["b.bat"]["max"] == 0.5
+    # Later calls only fold in what was appended since
+    history.append(record("a.bat", 10.0))
+    assert history.stats()["a.bat"]["runs"] == 5 and history.stats()["a.bat"]["max"] == 10.0
+
+def test_truncated_last_line(history):
+    history.append(record("a.bat", 1.0, number=0))
+    with open(history.path, "a") as f:
+        f.write(json.dumps(record("a.bat", 2.0, number=1))[:20])  # Crashed mid-write
+    # A fresh RunHistory reading the file skips the broken line
+    reloaded = RunHistory(history.path)
+    assert [r["number"] for r in reloaded.page()[0]] == [0]
+    assert reloaded.stats()["a.bat"]["runs"] == 1
+    # The next record still gets a line of its own
+    reloaded.append(record("a.bat", 3.0, number=2))
+    assert [r["number"] for r in reloaded.page()[0]] == [2, 0]
+    assert reloaded.stats()["a.bat"]["runs"] == 2
@@ -0,0 +1,151 @@
+import os
+import time
+
+import pytest
+
+from upkeep_engine.interpreters import CMD_WRAPPER, InterpreterRegistry, SessionPool, ShellSession
+from upkeep_engine.procstat import ProcessSampler
+from upkeep_engine.runner import Interpreter, ScriptJob, kill_job, run_job
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="sessions are tested with sh")
+
+@pytest.fixture
+def script(tmp_path):
+    def write(name, text):
+        path = tmp_path / name
+        path.write_text(text)
+        return str(path)
+    return write
+
+@pytest.fixture
+def session():
+    session = ShellSession(Interpreter(["sh"]))
+    yield session
+    session.close()
+
+def collect(session, path, timeout=None):
+    output = []
+    job = ScriptJob(path, timeout)
+    code = session.run(job, lambda line, stream: output.append((stream, line)))
+    return job, code, output
+
+def test_registry_picks_interpreter_by_extension():
+    registry = InterpreterRegistry(["sh"], {".vbs": "cscript //nologo", ".py": None})
+    assert registry.resolve("a.bat") is registry.batch
+    assert registry.resolve("a.VBS").command == ["cscript", "//nologo"]
+    assert ".py" not in registry.extensions
+    assert registry.resolve("a.unknown") is registry.batch
+
+def test_session_output_and_exit_code(session, script):
+    job, code, output = collect(session, script("a.bat", "echo out\necho err >&2\nexit 4\n"))
+    assert code == 4 and job.returncode == 4
+    assert ("stdout", "out\n") in output and ("stderr", "err\n") in output
+    assert all(session.sentinel not in line for _, line in output)
+
+def test_last_line_without_newline(session, script):
+    _, code, output = collect(session, script("a.bat", "printf 'no newline'\n"))
+    assert code == 0
+    assert output == [("stdout", "no newline")]
+
+def test_scripts_do_not_leak_into_the_session(session, script, tmp_path):
+    collect(session, script("a.bat", f"LEAK=yes\nexport LEAK\ncd {tmp_path}\n"))
+    _, _, output = collect(session, script("b.bat", "echo \"[$LEAK]\"\npwd\n"))
+    assert output[0] == ("stdout", "[]\n")
+    assert output[1][1].strip() == session.cwd
+    assert session.runs == 2
+
+def test_cmd_scripts_run_inside_setlocal(tmp_path):
+    # Only the command text is checked here; cmd.exe itself isn't available
+    session = ShellSession.__new__(ShellSession)
+    session.kind, session.sentinel, session.cwd, session.wrapper = "cmd", "__s__", str(tmp_path), None
+    commands = session.script_commands(str(tmp_path / "a.bat"))
+    with open(session.wrapper, newline="") as f:
+        assert f.read() == CMD_WRAPPER
+    assert CMD_WRAPPER.startswith("@setlocal\r\n")
+    assert commands.startswith(f'@call "{session.wrapper}" "{tmp_path / "a.bat"}" <nul\n')
+    os.remove(session.wrapper)
+
+def test_timeout_kills_session(session, script):
+    started = time.monotonic()
+    job, _, _ = collect(session, script("a.bat", "sleep 10\n"), timeout=0.5)
+    assert job.timed_out
+    assert time.monotonic() - started < 5
+    assert not session.healthy
+
+def wait_for_idle(pool, count):
+    deadline = time.monotonic() + 10
+    while len(pool.idle) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def test_pool_recycles_sessions(script):
+    interpreter = Interpreter(["sh"])
+    pool = SessionPool(interpreter, size=1, max_runs=2)
+    interpreter.pool = pool
+    try:
+        pool.warm()
+        wait_for_idle(pool, 1)
+        first = pool.idle[0]
+        path = script("a.bat", "echo hi\n")
+        for _ in range(2):
+            assert run_job(ScriptJob(path), interpreter, lambda line, stream: None) == 0
+        # Two runs used up the session; a fresh one takes its place
+        wait_for_idle(pool, 1)
+        assert first.process.poll() is not None
+        assert pool.idle[0] is not first
+        # A failing script is not trusted to have left the shell clean either
+        second = pool.idle[0]
+        assert run_job(ScriptJob(script("b.bat", "exit 1\n")), interpreter, lambda line, stream: None) == 1
+        wait_for_idle(pool, 1)
+        assert second.process.poll() is not None
+    finally:
+        pool.close()
+
+def test_late_cancel_leaves_the_pooled_session_alone(script):
+    interpreter = Interpreter(["sh"])
+    pool = SessionPool(interpreter, size=1)
+    interpreter.pool = pool
+    try:
+        pool.warm()
+        wait_for_idle(pool, 1)
+        session = pool.idle[0]
+        job = ScriptJob(script("a.bat", "echo hi\n"))
+        assert run_job(job, interpreter, lambda line, stream: None) == 0
+        # The session is back in the pool; cancelling the finished job must not kill it
+        assert job.process is None
+        kill_job(job)
+        assert session.process.poll() is None and pool.idle == [session]
+    finally:
+        pool.close()
+
+def test_pool_falls_back_to_a_new_process(script):
+    interpreter = Interpreter(["sh"])
+    interpreter.pool = SessionPool(interpreter, size=1)  # Not warmed: no idle session
+    try:
+        job = ScriptJob(script("a.bat", "echo $$\n"))
+        output = []
+        assert run_job(job, interpreter, lambda line, stream: output.append(line)) == 0
+        assert output and job.process is not None and job.process.poll() == 0
+    finally:
+        interpreter.pool.close()
+
+def test_session_runs_only_count_their_own_cpu(script):
+    interpreter = Interpreter(["sh"])
+    pool = SessionPool(interpreter, size=1)
+    interpreter.pool = pool
+    sampler = ProcessSampler(0.05)
+    try:
+        pool.warm()
+        wait_for_idle(pool, 1)
+        busy = ScriptJob(script("busy.bat", "i=0\nwhile [ $i -lt 300000 ]; do i=$((i+1)); done\nsleep 0.3\n"))
+        idle = ScriptJob(script("idle.bat", "sleep 0.5\n"))
+        for job in (busy, idle):
+            sampler.watch(job)
+            run_job(job, interpreter, lambda line, stream: None)
+            sampler.unwatch(job)
+        if not busy.resources["samples"] or not idle.resources["samples"]:
+            pytest.skip("no resource backend on this system")
+        assert busy.resources["cpu_seconds"] > 0.1
+        # Same shell, but the earlier run's CPU is not counted again
+        assert idle.resources["cpu_seconds"] < busy.resources["cpu_seconds"] / 2
+    finally:
+        pool.close()
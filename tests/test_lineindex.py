@@ -0,0 +1,65 @@
+import pytest
+
+from upkeep_engine.lineindex import LineIndex
+
+@pytest.fixture
+def index(tmp_path):
+    opened = []
+
+    def open_index(data, chunk_size=None):
+        path = tmp_path / "file.txt"
+        path.write_bytes(data)
+        index = LineIndex(str(path))
+        if chunk_size:
+            index.chunk_size = chunk_size
+        index.build()
+        opened.append(index)
+        return index
+    yield open_index
+    for index in opened:
+        index.close()
+
+def test_mixed_line_endings(index):
+    lines = index(b"one\r\ntwo\nthree\r\n\nfive\n", chunk_size=3)
+    assert list(lines.offsets) == [0, 5, 9, 16, 17, 22]
+    assert lines.line_count() == 5
+    assert lines.lines(0, 10) == ["one", "two", "three", "", "five"]
+    assert lines.lines(2, 2) == ["three", ""]
+
+def test_last_line_without_newline(index):
+    lines = index(b"first\r\nlast")
+    assert lines.line_count() == 2
+    assert lines.lines(1, 1) == ["last"]
+    assert lines.line_at(lines.size - 1) == 1
+
+def test_empty_file(index):
+    lines = index(b"")
+    assert lines.complete and lines.line_count() == 0
+    assert lines.lines(0, 10) == []
+    assert lines.search("x") is None and lines.search("x", backwards=True) is None
+
+def test_lines_are_readable_before_the_scan_ends(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"a\nb\nc\nd\n")
+    lines = LineIndex(str(path))
+    lines.chunk_size = 4
+    # Stop after the first chunk, as closing the viewer mid-scan would
+    lines.build(on_progress=lambda scanned, size: setattr(lines, "cancelled", True))
+    assert not lines.complete
+    assert lines.lines(0, 10) == ["a", "b"]
+    assert lines.search("c") is None
+    lines.close()
+
+def test_search_across_chunks(index):
+    body = b"".join(b"line %d\r\n" % number for number in range(1000)) + b"needle at the end"
+    lines = index(b"Needle at the start\n" + body, chunk_size=64)
+    assert lines.search("needle") == 0
+    assert lines.search("needle", start_line=1) == 1001
+    assert lines.search("needle", start_line=1, ignore_case=False) == 1001
+    assert lines.search("NEEDLE", start_line=1, ignore_case=False) is None
+    # Backwards the file is scanned in chunk_size windows; with every line tried, some hits
+    # straddle a window boundary
+    for number in range(100, 1000):
+        assert lines.search("line %d\r" % number, start_line=1001, backwards=True) == number + 1
+    assert lines.search("Needle", start_line=1001, backwards=True) == 0
+    assert lines.search("missing") is None
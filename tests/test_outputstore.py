@@ -0,0 +1,48 @@
+import re
+
+import pytest
+
+from upkeep_engine.outputstore import BLOCK_LINES, OutputStore
+
+def fill(store, count, text="line {}", stream="stdout", run=None):
+    store.append("".join(text.format(i) + "\n" for i in range(count)), stream, run)
+
+def test_lines_keep_stream_and_run():
+    store = OutputStore()
+    store.append("a\nb\n", "stdout", 1)
+    store.append("oops", "stderr", 2)
+    assert len(store) == 3
+    assert [store.line(seq) for seq in range(3)] == [("a", "stdout", 1), ("b", "stdout", 1), ("oops", "stderr", 2)]
+    assert store.select(0, 3, stream="stderr") == [2]
+    assert store.tail(5, run=1) == [0, 1]
+
+def test_oldest_blocks_are_dropped():
+    store = OutputStore(max_lines=BLOCK_LINES)
+    fill(store, BLOCK_LINES * 3)
+    assert store.first_seq > 0
+    assert len(store) >= BLOCK_LINES
+    assert store.line(store.next_seq - 1)[0] == f"line {BLOCK_LINES * 3 - 1}"
+
+def test_search_columns_and_filters():
+    store = OutputStore()
+    store.append("Reply from 10.0.0.1\n", "stdout", 1)
+    store.append("Request timed out\n", "stderr", 1)
+    assert store.search("from", regex=False) == [(0, 6, 10)]
+    assert store.search("re", ignore_case=True, stream="stderr") == [(1, 0, 2)]
+    assert store.search("r.*", run=2) == []
+    with pytest.raises(re.error):
+        store.search("(", regex=True)
+
+def test_search_limit_keeps_newest_matches():
+    store = OutputStore()
+    fill(store, BLOCK_LINES * 3, "match {}")
+    matches = store.search("match", limit=100)
+    assert len(matches) == 100
+    assert [seq for seq, _, _ in matches] == list(range(store.next_seq - 100, store.next_seq))
+
+def test_search_limit_spanning_blocks():
+    store = OutputStore()
+    fill(store, BLOCK_LINES * 2, "match {}")
+    limit = BLOCK_LINES + 10
+    seqs = [seq for seq, _, _ in store.search("match", limit=limit)]
+    assert seqs == list(range(store.next_seq - limit, store.next_seq))
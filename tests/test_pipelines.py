@@ -0,0 +1,137 @@
+import os
+import threading
+
+import pytest
+
+from upkeep_engine.pipelines import Pipeline, Step, format_step, load_pipelines, pipeline_succeeded, run_pipeline
+from upkeep_engine.runner import Interpreter
+from upkeep_engine.scheduler import ScriptScheduler
+
+def pipeline(*steps, **options):
+    return Pipeline("Test", [Step(script, after=after) for script, after in steps], **options)
+
+def test_topological_order_keeps_definition_order():
+    p = pipeline(("report.bat", ["a.bat", "b.bat"]), ("a.bat", None), ("b.bat", ["a.bat"]), ("c.bat", None))
+    assert p.order == ["a.bat", "c.bat", "b.bat", "report.bat"]
+    assert p.dependents("a.bat") == ["report.bat", "b.bat"]
+
+def test_cycles_and_unknown_steps_are_rejected():
+    with pytest.raises(ValueError, match="cycle: a.bat, b.bat"):
+        pipeline(("a.bat", ["b.bat"]), ("b.bat", ["a.bat"]), ("c.bat", None))
+    with pytest.raises(ValueError, match="unknown step 'missing.bat'"):
+        pipeline(("a.bat", ["missing.bat"]))
+    with pytest.raises(ValueError, match="appears twice"):
+        pipeline(("a.bat", None), ("a.bat", None))
+    with pytest.raises(ValueError, match="on_failure"):
+        pipeline(("a.bat", None), on_failure="retry")
+
+def test_load_pipelines():
+    loaded = load_pipelines([{"name": "Fix", "max_parallel": 0, "steps": [
+        {"script": "a.bat"}, {"script": "a.bat", "id": "again", "after": ["a.bat"], "timeout": 5}]}])
+    fix = loaded["Fix"]
+    assert fix.max_parallel == 1 and fix.on_failure == "stop"
+    assert fix.order == ["a.bat", "again"] and fix.steps["again"].timeout == 5
+
+needs_sh = pytest.mark.skipif(os.name == "nt", reason="runs the steps with sh")
+
+@pytest.fixture
+def scripts(tmp_path):
+    def write(**bodies):
+        for name, body in bodies.items():
+            (tmp_path / f"{name}.bat").write_text(body)
+        return str(tmp_path)
+    return write
+
+def run(p, folder, **kwargs):
+    return run_pipeline(p, folder, Interpreter(["sh"]), **kwargs)
+
+def statuses(results):
+    return {step_id: result["status"] for step_id, result in results.items()}
+
+@needs_sh
+def test_steps_run_after_their_dependencies(scripts, tmp_path):
+    log = tmp_path / "log"
+    folder = scripts(**{name: f"echo {name} >> '{log}'\n" for name in "abc"})
+    p = pipeline(("c.bat", ["b.bat"]), ("b.bat", ["a.bat"]), ("a.bat", None))
+    results = run(p, folder)
+    assert pipeline_succeeded(results)
+    assert log.read_text().split() == ["a", "b", "c"]
+    assert format_step(p.steps["a.bat"], results["a.bat"]).startswith("== a.bat: ok, exit 0 after ")
+
+@needs_sh
+def test_max_parallel_bounds_running_steps(scripts):
+    folder = scripts(**{name: "sleep 0.2\n" for name in ("a", "b", "c", "d", "e")})
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def started(step):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+
+    def done(step, result):
+        with lock:
+            active[0] -= 1
+
+    p = pipeline(*((f"{name}.bat", None) for name in "abcde"), max_parallel=2)
+    assert pipeline_succeeded(run(p, folder, on_step_start=started, on_step_done=done))
+    assert peak[0] == 2
+
+@needs_sh
+def test_stop_on_failure(scripts):
+    folder = scripts(ok="exit 0\n", bad="exit 3\n", later="exit 0\n")
+    p = pipeline(("ok.bat", None), ("bad.bat", None), ("later.bat", None), max_parallel=1)
+    results = run(p, folder)
+    assert statuses(results) == {"ok.bat": "ok", "bad.bat": "failed", "later.bat": "skipped"}
+    assert results["bad.bat"]["exit_code"] == 3
+    assert results["later.bat"]["reason"] == "an earlier step failed"
+    assert not pipeline_succeeded(results)
+
+@needs_sh
+def test_continue_skips_only_dependents(scripts):
+    folder = scripts(bad="exit 1\n", child="exit 0\n", grandchild="exit 0\n", other="exit 0\n")
+    p = pipeline(("bad.bat", None), ("child.bat", ["bad.bat"]), ("grandchild.bat", ["child.bat"]),
+                 ("other.bat", None), on_failure="continue")
+    results = run(p, folder)
+    assert statuses(results) == {"bad.bat": "failed", "child.bat": "skipped", "grandchild.bat": "skipped",
+                                 "other.bat": "ok"}
+    assert results["child.bat"]["reason"] == "bad.bat failed"
+
+@needs_sh
+def test_should_stop_cancels_running_steps(scripts):
+    folder = scripts(slow="sleep 30\n", next="exit 0\n")
+    started = threading.Event()
+    p = pipeline(("slow.bat", None), ("next.bat", ["slow.bat"]))
+    results = run(p, folder, on_step_start=lambda step: started.set(), should_stop=started.is_set)
+    assert statuses(results) == {"slow.bat": "cancelled", "next.bat": "skipped"}
+    assert results["slow.bat"]["duration"] < 10
+    assert results["next.bat"]["reason"] == "pipeline cancelled"
+
+@needs_sh
+def test_steps_claim_their_scripts_on_the_scheduler(scripts):
+    folder = scripts(busy="exit 0\n", a="sleep 0.2\n", b="sleep 0.2\n", c="sleep 0.2\n")
+    release = threading.Event()
+    scheduler = ScriptScheduler(lambda job: release.wait(5), workers=2)
+    outside = scheduler.submit(os.path.join(folder, "busy.bat"))
+    while outside.state != "running":
+        release.wait(0.01)
+    seen = []
+
+    def started(step):
+        running, _ = scheduler.jobs()
+        seen.append(sorted(job.name for job in running))
+
+    p = pipeline(("busy.bat", None), ("a.bat", None), ("b.bat", None), ("c.bat", None), max_parallel=3,
+                 on_failure="continue")
+    try:
+        results = run(p, folder, scheduler=scheduler, on_step_start=started)
+    finally:
+        release.set()
+    assert statuses(results) == {"busy.bat": "failed", "a.bat": "ok", "b.bat": "ok", "c.bat": "ok"}
+    assert results["busy.bat"]["output"] == [("Error: busy.bat is already running\n", "stderr")]
+    # The pipeline's steps show up as running jobs, and no more of them than the scheduler has workers
+    assert all("busy.bat" in names and len(names) <= 3 for names in seen)
+    assert any("a.bat" in names for names in seen)
+    assert outside.done.wait(5)
+    assert scheduler.jobs() == ([], [])
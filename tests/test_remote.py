@@ -0,0 +1,110 @@
+import asyncio
+import json
+import os
+import socket
+
+import pytest
+
+from upkeep_engine.remote import Agent, encode, fan_out, hash_token, host_failed, parse_host, token_matches
+from upkeep_engine.runner import Interpreter
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="agents run the scripts with sh")
+
+@pytest.fixture
+def scripts(tmp_path):
+    folder = tmp_path / "scripts"
+    folder.mkdir()
+    (folder / "hello.bat").write_text("echo hello from $0\n")
+    (folder / "fail.bat").write_text("exit 2\n")
+    (folder / "slow.bat").write_text("sleep 10\n")
+    (tmp_path / "secret.bat").write_text("echo secret\n")
+    return str(folder)
+
+def with_agent(scripts, test, token=None):
+    # Runs test(address) against an agent on a free loopback port
+    async def main():
+        agent = Agent(scripts, Interpreter(["sh"]), token=token)
+        ready = asyncio.get_running_loop().create_future()
+        server = asyncio.ensure_future(agent.serve("127.0.0.1", 0, lambda s: ready.set_result(s)))
+        address = "127.0.0.1:%d" % (await ready).sockets[0].getsockname()[1]
+        try:
+            return await test(address)
+        finally:
+            server.cancel()
+    return asyncio.run(main())
+
+async def raw_request(address, payload):
+    host, port = parse_host(address)
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(payload)
+    await writer.drain()
+    lines = [json.loads(line) for line in (await reader.read()).splitlines()]
+    writer.close()
+    return lines
+
+def test_parse_host():
+    assert parse_host("pc-01") == ("pc-01", 47600)
+    assert parse_host("pc-01:47601") == ("pc-01", 47601)
+    assert parse_host("[::1]:5000") == ("::1", 5000)
+    assert parse_host("::1") == ("::1", 47600)
+
+def test_fan_out_streams_output_and_exit_codes(scripts):
+    events = []
+    results = with_agent(scripts, lambda address: fan_out(
+        [address], "hello.bat", on_event=lambda host, event: events.append(event)))
+    result = list(results.values())[0]
+    assert result["event"] == "exit" and result["code"] == 0 and not host_failed(result)
+    assert [e["event"] for e in events] == ["start", "output", "exit"]
+    assert events[1]["line"].startswith("hello from")
+
+def test_failing_and_missing_scripts(scripts):
+    async def test(address):
+        return (await fan_out([address], "fail.bat"))[address], (await fan_out([address], "nope.bat"))[address]
+    failed, missing = with_agent(scripts, test)
+    assert failed["code"] == 2 and host_failed(failed)
+    assert missing == {"event": "error", "message": "nope.bat not found"}
+
+def test_only_bare_names_from_the_scripts_folder(scripts):
+    for name in ("../secret.bat", os.path.join(os.path.dirname(scripts), "secret.bat"), ".hidden"):
+        result = with_agent(scripts, lambda address: fan_out([address], name))
+        assert list(result.values())[0]["event"] == "error"
+
+@pytest.mark.parametrize("payload", [b"[]\n", b"\"x\"\n", b"1\n", b"null\n"])
+def test_request_that_is_not_an_object(scripts, payload):
+    lines = with_agent(scripts, lambda address: raw_request(address, payload))
+    assert lines == [{"event": "error", "message": "invalid request"}]
+
+def test_token_is_checked(scripts):
+    async def test(address):
+        wrong = (await fan_out([address], "hello.bat", token="nope"))[address]
+        right = (await fan_out([address], "hello.bat", token="s3cret"))[address]
+        return wrong, right
+    wrong, right = with_agent(scripts, test, token="s3cret")
+    assert wrong == {"event": "error", "message": "invalid token"}
+    assert right["code"] == 0
+
+def test_hashed_token(scripts):
+    stored = hash_token("s3cret")
+    assert stored.startswith("sha256:") and "s3cret" not in stored
+    assert token_matches(stored, "s3cret") and not token_matches(stored, stored)
+    result = with_agent(scripts, lambda address: fan_out([address], "hello.bat", token="s3cret"), token=stored)
+    assert list(result.values())[0]["code"] == 0
+
+def test_non_loopback_needs_token(scripts):
+    with pytest.raises(ValueError):
+        asyncio.run(Agent(scripts, Interpreter(["sh"])).serve("0.0.0.0", 0))
+
+def test_unreachable_and_slow_hosts(scripts):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        closed_port = probe.getsockname()[1]
+
+    async def test(address):
+        return await fan_out([address, f"127.0.0.1:{closed_port}"], "slow.bat", host_timeout=0.5)
+    results = with_agent(scripts, test)
+    slow, unreachable = results.values()
+    assert slow == {"event": "error", "message": "no result within 0.5s"}
+    assert unreachable["event"] == "error"
+
+def test_encode_is_one_line():
+    assert encode({"line": "a\nb"}).count(b"\n") == 1
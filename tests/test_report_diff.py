@@ -0,0 +1,38 @@
+from upkeep_engine.report_diff import WHOLE_REPORT, diff_reports, format_diff
+
+OLD = {
+    "System Information": ["Host Name:                 PC-01", "System Boot Time:          01/06/2025, 08:00:00"],
+    "Installed Software": ["Name  Version", "7-Zip 23.01"],
+    "Running Processes": ["chrome.exe                    1234 Console                    1    150,000 K"],
+}
+
+def test_changed_sections_in_diagnostic_bat_format(write_report):
+    new = dict(OLD)
+    new["Installed Software"] = ["Name  Version", "7-Zip 24.08"]
+    # Volatile values alone don't count as a change
+    new["System Information"] = ["Host Name:                 PC-01", "System Boot Time:          02/06/2025, 09:30:00"]
+    new["Running Processes"] = ["chrome.exe                    5678 Console                    1    210,000 K"]
+    old_path = write_report("Diagnostic_Report_20250601_120000.txt", OLD)
+    new_path = write_report("Diagnostic_Report_20250602_120000.txt", new, generated="Mon 06/02/2025 12:00:00.00")
+    results = {r["section"]: r for r in diff_reports(old_path, new_path)}
+    assert set(results) == set(OLD)
+    assert results["Installed Software"]["status"] == "changed"
+    assert results["Installed Software"]["added"] == ["7-Zip 24.08"]
+    assert results["Installed Software"]["removed"] == ["7-Zip 23.01"]
+    assert results["System Information"]["status"] == "unchanged"
+    assert results["Running Processes"]["status"] == "unchanged"
+
+def test_added_and_removed_sections(write_report):
+    new = {"System Information": OLD["System Information"], "Firewall": ["State ON"]}
+    results = {r["section"]: r["status"] for r in diff_reports(
+        write_report("a.txt", OLD), write_report("b.txt", new))}
+    assert results == {"System Information": "unchanged", "Firewall": "added",
+                       "Installed Software": "removed", "Running Processes": "removed"}
+
+def test_reports_without_sections_are_diffed_whole(tmp_path):
+    old_path, new_path = tmp_path / "old.txt", tmp_path / "new.txt"
+    old_path.write_bytes(b"Generated on: 1\r\nalpha\r\nbeta\r\n")
+    new_path.write_bytes(b"Generated on: 2\r\nalpha\r\ngamma\r\n")
+    results = diff_reports(str(old_path), str(new_path))
+    assert results == [{"section": WHOLE_REPORT, "status": "changed", "added": ["gamma"], "removed": ["beta"]}]
+    assert list(format_diff(results))[0] == f"[{WHOLE_REPORT}] changed: +1 -1"
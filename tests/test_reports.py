@@ -0,0 +1,44 @@
+import os
+
+from upkeep_engine.reports import ReportStore, scan_sections
+
+SECTIONS = {
+    "System Information": ["Host Name:                 PC-01", "OS Name:                   Microsoft Windows 11 Pro"],
+    "Network Configuration": ["Windows IP Configuration", "   Host Name . . . . . . . . . . . . : PC-01"],
+    "Running Processes": ["Image Name                     PID Session Name        Session#    Mem Usage"],
+}
+
+def test_scan_sections_reads_diagnostic_bat_headers(write_report):
+    path = write_report("Diagnostic_Report_20250601_120000.txt", SECTIONS)
+    sections = scan_sections(path)
+    assert list(sections) == list(SECTIONS)
+    with open(path, "rb") as f:
+        data = f.read()
+    for name, (offset, length) in sections.items():
+        text = data[offset:offset + length].decode()
+        assert text.startswith(f"[{name}] \r\n")
+        assert all(line in text for line in SECTIONS[name])
+
+def test_section_lengths_cover_the_report(write_report):
+    path = write_report("Diagnostic_Report_20250601_120000.txt", SECTIONS)
+    sections = list(scan_sections(path).values())
+    for (offset, length), (next_offset, _) in zip(sections, sections[1:]):
+        assert offset + length == next_offset
+    assert sections[-1][0] + sections[-1][1] == os.path.getsize(path)
+
+def test_store_indexes_sections_and_finds_latest(tmp_path, write_report):
+    write_report("Diagnostic_Report_20250601_120000.txt", SECTIONS)
+    write_report("Diagnostic_Report_20250602_120000.txt", SECTIONS)
+    store = ReportStore(str(tmp_path))
+    latest = store.latest()
+    assert latest["name"] == "Diagnostic_Report_20250602_120000.txt"
+    assert list(latest["sections"]) == list(SECTIONS)
+
+def test_retention_archives_oldest(tmp_path, write_report):
+    for day in (1, 2, 3):
+        write_report(f"Diagnostic_Report_2025060{day}_120000.txt", SECTIONS)
+    store = ReportStore(str(tmp_path), keep_count=2)
+    assert store.apply_retention() == ["Diagnostic_Report_20250601_120000.txt"]
+    assert os.path.exists(tmp_path / "archive" / "Diagnostic_Report_20250601_120000.txt.gz")
+    assert [e["name"] for e in store.recent(5)] == ["Diagnostic_Report_20250602_120000.txt",
+                                                   "Diagnostic_Report_20250603_120000.txt"]
@@ -0,0 +1,63 @@
+import os
+
+from upkeep_engine.resultcache import ResultCache
+from upkeep_engine.runner import ScriptJob
+
+OUTPUT = [("Ethernet: 10.0.0.2\n", "stdout")]
+
+def test_entries_expire_after_their_ttl():
+    cache = ResultCache()
+    cache.put("netinfo.bat", "h1", OUTPUT, 0, now=100)
+    assert cache.get("netinfo.bat", "h1", ttl=30, now=130)["output"] == OUTPUT
+    assert cache.get("netinfo.bat", "h1", ttl=30, now=131) is None
+    # Expired entries are dropped, not just hidden
+    assert len(cache) == 0 and cache.size == 0
+
+def test_a_changed_script_misses():
+    cache = ResultCache()
+    cache.put("netinfo.bat", "h1", OUTPUT, 0, now=100)
+    assert cache.get("netinfo.bat", "h2", ttl=30, now=100) is None
+    assert cache.get(os.path.abspath("netinfo.bat"), "h1", ttl=30, now=100) is not None
+
+def test_least_recently_used_entry_goes_first():
+    cache = ResultCache(max_entries=2)
+    cache.put("a.bat", "h", OUTPUT, 0, now=100)
+    cache.put("b.bat", "h", OUTPUT, 0, now=100)
+    assert cache.get("a.bat", "h", ttl=60, now=100)
+    cache.put("c.bat", "h", OUTPUT, 0, now=100)
+    assert [cache.get(name, "h", ttl=60, now=100) is not None for name in ("a.bat", "b.bat", "c.bat")] == \
+        [True, False, True]
+
+def test_size_limit():
+    cache = ResultCache(max_bytes=10)
+    assert not cache.put("big.bat", "h", [("x" * 11, "stdout")], 0)
+    assert cache.put("a.bat", "h", [("x" * 6, "stdout")], 0)
+    assert cache.put("b.bat", "h", [("x" * 6, "stdout")], 0)
+    assert len(cache) == 1 and cache.size == 6
+    # Replacing an entry doesn't count its old size twice
+    cache.put("b.bat", "h", [("x" * 4, "stdout")], 0)
+    assert len(cache) == 1 and cache.size == 4
+
+def test_invalidate_forgets_every_version():
+    cache = ResultCache()
+    cache.put("a.bat", "h1", OUTPUT, 0)
+    cache.put("a.bat", "h2", OUTPUT, 0)
+    cache.put("b.bat", "h1", OUTPUT, 0)
+    cache.invalidate("a.bat")
+    assert len(cache) == 1 and cache.get("b.bat", "h1", ttl=60)
+
+def finished(returncode=0, **flags):
+    job = ScriptJob("netinfo.bat")
+    job.returncode = returncode
+    for name, value in flags.items():
+        setattr(job, name, value)
+    return job
+
+def test_only_clean_runs_are_cached():
+    cache = ResultCache()
+    for job in (finished(1), finished(0, timed_out=True), finished(0, cancelled=True),
+                finished(None, error=OSError("gone"))):
+        assert not cache.put_run(job, "h", OUTPUT)
+    assert len(cache) == 0
+    assert cache.put_run(finished(0), "h", OUTPUT)
+    assert cache.get("netinfo.bat", "h", ttl=60)["exit_code"] == 0
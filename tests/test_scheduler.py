@@ -0,0 +1,75 @@
+import threading
+
+from upkeep_engine.scheduler import ScriptScheduler
+
+def test_same_script_is_not_queued_twice(tmp_path):
+    release = threading.Event()
+    scheduler = ScriptScheduler(lambda job: release.wait(5), workers=2)
+    first = scheduler.submit(str(tmp_path / "a.bat"))
+    assert scheduler.submit(str(tmp_path / "a.bat")) is None
+    other = scheduler.submit(str(tmp_path / "b.bat"))
+    assert other is not None
+    release.set()
+    assert first.done.wait(5) and other.done.wait(5)
+    # Once finished the script can run again
+    assert scheduler.submit(str(tmp_path / "a.bat")).done.wait(5)
+
+def test_workers_bound_concurrency(tmp_path):
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+    release = threading.Event()
+
+    def run(job):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        release.wait(0.2)
+        with lock:
+            active[0] -= 1
+
+    scheduler = ScriptScheduler(run, workers=2)
+    jobs = [scheduler.submit(str(tmp_path / f"{i}.bat")) for i in range(6)]
+    for job in jobs:
+        assert job.done.wait(5)
+    assert peak[0] == 2
+
+def test_failing_job_keeps_its_worker(tmp_path):
+    def run(job):
+        if job.name == "bad.bat":
+            raise RuntimeError("boom")
+
+    scheduler = ScriptScheduler(run, workers=1)
+    bad = scheduler.submit(str(tmp_path / "bad.bat"))
+    assert bad.done.wait(5)
+    assert bad.state == "failed" and str(bad.error) == "boom"
+    # The only worker is still alive and runs the next job
+    good = scheduler.submit(str(tmp_path / "good.bat"))
+    assert good.done.wait(5)
+    assert good.state == "done" and good.error is None
+    assert scheduler.jobs() == ([], [])
+
+def test_cancel_pending_job(tmp_path):
+    release = threading.Event()
+    scheduler = ScriptScheduler(lambda job: release.wait(5), workers=1)
+    running = scheduler.submit(str(tmp_path / "a.bat"))
+    queued = scheduler.submit(str(tmp_path / "b.bat"))
+    scheduler.cancel(queued)
+    assert queued.state == "cancelled" and queued.done.is_set()
+    release.set()
+    assert running.done.wait(5)
+
+def test_cancel_running_job(tmp_path):
+    started = threading.Event()
+
+    def run(job):
+        started.set()
+        while not job.cancelled:
+            job.done.wait(0.01)
+
+    scheduler = ScriptScheduler(run, workers=1)
+    job = scheduler.submit(str(tmp_path / "a.bat"))
+    assert started.wait(5)
+    scheduler.cancel(job)
+    assert job.done.wait(5)
+    assert job.state == "cancelled"
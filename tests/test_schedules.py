@@ -0,0 +1,132 @@
+import json
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from upkeep_engine.schedules import (STATE_NAME, CronSpec, MaintenanceScheduler, Schedule, load_schedules,
+                                     parse_cron_field, parse_duration)
+
+def at(*args):
+    return datetime(*args).timestamp()
+
+def moment(timestamp):
+    return datetime.fromtimestamp(timestamp)
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def timers(tmp_path, schedules, clock, dispatch=None):
+    return MaintenanceScheduler(schedules, dispatch or (lambda schedule: None), str(tmp_path), clock=clock,
+                                rand=lambda: 0.0)
+
+def test_durations():
+    assert parse_duration(90) == 90 and parse_duration("15m") == 900 and parse_duration(" 1H ") == 3600
+    with pytest.raises(ValueError):
+        parse_duration("soon")
+
+def test_cron_fields():
+    assert parse_cron_field("*", 0, 5) == {0, 1, 2, 3, 4, 5}
+    assert parse_cron_field("*/15", 0, 59) == {0, 15, 30, 45}
+    assert parse_cron_field("10-20/5,1", 0, 59) == {1, 10, 15, 20}
+    assert parse_cron_field("50/5", 0, 59) == {50, 55}
+    for field, low, high in (("60", 0, 59), ("0", 1, 31), ("5-2", 0, 59), ("13", 1, 12)):
+        with pytest.raises(ValueError):
+            parse_cron_field(field, low, high)
+    assert CronSpec("0 0 * * 7").weekdays == {0}
+    with pytest.raises(ValueError):
+        CronSpec("0 0 * *")
+
+def test_next_after_crosses_month_and_year():
+    assert moment(CronSpec("0 3 * * *").next_after(at(2025, 1, 31, 4, 0))) == datetime(2025, 2, 1, 3, 0)
+    assert moment(CronSpec("*/20 * * * *").next_after(at(2025, 12, 31, 23, 45))) == datetime(2026, 1, 1, 0, 0)
+    assert moment(CronSpec("@monthly").next_after(at(2025, 12, 1, 0, 0))) == datetime(2026, 1, 1, 0, 0)
+    # Day 31 only exists in some months
+    assert moment(CronSpec("30 12 31 * *").next_after(at(2025, 4, 1))) == datetime(2025, 5, 31, 12, 30)
+    assert moment(CronSpec("0 0 29 2 *").next_after(at(2025, 3, 1))) == datetime(2028, 2, 29, 0, 0)
+    # Both day fields restricted: either one matching is enough, as in crontab
+    assert moment(CronSpec("0 9 15 * 1").next_after(at(2025, 6, 1))) == datetime(2025, 6, 2, 9, 0)
+    with pytest.raises(ValueError):
+        CronSpec("0 0 31 2 *").next_after(at(2025, 1, 1))
+
+def test_load_schedules():
+    loaded = load_schedules([{"script": "a.bat", "every": "1h"}, {"script": "b.bat", "cron": "@daily"},
+                             {"script": "c.bat", "every": "1d", "enabled": False}])
+    assert [(s.script, s.describe()) for s in loaded] == [("a.bat", "every 3600s"), ("b.bat", "cron @daily")]
+    for definition in ({"script": "a.bat"}, {"script": "a.bat", "every": "1h", "cron": "@daily"},
+                       {"script": "a.bat", "every": 0}, {"script": "a.bat", "cron": 5}, {"every": "1h"},
+                       {"script": ["a.bat"], "every": "1h"}, "a.bat"):
+        with pytest.raises(ValueError):
+            load_schedules([definition])
+
+def test_broken_entries_are_skipped_with_on_error():
+    errors = []
+    loaded = load_schedules([{"script": "a.bat", "cron": 300}, {"script": "b.bat", "every": "1h"}, None],
+                            on_error=errors.append)
+    assert [s.script for s in loaded] == ["b.bat"]
+    assert len(errors) == 2 and errors[0].startswith('{"script": "a.bat", "cron": 300}')
+
+def test_first_run_waits_for_the_first_due_time(tmp_path):
+    clock = Clock(at(2025, 6, 1, 12, 0))
+    scheduler = timers(tmp_path, [Schedule("a.bat", every="1h")], clock)
+    assert scheduler.due_now() == []
+    clock.now += 3600
+    assert [s.script for s in scheduler.due_now()] == ["a.bat"]
+
+def test_missed_runs_coalesce_after_a_clock_jump(tmp_path):
+    clock = Clock(at(2025, 6, 1, 12, 0))
+    schedule = Schedule("a.bat", every="1h")
+    scheduler = timers(tmp_path, [schedule], clock)
+    # Asleep for ten hours: one run on waking, not ten
+    clock.now += 10 * 3600 + 60
+    assert scheduler.due_now() == [schedule]
+    assert scheduler.due_now() == []
+    assert scheduler.upcoming()[0][0] == clock.now + 3600
+
+def test_missed_runs_coalesce_across_restarts(tmp_path):
+    clock = Clock(at(2025, 6, 1, 3, 30))
+    schedule = Schedule("clean.bat", cron="0 * * * *")
+    (tmp_path / STATE_NAME).write_text(json.dumps({schedule.key: {"last_run": at(2025, 5, 29, 0, 0)}}))
+    scheduler = timers(tmp_path, [schedule], clock)
+    assert scheduler.upcoming()[0][0] == clock.now
+    assert scheduler.due_now() == [schedule]
+    assert moment(scheduler.upcoming()[0][0]) == datetime(2025, 6, 1, 4, 0)
+
+def test_jitter_delays_each_run(tmp_path):
+    clock = Clock(at(2025, 6, 1, 12, 0))
+    scheduler = MaintenanceScheduler([Schedule("a.bat", every="1h", jitter="10m")], lambda s: None, str(tmp_path),
+                                     clock=clock, rand=lambda: 0.5)
+    assert scheduler.upcoming()[0][0] == clock.now + 3600 + 300
+
+def test_runs_dispatch_and_stop(tmp_path):
+    fired = []
+    done = threading.Event()
+
+    def dispatch(schedule):
+        fired.append(schedule.script)
+        if len(fired) == 3:
+            done.set()
+
+    scheduler = MaintenanceScheduler([Schedule("a.bat", every="0.05s")], dispatch, str(tmp_path))
+    scheduler.start()
+    assert done.wait(5)
+    scheduler.stop()
+    scheduler.thread.join(5)
+    assert not scheduler.thread.is_alive()
+    count = len(fired)
+    assert json.loads((tmp_path / STATE_NAME).read_text())[scheduler.schedules[0].key]["last_run"]
+    time.sleep(0.2)
+    assert len(fired) == count
+
+def test_reload_cancels_removed_schedules(tmp_path):
+    clock = Clock(at(2025, 6, 1, 12, 0))
+    keep, drop = Schedule("keep.bat", every="1h"), Schedule("drop.bat", every="30m")
+    scheduler = timers(tmp_path, [keep, drop], clock)
+    scheduler.reload([keep])
+    clock.now += 7200
+    assert scheduler.due_now() == [keep]
@@ -0,0 +1,71 @@
+import json
+import threading
+
+import pytest
+
+import upkeep_engine.settings as settings_module
+from upkeep_engine.settings import DEFAULT_SETTINGS, SCHEMA_VERSION, SettingsStore, load_settings, save_settings
+
+def test_v1_file_is_migrated(tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"theme": "light", "extra_button_configs": {"Flush": "flushdns.bat", "Spare": "None"}}))
+    settings = load_settings(str(path))
+    assert settings["schema_version"] == SCHEMA_VERSION
+    assert settings["theme"] == "light"
+    assert settings["extra_button_configs"] == [{"name": "Flush", "script": "flushdns.bat"},
+                                                {"name": "Spare", "script": None}]
+    # Keys the old file never had come from the defaults
+    assert settings["max_workers"] == DEFAULT_SETTINGS["max_workers"]
+
+def test_partial_file_keeps_its_values(tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"schema_version": SCHEMA_VERSION, "max_workers": 4}))
+    settings = load_settings(str(path))
+    assert settings["max_workers"] == 4 and settings["theme"] == DEFAULT_SETTINGS["theme"]
+
+@pytest.mark.parametrize("content", ['{"theme": "li', "[1, 2]", "\xff\xfe"])
+def test_corrupt_file_falls_back_to_defaults(tmp_path, content):
+    path = tmp_path / "settings.json"
+    path.write_bytes(content.encode("latin-1"))
+    assert load_settings(str(path)) == DEFAULT_SETTINGS
+    # The unreadable file is kept aside and a fresh one written in its place
+    assert (tmp_path / "settings.json.corrupt").read_bytes() == content.encode("latin-1")
+    assert json.loads(path.read_text()) == DEFAULT_SETTINGS
+
+def test_load_without_writing_defaults(tmp_path):
+    path = tmp_path / "settings.json"
+    assert load_settings(str(path), write_defaults=False) == DEFAULT_SETTINGS
+    assert not path.exists()
+
+def test_failed_write_leaves_the_old_file(tmp_path):
+    path = tmp_path / "settings.json"
+    save_settings(str(path), {"theme": "dark"})
+    with pytest.raises(TypeError):
+        save_settings(str(path), {"theme": "light", "broken": object()})
+    assert json.loads(path.read_text()) == {"theme": "dark"}
+
+def test_store_coalesces_writes(tmp_path, monkeypatch):
+    writes = []
+    written = threading.Event()
+
+    def save(settings_file, settings):
+        writes.append(settings)
+        written.set()
+    path = tmp_path / "settings.json"
+    store = SettingsStore(str(path), delay=0.2)
+    monkeypatch.setattr(settings_module, "save_settings", save)
+    for workers in range(1, 6):
+        store.set("max_workers", workers)
+    store.update({"theme": "light"})
+    assert written.wait(5)
+    store.flush()
+    assert len(writes) == 1
+    assert writes[0]["max_workers"] == 5 and writes[0]["theme"] == "light"
+
+def test_flush_writes_pending_changes_at_once(tmp_path):
+    path = tmp_path / "settings.json"
+    store = SettingsStore(str(path), delay=60)
+    store.set("theme", "light")
+    store.flush()
+    assert json.loads(path.read_text())["theme"] == "light"
+    assert store.timer is None and not (tmp_path / "settings.json.tmp").exists()
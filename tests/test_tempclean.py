@@ -0,0 +1,88 @@
+import json
+import os
+import time
+
+from upkeep_engine.cli import EXIT_OK, main
+from upkeep_engine.tempclean import TempCleaner, Throttle, format_progress, largest_directories
+
+DAY = 86400
+
+def make_tree(root):
+    # Two old folders of files and one file changed "in the future", i.e. after the cutoff
+    for folder, count in (("big", 5), ("small", 1)):
+        os.makedirs(root / folder / "nested")
+        for index in range(count):
+            (root / folder / "nested" / f"f{index}.tmp").write_bytes(b"x" * 1000)
+    (root / "keep.log").write_bytes(b"x" * 10)
+    (root / "recent.tmp").write_bytes(b"x" * 10)
+    future = time.time() + 3 * DAY
+    os.utime(root / "recent.tmp", (future, future))
+
+def cleaner(root, **kwargs):
+    # Files were all created just now, so the clock runs two days ahead to make them old
+    return TempCleaner([str(root)], kwargs.pop("min_age", "1d"), clock=lambda: time.time() + 2 * DAY, **kwargs)
+
+def files_under(root):
+    return sorted(os.path.relpath(os.path.join(d, f), root) for d, _, files in os.walk(root) for f in files)
+
+def test_dry_run_deletes_nothing(tmp_path):
+    make_tree(tmp_path)
+    before = files_under(tmp_path)
+    plan = cleaner(tmp_path).scan()
+    assert files_under(tmp_path) == before
+    assert plan["total_files"] == 7 and plan["total_bytes"] == 6010
+    assert str(tmp_path / "recent.tmp") not in [path for path, _ in plan["files"]]
+    # Per top folder, largest first
+    assert [(os.path.basename(f), t["files"]) for f, t in largest_directories(plan)][:2] == [("big", 5), ("small", 1)]
+
+def test_delete_removes_planned_files_and_empty_folders(tmp_path):
+    make_tree(tmp_path)
+    temp = cleaner(tmp_path)
+    result = temp.delete(temp.scan())
+    assert result["deleted"] == 7 and result["freed"] == 6010 and result["skipped"] == 0
+    assert files_under(tmp_path) == ["recent.tmp"]
+    assert not (tmp_path / "big").exists()
+
+def test_include_and_exclude_patterns(tmp_path):
+    make_tree(tmp_path)
+    plan = cleaner(tmp_path, include=["*.tmp"], exclude=["small"]).scan()
+    names = sorted(os.path.relpath(path, tmp_path) for path, _ in plan["files"])
+    assert names == sorted(os.path.join("big", "nested", f"f{i}.tmp") for i in range(5))
+
+def test_file_changed_after_the_scan_is_kept(tmp_path):
+    make_tree(tmp_path)
+    temp = cleaner(tmp_path)
+    plan = temp.scan()
+    future = time.time() + 3 * DAY
+    os.utime(tmp_path / "keep.log", (future, future))
+    temp.delete(plan)
+    assert (tmp_path / "keep.log").exists()
+
+def test_stop_during_scan(tmp_path):
+    make_tree(tmp_path)
+    plan = cleaner(tmp_path).scan(should_stop=lambda: True)
+    assert plan["stopped"]
+
+def test_throttle_limits_progress():
+    now = [0.0]
+    sent = []
+    throttle = Throttle(sent.append, interval=1.0, clock=lambda: now[0])
+    throttle({"phase": "scan", "folders": 1, "files": 1, "bytes": 1})
+    throttle({"phase": "scan", "folders": 2, "files": 2, "bytes": 2})
+    now[0] = 1.5
+    throttle({"phase": "scan", "folders": 3, "files": 3, "bytes": 3})
+    throttle({"phase": "scan", "folders": 3, "files": 3, "bytes": 3}, force=True)
+    assert [p["folders"] for p in sent] == [1, 3]
+    assert format_progress(sent[-1]).startswith("Scanned 3 folders")
+
+def test_cli_dry_run_json(tmp_path, capsys):
+    root = tmp_path / "temp"
+    make_tree(root)
+    before = files_under(root)
+    assert main(["--settings-file", str(tmp_path / "settings.json"), "clean", "--dry-run", "--json",
+                 "--root", str(root), "--min-age", "0"]) == EXIT_OK
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    scan = [e for e in events if e["event"] == "scan"][0]
+    assert scan["files"] == 7 and scan["roots"] == [str(root)]
+    assert not any(e["event"] == "result" for e in events)
+    assert files_under(root) == before
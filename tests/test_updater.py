@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from upkeep_engine.updater import UpdateError, Updater, build_manifest, is_newer, parse_version, safe_path
+
+class Server:
+    # Local HTTP server with ETags, Range support and a switch to cut a response short
+    def __init__(self):
+        self.files = {}
+        self.requests = []
+        self.truncate = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                path = self.path.lstrip("/")
+                server.requests.append((path, dict(self.headers)))
+                body = server.files.get(path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                start = 0
+                if self.headers.get("Range"):
+                    start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+                    if start >= len(body):
+                        self.send_error(416)
+                        return
+                    self.send_response(206)
+                else:
+                    self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body) - start))
+                self.end_headers()
+                cut = server.truncate.pop(path, None)
+                self.wfile.write(body[start:cut])
+                if cut is not None:
+                    self.close_connection = True
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = "http://127.0.0.1:%d/" % self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def add(self, path, body):
+        self.files[path] = body if isinstance(body, bytes) else json.dumps(body).encode()
+
+    def requests_for(self, path):
+        return [headers for requested, headers in self.requests if requested == path]
+
+@pytest.fixture
+def server():
+    server = Server()
+    yield server
+    server.httpd.shutdown()
+
+@pytest.fixture
+def install(tmp_path):
+    root = tmp_path / "install"
+    (root / "scripts").mkdir(parents=True)
+    (root / "version.json").write_text(json.dumps({"version": "1.6.0"}))
+    (root / "UpKeep.py").write_text("print('old')\n")
+    (root / "README.md").write_text("same\n")
+    (root / "scripts" / "flushdns.bat").write_text("ipconfig /flushdns  rem edited by the user\n")
+    return root
+
+def release(server, install, files):
+    # Publishes install with files replaced, as version 1.7.0
+    manifest = build_manifest(str(install), "1.7.0")
+    for relative, body in files.items():
+        server.add("files/" + relative, body)
+        manifest["files"][relative] = {"sha256": hashlib.sha256(body).hexdigest(), "size": len(body)}
+    manifest["base_url"] = "files/"
+    server.add("manifest.json", manifest)
+    server.add("update.json", {"version": "1.7.0", "manifest_url": "manifest.json"})
+
+def updater(server, install, tmp_path):
+    return Updater(str(install), str(tmp_path / "state"), server.url + "update.json")
+
+def test_versions():
+    assert parse_version("v1.7.0-beta") == (1, 7)
+    assert is_newer("1.10", "1.9.9") and not is_newer("1.6", "1.6.0") and is_newer("1.0", None)
+
+def test_manifest_paths_stay_inside_the_install(tmp_path):
+    for bad in ("../x", "/etc/passwd", "C:/x", "a//b", "a/./b"):
+        with pytest.raises(UpdateError):
+            safe_path(str(tmp_path), bad)
+
+def test_check_uses_conditional_get(server, install, tmp_path):
+    release(server, install, {})
+    first = updater(server, install, tmp_path).check()
+    assert first["available"] and first["current"] == "1.6.0"
+    # A new Updater reads the saved ETag and gets a 304 for the unchanged document
+    second = updater(server, install, tmp_path).check()
+    assert second["version"] == "1.7.0"
+    assert "If-None-Match" in server.requests_for("update.json")[-1]
+
+def test_apply_downloads_only_changed_files(server, install, tmp_path):
+    new_version = json.dumps({"version": "1.7.0"}).encode()
+    release(server, install, {"UpKeep.py": b"print('new')\n", "version.json": new_version,
+                              "scripts/flushdns.bat": b"ipconfig /flushdns\r\n", "scripts/new.bat": b"echo new\r\n"})
+    up = updater(server, install, tmp_path)
+    updated = up.apply(up.check())
+    assert sorted(updated) == ["UpKeep.py", "scripts/new.bat", "version.json"]
+    assert updated[-1] == "version.json"
+    assert (install / "UpKeep.py").read_bytes() == b"print('new')\n"
+    # Scripts the user already has are never overwritten
+    assert b"edited by the user" in (install / "scripts" / "flushdns.bat").read_bytes()
+    assert not server.requests_for("files/README.md")
+    assert not up.check()["available"]
+
+def test_interrupted_download_resumes_with_range(server, install, tmp_path):
+    body = os.urandom(200000)
+    release(server, install, {"UpKeep.py": body})
+    server.truncate["files/UpKeep.py"] = 50000
+    up = updater(server, install, tmp_path)
+    info = up.check()
+    with pytest.raises(UpdateError):
+        up.apply(info)
+    assert (install / "UpKeep.py").read_text() == "print('old')\n"  # Nothing swapped in yet
+    up.apply(info)
+    assert (install / "UpKeep.py").read_bytes() == body
+    assert server.requests_for("files/UpKeep.py")[-1]["Range"] == "bytes=50000-"
+
+def test_hash_mismatch_is_discarded(server, install, tmp_path):
+    release(server, install, {"UpKeep.py": b"print('new')\n"})
+    server.add("files/UpKeep.py", b"print('tampered')\n")
+    up = updater(server, install, tmp_path)
+    with pytest.raises(UpdateError, match="hash mismatch"):
+        up.apply(up.check())
+    assert (install / "UpKeep.py").read_text() == "print('old')\n"
+    staged = [f for _, _, files in os.walk(tmp_path / "state") for f in files if f.endswith(".part")]
+    assert staged == []
+
+def test_http_errors(server, install, tmp_path):
+    with pytest.raises(UpdateError, match="HTTP 404"):
+        updater(server, install, tmp_path).check()
@@ -0,0 +1,16 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Headless UpKeep engine. Nothing in this package imports tkinter, so it can be
+# driven from the command line (python UpKeep.py run ...) or remote tooling.
+
+from .runner import Interpreter, ScriptJob, default_interpreter, kill_job, kill_process_tree, run_job
+from .interpreters import InterpreterRegistry
+from .scheduler import ScriptScheduler
+from .catalog import ScriptCatalog
+from .reports import ReportStore, latest_report
+from .settings import DEFAULT_SETTINGS, SettingsStore, load_settings, save_settings
+from .diagnostics import Collector, DEFAULT_COLLECTORS, load_collectors, run_diagnostics
+from .report_diff import diff_reports, format_diff
+from .procstat import ProcessSampler
@@ -0,0 +1,9 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,109 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Line lexer for batch scripts, used by the UpEditor highlighter. Batch syntax
+# has no multi-line constructs that change how a line is coloured, so each line
+# is lexed on its own and results can be cached by line text.
+
+import re
+from functools import lru_cache
+
+TAGS = ("bat_comment", "bat_label", "bat_keyword", "bat_command", "bat_variable", "bat_redirect", "bat_string")
+
+KEYWORDS = (
+    "echo", "goto", "call", "set", "setlocal", "endlocal", "if", "else", "not", "exist", "defined",
+    "errorlevel", "for", "in", "do", "exit", "shift", "pause", "start", "cd", "chdir", "pushd", "popd",
+    "cls", "title", "choice", "timeout", "equ", "neq", "lss", "leq", "gtr", "geq", "enabledelayedexpansion"
+)
+# Keywords followed by a command of their own, e.g. "else del x" or "call other.bat"
+COMMAND_KEYWORDS = ("do", "else", "call")
+SEPARATORS = ("&", "&&", "||", "|")
+
+VARIABLE = r"%%~?[a-zA-Z]|%~[a-zA-Z$:]*[0-9*]|%[0-9*]|%[^%\s]+%|![^!\s]+!"
+REDIRECT = r"[0-9]?>>?(?:&[0-9])?|<|\|\||\||&&|&"
+
+COMMENT = re.compile(r"\s*@?\s*(?:rem(?:\s|$)|::)", re.IGNORECASE)
+LABEL = re.compile(r"\s*:[^:\s]\S*")
+VARIABLES = re.compile(VARIABLE)
+TOKENS = re.compile(
+    r'(?P<bat_string>"[^"\n]*"?)'
+    r"|(?P<bat_variable>" + VARIABLE + r")"
+    r"|(?P<bat_redirect>" + REDIRECT + r")"
+    r"|(?P<bat_keyword>(?<![\w.-])(?:" + "|".join(KEYWORDS) + r")(?![\w.-]))"
+    r"|(?P<bat_target>(?<=goto)\s+:?\w+|(?<=call)\s+:\w+)"
+    r"|(?P<paren>[()])"
+    # Any other word; it is a command when it starts one. "@" only hides the command's echo
+    r'|(?P<word>[^\s&|<>()"%!@][^\s&|<>()"%!]*)',
+    re.IGNORECASE
+)
+
+@lru_cache(maxsize=8192)
+def lex_line(line):
+    # Returns ((tag, start, end), ...) column ranges for one line (without its newline)
+    if COMMENT.match(line):
+        return (("bat_comment", 0, len(line)),)
+    label = LABEL.match(line)
+    if label:
+        return (("bat_label", len(line) - len(line.lstrip()), label.end()),)
+    spans = []
+    # A command starts the line and follows every separator, "(" and COMMAND_KEYWORDS
+    command_next = True
+    depth = 0
+    keyword = None
+    for match in TOKENS.finditer(line):
+        tag = match.lastgroup
+        start, end = match.span()
+        if tag == "paren":
+            opening = match.group() == "("
+            depth += 1 if opening else -1
+            # "in (...)" of a for loop lists values, not commands
+            command_next = opening and keyword != "in"
+            keyword = None
+            continue
+        if tag == "word":
+            if command_next:
+                spans.append(("bat_command", start, end))
+            command_next = False
+            keyword = None
+            continue
+        keyword = match.group().lower() if tag == "bat_keyword" else None
+        if tag == "bat_target":
+            tag, start = "bat_label", start + len(match.group()) - len(match.group().lstrip())
+        elif keyword == "echo":
+            spans.append((tag, start, end))
+            # Text after echo is printed as-is; only variables and redirects still count,
+            # and inside a parenthesized block a ")" ends it
+            spans.extend(echo_spans(line, end, depth > 0))
+            break
+        spans.append((tag, start, end))
+        if tag == "bat_string":
+            spans.extend(("bat_variable", s, e) for s, e in variable_spans(line, start, end))
+        if tag == "bat_redirect":
+            command_next = match.group() in SEPARATORS or command_next
+        else:
+            command_next = keyword in COMMAND_KEYWORDS
+    return tuple(spans)
+
+def variable_spans(line, start, end):
+    return [m.span() for m in VARIABLES.finditer(line, start, end)]
+
+ECHO_TOKENS = re.compile(r"(?P<bat_variable>" + VARIABLE + r")|(?P<bat_redirect>" + REDIRECT + r")|(?P<paren>\))")
+
+def echo_spans(line, start, in_block=False):
+    spans = []
+    for match in ECHO_TOKENS.finditer(line, start):
+        if match.lastgroup == "paren":
+            if not in_block:
+                continue
+            # The block ends here; whatever follows (e.g. "else (...)") is lexed as usual
+            offset = match.end()
+            spans.extend((tag, s + offset, e + offset) for tag, s, e in lex_line(line[offset:]))
+            break
+        spans.append((match.lastgroup, match.start(), match.end()))
+        if match.group() in SEPARATORS:
+            # A new command starts after the separator
+            offset = match.end()
+            spans.extend((tag, s + offset, e + offset) for tag, s, e in lex_line(line[offset:]))
+            break
+    return spans
@@ -0,0 +1,98 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# In-memory index of the scripts folder. refresh() costs a single stat while the
+# folder is unchanged; when it does change, listeners get just the names that
+# were added and removed.
+
+import bisect
+import os
+import threading
+
+from .interpreters import SCRIPT_EXTENSIONS
+
+class ScriptCatalog:
+    def __init__(self, folder, extensions=SCRIPT_EXTENSIONS):
+        self.folder = folder
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.names = []
+        self.keys = []
+        self.mtime = None
+        self.listeners = []
+        self.lock = threading.Lock()
+
+    def subscribe(self, callback):
+        # callback(added, removed) with sorted lists of names
+        self.listeners.append(callback)
+
+    def matches(self, name):
+        return name.lower().endswith(self.extensions)
+
+    def refresh(self, force=False):
+        try:
+            mtime = os.stat(self.folder).st_mtime_ns
+        except OSError:
+            mtime = None
+        if not force and mtime == self.mtime and self.mtime is not None:
+            return [], []
+        current = set()
+        if mtime is not None:
+            with os.scandir(self.folder) as entries:
+                current = {e.name for e in entries if self.matches(e.name) and e.is_file()}
+        with self.lock:
+            self.mtime = mtime
+            known = set(self.names)
+            added = sorted(current - known, key=str.lower)
+            removed = sorted(known - current, key=str.lower)
+            for name in removed:
+                self.remove_name(name)
+            for name in added:
+                self.insert_name(name)
+        self.notify(added, removed)
+        return added, removed
+
+    def add(self, name):
+        # Saving or creating a script can land within the folder's mtime granularity,
+        # so the UI registers its own changes directly
+        if not self.matches(name):
+            return
+        with self.lock:
+            if name in self.names:
+                return
+            self.insert_name(name)
+        self.notify([name], [])
+
+    def remove(self, name):
+        with self.lock:
+            if name not in self.names:
+                return
+            self.remove_name(name)
+        self.notify([], [name])
+
+    def insert_name(self, name):
+        position = bisect.bisect_left(self.keys, (name.lower(), name))
+        self.keys.insert(position, (name.lower(), name))
+        self.names.insert(position, name)
+
+    def remove_name(self, name):
+        position = bisect.bisect_left(self.keys, (name.lower(), name))
+        del self.keys[position]
+        del self.names[position]
+
+    def position(self, name, names=None):
+        # Where name sorts within names (default: the whole catalog)
+        keys = self.keys if names is None else [(n.lower(), n) for n in names]
+        return bisect.bisect_left(keys, (name.lower(), name))
+
+    def filter(self, query):
+        query = query.strip().lower()
+        with self.lock:
+            if not query:
+                return list(self.names)
+            return [name for key, name in self.keys if query in key]
+
+    def notify(self, added, removed):
+        if added or removed:
+            for callback in self.listeners:
+                callback(added, removed)
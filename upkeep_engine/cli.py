@@ -0,0 +1,561 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+
+import argparse
+import asyncio
+import getpass
+import json
+import os
+import shlex
+import sys
+import threading
+from datetime import datetime
+
+from .catalog import ScriptCatalog
+from .diagnostics import load_collectors, run_diagnostics
+from .interpreters import InterpreterRegistry
+from .history import HISTORY_NAME, OutputCapture, RunHistory, file_hash, run_record
+from .pipelines import format_step, load_pipelines, pipeline_succeeded, run_pipeline
+from .procstat import ProcessSampler, format_bytes, format_sample
+from .report_diff import diff_reports, format_diff
+from .remote import DEFAULT_PORT, Agent, fan_out, hash_token, host_failed, read_hosts
+from .reports import ReportStore
+from .runner import run_job
+from .scheduler import ScriptScheduler
+from .schedules import MaintenanceScheduler, load_schedules
+from .updater import DEFAULT_UPDATE_URL, UpdateError, Updater, build_manifest
+from .settings import load_settings
+from .tempclean import TempCleaner, format_progress, format_result, largest_directories
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="UpKeep.py", description="Run UpKeep without the GUI.")
+    parser.add_argument("--scripts-folder", default="scripts")
+    parser.add_argument("--reports-folder", default="reports")
+    parser.add_argument("--settings-file", default=os.path.join("settings", "settings.json"))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run one or more scripts")
+    run.add_argument("scripts", nargs="+", help="script names from the scripts folder, or paths")
+    run.add_argument("--parallel", type=int, default=1, help="number of scripts to run at once")
+    run.add_argument("--timeout", type=float, default=None, help="per-script timeout in seconds")
+    run.add_argument("--interpreter", default=None,
+                     help="command used to run .bat/.cmd scripts, e.g. \"sh\" (default: settings, then cmd.exe /c)")
+    run.add_argument("--sample-interval", type=float, default=None, metavar="SECONDS",
+                     help="sample CPU, memory and IO of each script this often (0 disables; default: settings)")
+    run.add_argument("--json", action="store_true", help="stream JSON lines instead of text")
+
+    diagnose = commands.add_parser("diagnose", help="write a diagnostic report to the reports folder")
+    diagnose.add_argument("--collectors", default=None,
+                          help="JSON file with a list of {\"section\", \"command\", \"timeout\"} collectors")
+    diagnose.add_argument("--json", action="store_true", help="print the report summary as JSON")
+
+    diff = commands.add_parser("diff", help="show what changed between two diagnostic reports")
+    diff.add_argument("reports", nargs="*", help="old and new report (default: the two latest)")
+    diff.add_argument("--json", action="store_true", help="print the section results as JSON")
+
+    history = commands.add_parser("history", help="show run statistics per script, or recent runs")
+    history.add_argument("--runs", type=int, default=0, metavar="N", help="list the N most recent runs instead")
+    history.add_argument("--json", action="store_true", help="print JSON instead of a table")
+
+    agent = commands.add_parser("agent", help="serve scripts from the scripts folder to a remote controller")
+    agent.add_argument("--host", default="127.0.0.1",
+                       help="address to listen on (default: 127.0.0.1; others need agent_token in settings)")
+    agent.add_argument("--port", type=int, default=None, help="port to listen on (default: settings, then 47600)")
+    agent.add_argument("--interpreter", default=None, help="command used to run .bat/.cmd scripts")
+    agent.add_argument("--hash-token", action="store_true",
+                       help="prompt for a token and print the hashed agent_token value to store instead")
+
+    remote = commands.add_parser("remote", help="run a script on many agents at once")
+    remote.add_argument("script", help="script name from the agents' scripts folders")
+    remote.add_argument("--hosts", default=None, help="comma-separated host[:port] list (default: remote_hosts in settings)")
+    remote.add_argument("--hosts-file", default=None, help="file with one host[:port] per line")
+    remote.add_argument("--concurrency", type=int, default=None, help="hosts contacted at once (default: 16)")
+    remote.add_argument("--host-timeout", type=float, default=None,
+                        help="seconds to wait for each host, connection included (default: 300)")
+    remote.add_argument("--timeout", type=float, default=None, help="script timeout passed to the agents")
+    remote.add_argument("--json", action="store_true", help="stream JSON lines with a \"host\" field")
+
+    pipeline = commands.add_parser("pipeline", help="run a pipeline from \"pipelines\" in settings")
+    pipeline.add_argument("name", nargs="?", default=None, help="pipeline name (omit to list pipelines)")
+    pipeline.add_argument("--interpreter", default=None, help="command used to run .bat/.cmd scripts")
+    pipeline.add_argument("--json", action="store_true", help="print one JSON object per finished step")
+
+    schedule = commands.add_parser("schedule", help="run the scripts listed under \"schedules\" in settings when due")
+    schedule.add_argument("--list", action="store_true", help="print when each schedule runs next, then exit")
+    schedule.add_argument("--interpreter", default=None, help="command used to run .bat/.cmd scripts")
+
+    update = commands.add_parser("update", help="check for a newer UpKeep and install the changed files")
+    update.add_argument("--check", action="store_true", help="only report whether an update is available")
+    update.add_argument("--update-url", default=None, help="update.json to check (default: settings)")
+    update.add_argument("--write-manifest", default=None, metavar="FILE",
+                        help="write a file manifest of this install for publishing, then exit")
+    update.add_argument("--base-url", default=None, help="URL the manifest's files are served from")
+
+    clean = commands.add_parser("clean", help="delete old files from the temp folders")
+    clean.add_argument("--dry-run", action="store_true", help="only report how much would be freed, per folder")
+    clean.add_argument("--root", action="append", default=None, metavar="FOLDER",
+                       help="folder to clean; repeat for several (default: settings, then the temp folder)")
+    clean.add_argument("--min-age", default=None, help="keep files newer than this, e.g. 12h (default: settings, then 1d)")
+    clean.add_argument("--exclude", action="append", default=None, metavar="PATTERN", help="name pattern to keep")
+    clean.add_argument("--json", action="store_true", help="print progress and the result as JSON lines")
+
+    script_list = commands.add_parser("list", help="list scripts in the scripts folder")
+    script_list.add_argument("filter", nargs="?", default="", help="only names containing this text")
+    commands.add_parser("latest-report", help="print the path of the latest diagnostic report")
+
+    reports = commands.add_parser("reports", help="list indexed diagnostic reports")
+    reports.add_argument("--since", default=None, help="only reports at or after this date (YYYY-MM-DD[THH:MM])")
+    reports.add_argument("--until", default=None, help="only reports at or before this date (YYYY-MM-DD[THH:MM])")
+    reports.add_argument("--prune", action="store_true", help="archive reports outside the retention policy")
+    reports.add_argument("--rebuild", action="store_true", help="rebuild the index from the reports folder")
+    return parser
+
+def load_interpreters(args, settings):
+    # --interpreter, like the 'interpreter' setting, is the command for .bat/.cmd files
+    command = shlex.split(args.interpreter) if getattr(args, "interpreter", None) else settings.get('interpreter')
+    return InterpreterRegistry(command, settings.get('interpreters'))
+
+def start_sessions(interpreters, settings):
+    # Only long-running commands keep shells warm; a one-off run would pay to start them
+    interpreters.start_sessions(settings.get('shell_sessions', 2), settings.get('session_max_runs', 50))
+
+def resolve_script(scripts_folder, script):
+    if os.path.isfile(script):
+        return script
+    return os.path.join(scripts_folder, script)
+
+class Emitter:
+    # Serialises output from concurrently running jobs onto stdout
+    def __init__(self, as_json, out=None):
+        self.as_json = as_json
+        self.out = out or sys.stdout
+        self.lock = threading.Lock()
+
+    def emit(self, event, job, **fields):
+        with self.lock:
+            if self.as_json:
+                record = {"event": event, "script": job.name}
+                record.update(fields)
+                self.out.write(json.dumps(record) + "\n")
+            elif event == "output":
+                prefix = f"[{job.name}] " if fields["stream"] == "stdout" else f"[{job.name}!] "
+                self.out.write(prefix + fields["line"].rstrip("\n") + "\n")
+            elif event == "sample":
+                self.out.write(f"[{job.name}~] {format_sample(fields)}\n")
+            elif event == "exit":
+                resources = fields.get("resources")
+                self.out.write(f"[{job.name}] exited with {fields['code']} after {fields['duration']:.2f}s"
+                               + (" (timed out)" if fields.get("timed_out") else "")
+                               + (f", CPU {resources['cpu_seconds']:.2f}s, peak RSS {format_bytes(resources['peak_rss'])}"
+                                  if resources and resources['samples'] else "") + "\n")
+            elif event == "error":
+                self.out.write(f"[{job.name}] error: {fields['message']}\n")
+            self.out.flush()
+
+def script_executor(interpreter, emitter, history, sampler, failures=None, show_samples=True):
+    # The job runner shared by run and schedule: streams events, records history and,
+    # if failures is a list, collects the jobs that did not exit with 0
+    def on_sample(job, sample):
+        emitter.emit("sample", job, **sample)
+
+    def execute(job):
+        emitter.emit("start", job)
+        content_hash = file_hash(job.script_path)
+        capture = OutputCapture()
+
+        def on_output(line, stream):
+            capture.feed(line, stream)
+            emitter.emit("output", job, stream=stream, line=line)
+
+        sampler.watch(job, on_sample if show_samples else None)
+        try:
+            code = run_job(job, interpreter, on_output)
+        except OSError as e:
+            if failures is not None:
+                failures.append(job)
+            emitter.emit("error", job, message=str(e))
+            return
+        finally:
+            sampler.unwatch(job)
+        history.append(run_record(job, capture, content_hash))
+        if code != 0 and failures is not None:
+            failures.append(job)
+        emitter.emit("exit", job, code=code, duration=job.finished - job.started, timed_out=job.timed_out,
+                     resources=job.resources)
+
+    return execute
+
+def command_run(args, settings):
+    interpreter = load_interpreters(args, settings)
+    emitter = Emitter(args.json)
+    timeouts = settings.get('script_timeouts', {})
+    history = RunHistory(os.path.join(args.reports_folder, HISTORY_NAME))
+    interval = args.sample_interval if args.sample_interval is not None else settings.get('sample_interval', 1.0)
+    failures = []
+    execute = script_executor(interpreter, emitter, history, ProcessSampler(interval), failures,
+                              show_samples=args.json or args.sample_interval is not None)
+
+    # Every script is checked before any of them starts, so a typo doesn't leave others running
+    paths = {}
+    for script in args.scripts:
+        path = resolve_script(args.scripts_folder, script)
+        if not os.path.isfile(path):
+            print(f"Error: {path} not found!", file=sys.stderr)
+            return EXIT_USAGE
+        key = os.path.normcase(os.path.abspath(path))
+        if key in paths:
+            # The scheduler never runs the same script twice at once
+            print(f"Error: {script} is listed more than once", file=sys.stderr)
+            return EXIT_USAGE
+        paths[key] = path
+
+    scheduler = ScriptScheduler(execute, workers=args.parallel)
+    jobs = []
+    for path in paths.values():
+        timeout = args.timeout if args.timeout is not None else timeouts.get(os.path.basename(path))
+        jobs.append(scheduler.submit(path, timeout=timeout))
+    for job in jobs:
+        job.done.wait()
+        if job.error is not None:
+            failures.append(job)
+            emitter.emit("error", job, message=str(job.error) or type(job.error).__name__)
+    return EXIT_FAILED if failures else EXIT_OK
+
+def command_agent(args, settings):
+    if args.hash_token:
+        token = getpass.getpass("Token: ")
+        if not token:
+            print("Error: the token is empty", file=sys.stderr)
+            return EXIT_USAGE
+        print(hash_token(token))
+        return EXIT_OK
+    interpreters = load_interpreters(args, settings)
+    start_sessions(interpreters, settings)
+    agent = Agent(args.scripts_folder, interpreters, token=settings.get('agent_token'),
+                  max_jobs=settings.get('max_workers', 2), reports_folder=args.reports_folder)
+    port = args.port or settings.get('agent_port', DEFAULT_PORT)
+
+    def on_ready(server):
+        for sock in server.sockets:
+            print(f"Agent listening on {sock.getsockname()[0]}:{sock.getsockname()[1]}", flush=True)
+
+    try:
+        asyncio.run(agent.serve(args.host, port, on_ready))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    except KeyboardInterrupt:
+        pass
+    finally:
+        interpreters.close()
+    return EXIT_OK
+
+def command_remote(args, settings):
+    if args.hosts_file:
+        hosts = read_hosts(args.hosts_file)
+    elif args.hosts:
+        hosts = [h.strip() for h in args.hosts.split(",") if h.strip()]
+    else:
+        hosts = settings.get('remote_hosts', [])
+    if not hosts:
+        print("No hosts given (use --hosts, --hosts-file or remote_hosts in settings).", file=sys.stderr)
+        return EXIT_USAGE
+    lock = threading.Lock()
+
+    def on_event(host, event):
+        with lock:
+            if args.json:
+                print(json.dumps(dict(event, host=host)), flush=True)
+            elif event["event"] == "output":
+                prefix = f"[{host}] " if event["stream"] == "stdout" else f"[{host}!] "
+                print(prefix + event["line"].rstrip("\n"), flush=True)
+            elif event["event"] == "exit":
+                print(f"[{host}] exited with {event['code']} after {event['duration']:.2f}s"
+                      + (" (timed out)" if event.get("timed_out") else ""), flush=True)
+            elif event["event"] == "error":
+                print(f"[{host}] error: {event['message']}", flush=True)
+
+    concurrency = args.concurrency or settings.get('remote_concurrency', 16)
+    host_timeout = args.host_timeout or settings.get('remote_host_timeout', 300)
+    results = asyncio.run(fan_out(hosts, args.script, concurrency, args.timeout, host_timeout,
+                                  settings.get('agent_token'), on_event))
+    failed = [host for host, result in results.items() if host_failed(result)]
+    if not args.json:
+        print(f"{len(hosts) - len(failed)} of {len(hosts)} hosts succeeded"
+              + (f"; failed: {', '.join(failed)}" if failed else ""))
+    return EXIT_FAILED if failed else EXIT_OK
+
+def command_pipeline(args, settings):
+    try:
+        pipelines = load_pipelines(settings.get('pipelines'))
+    except (KeyError, TypeError, ValueError) as e:
+        print(f"Error in pipelines: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if not args.name:
+        for pipeline in pipelines.values():
+            print(f"{pipeline.name}: {' -> '.join(pipeline.order)} (max {pipeline.max_parallel} at once, "
+                  f"on failure: {pipeline.on_failure})")
+        return EXIT_OK
+    pipeline = pipelines.get(args.name)
+    if pipeline is None:
+        print(f"Error: no pipeline named {args.name!r}", file=sys.stderr)
+        return EXIT_USAGE
+    lock = threading.Lock()
+
+    def on_step_done(step, result):
+        with lock:
+            if args.json:
+                print(json.dumps(dict(result, step=step.id, script=step.script,
+                                      output=[{"stream": s, "line": l} for l, s in result["output"]])), flush=True)
+                return
+            print(format_step(step, result))
+            for line, stream in result["output"]:
+                print(("! " if stream == "stderr" else "  ") + line.rstrip("\n"))
+            sys.stdout.flush()
+
+    results = run_pipeline(pipeline, args.scripts_folder, load_interpreters(args, settings),
+                           settings.get('script_timeouts', {}),
+                           RunHistory(os.path.join(args.reports_folder, HISTORY_NAME)), on_step_done=on_step_done)
+    return EXIT_OK if pipeline_succeeded(results) else EXIT_FAILED
+
+def command_schedule(args, settings):
+    try:
+        schedules = load_schedules(settings.get('schedules'))
+    except ValueError as e:
+        print(f"Error in schedules: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    interpreters = load_interpreters(args, settings)
+    history = RunHistory(os.path.join(args.reports_folder, HISTORY_NAME))
+    timeouts = settings.get('script_timeouts', {})
+    # Samples still feed the history summary but are not printed, so logs stay readable
+    execute = script_executor(interpreters, Emitter(False), history,
+                              ProcessSampler(settings.get('sample_interval', 1.0)), show_samples=False)
+    runner = ScriptScheduler(execute, workers=settings.get('max_workers', 2))
+
+    def dispatch(schedule):
+        # A script still running from its last turn is skipped rather than queued twice
+        runner.submit(os.path.join(args.scripts_folder, schedule.script), timeout=timeouts.get(schedule.script))
+
+    timers = MaintenanceScheduler(schedules, dispatch, os.path.dirname(args.settings_file) or ".")
+    for due, schedule in timers.upcoming():
+        print(f"{schedule.script:<24} {schedule.describe():<24} next {datetime.fromtimestamp(due):%Y-%m-%d %H:%M:%S}")
+    if args.list:
+        return EXIT_OK
+    if not schedules:
+        print("No schedules configured.", file=sys.stderr)
+        return EXIT_USAGE
+    start_sessions(interpreters, settings)
+    timers.start()
+    try:
+        timers.thread.join()
+    except KeyboardInterrupt:
+        timers.stop()
+    finally:
+        interpreters.close()
+    return EXIT_OK
+
+def command_update(args, settings):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    updater = Updater(root, os.path.dirname(args.settings_file) or ".",
+                      args.update_url or settings.get('update_url') or DEFAULT_UPDATE_URL)
+    if args.write_manifest:
+        manifest = build_manifest(root, updater.local_version(), args.base_url)
+        with open(args.write_manifest, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=4)
+        print(f"Wrote {len(manifest['files'])} files to {args.write_manifest}")
+        return EXIT_OK
+    try:
+        info = updater.check()
+        if not info["available"]:
+            print(f"UpKeep {info['current']} is up to date.")
+            return EXIT_OK
+        if args.check:
+            print(f"UpKeep {info['version']} is available (installed: {info['current']}).")
+            return EXIT_OK
+        updated = updater.apply(info, on_status=lambda text: print(text, flush=True))
+    except UpdateError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    print(f"Updated {len(updated)} files to {info['version']}.")
+    return EXIT_OK
+
+def command_diagnose(args, settings):
+    definitions = settings.get('diagnostic_collectors')
+    if args.collectors:
+        try:
+            with open(args.collectors, 'r', encoding='utf-8') as f:
+                definitions = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: can't read {args.collectors}: {e}", file=sys.stderr)
+            return EXIT_USAGE
+    try:
+        collectors = load_collectors(definitions)
+    except (KeyError, TypeError, ValueError) as e:
+        print(f"Error in collectors: {e!r}", file=sys.stderr)
+        return EXIT_USAGE
+
+    def on_section(result):
+        if not args.json:
+            print(f"{result['section']}: {result['status']} ({result['duration']:.2f}s)", flush=True)
+
+    report_path, summary = run_diagnostics(args.reports_folder, collectors, on_section=on_section)
+    store = report_store(args, settings)
+    store.add(report_path, summary)
+    store.apply_retention()
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        print(f"Report saved as: {report_path}")
+    return EXIT_OK if all(s["status"] == "ok" for s in summary["sections"]) else EXIT_FAILED
+
+def command_history(args):
+    history = RunHistory(os.path.join(args.reports_folder, HISTORY_NAME))
+    if args.runs:
+        records, _ = history.page(limit=args.runs)
+        if args.json:
+            print(json.dumps(records))
+            return EXIT_OK
+        for record in records:
+            started = datetime.fromtimestamp(record["started"]).strftime("%Y-%m-%d %H:%M:%S") if record.get("started") else "?"
+            print(f"{started}  {record.get('script', '?'):<24} exit {record.get('exit_code')!s:<5} "
+                  f"{record.get('duration') or 0:>8.2f}s")
+        return EXIT_OK
+    stats = history.stats()
+    if args.json:
+        print(json.dumps(stats))
+        return EXIT_OK
+    print(f"{'Script':<24} {'Runs':>7} {'Failed':>7} {'p50 s':>8} {'p95 s':>8} {'Max s':>8}")
+    for script, row in sorted(stats.items()):
+        seconds = [f"{row[k]:.2f}" if row[k] is not None else "-" for k in ("p50", "p95", "max")]
+        print(f"{script:<24} {row['runs']:>7} {row['failure_rate']:>7.1%} {seconds[0]:>8} {seconds[1]:>8} {seconds[2]:>8}")
+    return EXIT_OK
+
+def command_clean(args, settings):
+    config = settings.get('temp_cleaner') or {}
+    min_age = args.min_age if args.min_age is not None else config.get('min_age', "1d")
+    try:
+        cleaner = TempCleaner(args.root or config.get('roots'), min_age, config.get('include'),
+                              (config.get('exclude') or []) + (args.exclude or []), config.get('workers', 8),
+                              config.get('remove_empty_dirs', True))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    def on_progress(progress):
+        print(json.dumps(dict(progress, event="progress")) if args.json else format_progress(progress), flush=True)
+
+    plan = cleaner.scan(on_progress)
+    folders = largest_directories(plan, len(plan["directories"]) if args.json else 20)
+    if args.json:
+        print(json.dumps({"event": "scan", "roots": cleaner.roots, "files": plan["total_files"],
+                          "bytes": plan["total_bytes"], "errors": plan["errors"],
+                          "directories": [dict(totals, path=folder) for folder, totals in folders]}), flush=True)
+    else:
+        for folder, totals in folders:
+            print(f"{format_bytes(totals['bytes']):>10}  {folder} ({totals['files']} files)")
+    if args.dry_run:
+        return EXIT_OK
+    result = cleaner.delete(plan, on_progress)
+    print(json.dumps(dict(result, event="result")) if args.json else format_result(result), flush=True)
+    return EXIT_OK
+
+def command_list(args, settings):
+    catalog = ScriptCatalog(args.scripts_folder, load_interpreters(args, settings).extensions)
+    catalog.refresh()
+    for name in catalog.filter(args.filter):
+        print(name)
+    return EXIT_OK
+
+def report_store(args, settings):
+    retention = settings.get('report_retention') or {}
+    return ReportStore(args.reports_folder, retention.get('keep_count'), retention.get('keep_days'))
+
+def parse_date(value):
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+def command_latest_report(args, settings):
+    report = report_store(args, settings).latest_path()
+    if report is None:
+        print("No diagnostic reports found.", file=sys.stderr)
+        return EXIT_FAILED
+    print(report)
+    return EXIT_OK
+
+def command_reports(args, settings):
+    try:
+        since, until = parse_date(args.since), parse_date(args.until)
+    except ValueError as e:
+        print(f"Error: {e} (use YYYY-MM-DD[THH:MM])", file=sys.stderr)
+        return EXIT_USAGE
+    store = report_store(args, settings)
+    if args.rebuild:
+        store.rebuild()
+    if args.prune:
+        for name in store.apply_retention():
+            print(f"Archived {name}", file=sys.stderr)
+    for entry in store.between(since, until):
+        stamp = datetime.fromtimestamp(entry["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{stamp}  {entry['size']:>10}  {store.path(entry)}")
+    return EXIT_OK
+
+def command_diff(args, settings):
+    if len(args.reports) == 2:
+        old_path, new_path = args.reports
+        for path in args.reports:
+            if not os.path.isfile(path):
+                print(f"Error: {path} not found!", file=sys.stderr)
+                return EXIT_USAGE
+    elif not args.reports:
+        store = report_store(args, settings)
+        recent = store.recent(2)
+        if len(recent) < 2:
+            print("Need at least two diagnostic reports to compare.", file=sys.stderr)
+            return EXIT_FAILED
+        old_path, new_path = (store.path(e) for e in recent)
+    else:
+        print("Give both an old and a new report, or none to compare the two latest.", file=sys.stderr)
+        return EXIT_USAGE
+    results = diff_reports(old_path, new_path)
+    if args.json:
+        print(json.dumps({"old": old_path, "new": new_path, "sections": results}))
+    else:
+        print(f"Comparing {old_path} -> {new_path}")
+        for line in format_diff(results):
+            print(line)
+    return EXIT_OK
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    settings = load_settings(args.settings_file, write_defaults=False)
+    if args.command == "run":
+        return command_run(args, settings)
+    if args.command == "diagnose":
+        return command_diagnose(args, settings)
+    if args.command == "diff":
+        return command_diff(args, settings)
+    if args.command == "history":
+        return command_history(args)
+    if args.command == "agent":
+        return command_agent(args, settings)
+    if args.command == "remote":
+        return command_remote(args, settings)
+    if args.command == "pipeline":
+        return command_pipeline(args, settings)
+    if args.command == "schedule":
+        return command_schedule(args, settings)
+    if args.command == "update":
+        return command_update(args, settings)
+    if args.command == "clean":
+        return command_clean(args, settings)
+    if args.command == "list":
+        return command_list(args, settings)
+    if args.command == "latest-report":
+        return command_latest_report(args, settings)
+    if args.command == "reports":
+        return command_reports(args, settings)
+    return EXIT_USAGE
@@ -0,0 +1,120 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Python replacement for scripts/diagnostic.bat: collectors run concurrently,
+# each with its own timeout, and sections are written as soon as they finish.
+
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from .reports import REPORT_PREFIX, REPORT_SUFFIX
+from .runner import kill_process_tree
+
+class Collector:
+    def __init__(self, section, command, timeout=120):
+        self.section = section
+        self.command = list(command)
+        self.timeout = timeout
+
+    def to_dict(self):
+        return {"section": self.section, "command": self.command, "timeout": self.timeout}
+
+DEFAULT_COLLECTORS = [
+    Collector("System Information", ["systeminfo"], 180),
+    Collector("Network Configuration", ["ipconfig", "/all"], 60),
+    Collector("Active Network Connections", ["netstat", "-ano"], 120),
+    Collector("Running Processes", ["tasklist"], 60),
+    Collector("Disk Status", ["wmic", "diskdrive", "list", "brief"], 60)
+]
+
+def load_collectors(definitions):
+    # definitions is a list of {"section", "command", "timeout"} dicts, e.g. from settings or a JSON file
+    if not definitions:
+        return list(DEFAULT_COLLECTORS)
+    return [Collector(d["section"], d["command"], d.get("timeout", 120)) for d in definitions]
+
+def run_collector(collector, should_stop=None):
+    started = time.time()
+    result = {"section": collector.section, "command": collector.command, "exit_code": None,
+              "status": "ok", "duration": 0.0}
+    try:
+        process = subprocess.Popen(
+            collector.command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            errors="replace",
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+            start_new_session=os.name != "nt"
+        )
+    except OSError as e:
+        result.update(status="error", output=f"Could not start {collector.command[0]}: {e}\n",
+                      duration=time.time() - started)
+        return result
+    deadline = started + collector.timeout if collector.timeout else None
+    output = None
+    # Wait in short slices so a cancelled report doesn't sit on a hung collector
+    while output is None:
+        wait = 0.25
+        if deadline is not None:
+            wait = min(wait, max(deadline - time.time(), 0))
+        try:
+            output, _ = process.communicate(timeout=wait)
+        except subprocess.TimeoutExpired:
+            stopped = should_stop is not None and should_stop()
+            if stopped or (deadline is not None and time.time() >= deadline):
+                kill_process_tree(process)
+                output, _ = process.communicate()
+                result["status"] = "cancelled" if stopped else "timeout"
+                output += ("(cancelled)\n" if stopped else f"(timed out after {collector.timeout}s)\n")
+    result["exit_code"] = process.returncode
+    result["output"] = output
+    result["duration"] = time.time() - started
+    return result
+
+def report_name(now):
+    return f"{REPORT_PREFIX}{now.strftime('%Y%m%d_%H%M%S')}{REPORT_SUFFIX}"
+
+def run_diagnostics(reports_folder, collectors=None, max_workers=None, on_section=None, should_stop=None, now=None):
+    # Returns (report_path, summary). on_section(result) is called from the calling thread
+    # after each section has been written to the report.
+    collectors = collectors or DEFAULT_COLLECTORS
+    now = now or datetime.now()
+    os.makedirs(reports_folder, exist_ok=True)
+    report_path = os.path.join(reports_folder, report_name(now))
+    summary = {"report": os.path.basename(report_path), "generated": now.isoformat(timespec="seconds"),
+               "sections": []}
+    started = time.time()
+
+    with open(report_path, "w", encoding="utf-8", newline="\n") as report:
+        report.write("=== UpKeep System Diagnostic Report ===\n")
+        report.write(f"Generated on: {now.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        report.write("==============================\n\n")
+        report.flush()
+        with ThreadPoolExecutor(max_workers=max_workers or len(collectors)) as pool:
+            futures = [pool.submit(run_collector, c, should_stop) for c in collectors]
+            for future in as_completed(futures):
+                result = future.result()
+                output = result.pop("output")
+                if output and not output.endswith("\n"):
+                    output += "\n"
+                header = f"[{result['section']}]\n"
+                result["offset"] = report.tell()
+                report.write(header + output + "\n")
+                report.flush()
+                result["length"] = report.tell() - result["offset"]
+                result["lines"] = output.count("\n")
+                summary["sections"].append(result)
+                if on_section:
+                    on_section(result)
+
+    summary["duration"] = time.time() - started
+    with open(os.path.splitext(report_path)[0] + ".json", "w", encoding="utf-8") as sidecar:
+        json.dump(summary, sidecar, indent=2)
+    return report_path, summary
@@ -0,0 +1,73 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Type-to-find for the action launcher. A query matches a name when all its
+# characters appear in it in order, ignoring case; matches that are contiguous
+# or start words rank first, so "fdns" ranks "Flush DNS" ahead of "flushdns backup".
+
+def word_starts(text):
+    starts = set()
+    for index, char in enumerate(text):
+        if index == 0 or (char.isalnum() and not text[index - 1].isalnum()) or \
+                (char.isupper() and text[index - 1].islower()):
+            starts.add(index)
+    return starts
+
+def is_subsequence(query, text, position=0):
+    for char in query:
+        position = text.find(char, position)
+        if position < 0:
+            return False
+        position += 1
+    return True
+
+def fuzzy_score(query, text):
+    # Higher is better; None when text doesn't contain query's characters in order
+    query = query.lower().replace(" ", "")
+    if not query:
+        return 0
+    lowered = text.lower()
+    if not is_subsequence(query, lowered):
+        return None
+    starts = word_starts(text)
+    ordered_starts = sorted(starts)
+    score = 0
+    position = 0
+    previous = None
+    for offset, char in enumerate(query):
+        found = lowered.find(char, position)
+        if found < 0:
+            return None
+        consecutive = previous is not None and found == previous + 1
+        if found not in starts and not consecutive:
+            # A later word start with the same character is a better hit, if the rest still fits after it
+            for start in ordered_starts:
+                if start > found and lowered[start] == char and is_subsequence(query[offset + 1:], lowered, start + 1):
+                    found = start
+                    break
+        score += 1
+        if found in starts:
+            score += 8
+        if previous is not None and found == previous + 1:
+            score += 5
+        elif previous is not None:
+            score -= min(found - previous - 1, 3)
+        previous = found
+        position = found + 1
+    substring = lowered.find(query)
+    if substring >= 0:
+        score += 10 + (5 if substring in starts else 0)
+    return score
+
+def fuzzy_filter(query, names):
+    # Indexes of the names that match, best first; equal scores keep the configured order
+    if not query.strip():
+        return list(range(len(names)))
+    scored = []
+    for index, name in enumerate(names):
+        score = fuzzy_score(query, name)
+        if score is not None:
+            scored.append((-score, index))
+    scored.sort()
+    return [index for _, index in scored]
@@ -0,0 +1,182 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Append-only run history (one JSON object per line). Nothing is read at startup:
+# pages are read backwards from the end of the file on demand, and statistics
+# are folded in incrementally from where the last call stopped.
+
+import hashlib
+import json
+import os
+import threading
+from collections import deque
+
+HISTORY_NAME = "run_history.jsonl"
+OUTPUT_TAIL_BYTES = 4096
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(65536), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+class OutputCapture:
+    # Counts bytes per stream and keeps the last few KB of output for the history record
+    def __init__(self, tail_bytes=OUTPUT_TAIL_BYTES):
+        self.tail_bytes = tail_bytes
+        self.byte_counts = {"stdout": 0, "stderr": 0}
+        self.tail = deque()
+        self.tail_size = 0
+        self.lock = threading.Lock()
+
+    def feed(self, text, stream):
+        size = len(text.encode("utf-8", "replace"))
+        with self.lock:
+            self.byte_counts[stream] = self.byte_counts.get(stream, 0) + size
+            self.tail.append(text)
+            self.tail_size += size
+            while self.tail_size > self.tail_bytes and len(self.tail) > 1:
+                self.tail_size -= len(self.tail.popleft().encode("utf-8", "replace"))
+
+    def output(self):
+        with self.lock:
+            return "".join(self.tail)[-self.tail_bytes:]
+
+def run_record(job, capture, content_hash):
+    return {
+        "script": job.name,
+        "path": job.script_path,
+        "sha256": content_hash,
+        "started": job.started,
+        "finished": job.finished,
+        "duration": round(job.finished - job.started, 3) if job.started and job.finished else None,
+        "exit_code": job.returncode,
+        "timed_out": job.timed_out,
+        "cancelled": job.cancelled,
+        "stdout_bytes": capture.byte_counts["stdout"],
+        "stderr_bytes": capture.byte_counts["stderr"],
+        "resources": job.resources,
+        "output": capture.output()
+    }
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+class RunHistory:
+    block_size = 65536
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stats_offset = 0
+        self.durations = {}
+        self.failures = {}
+
+    def append(self, record):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self.lock:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            with open(self.path, "ab+") as f:
+                size = f.seek(0, 2)
+                if size:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        # The last line was cut short by a crash; start this record on a line of its own
+                        line = "\n" + line
+                f.write(line.encode("utf-8"))
+
+    def page(self, before=None, limit=50):
+        # Up to `limit` records ending just before byte offset `before` (default: end of file),
+        # newest first. Returns (records, offset to pass as `before` for the next, older page);
+        # the offset is 0 once the start of the file has been reached.
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return [], 0
+        records = []
+        with f:
+            end = f.seek(0, 2) if before is None else before
+            position = end
+            pending = b""
+            while position > 0 or pending:
+                if position > 0:
+                    read = min(self.block_size, position)
+                    position -= read
+                    f.seek(position)
+                    pending = f.read(read) + pending
+                    cut = pending.find(b"\n")
+                    if cut == -1:
+                        continue
+                    # Everything before the first newline may be the end of an earlier line
+                    head, body = pending[:cut + 1], pending[cut + 1:]
+                else:
+                    head, body = b"", pending
+                pieces = body.split(b"\n")
+                cursor = end
+                for index in range(len(pieces) - 1, -1, -1):
+                    raw = pieces[index]
+                    start = cursor - len(raw) - (1 if index < len(pieces) - 1 else 0)
+                    if raw.strip():
+                        if len(records) == limit:
+                            return records, cursor
+                        record = self.parse(raw)
+                        if record is not None:
+                            records.append(record)
+                    cursor = start
+                pending = head
+                end = cursor
+                if not head:
+                    break
+            return records, 0
+
+    def parse(self, raw):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            # A line cut short by a crash; skip it rather than losing the whole history
+            return None
+
+    def stats(self):
+        # {script: {"runs", "failures", "failure_rate", "p50", "p95", "max"}}. Only lines appended
+        # since the previous call are parsed, so repeated calls stay cheap on a large history.
+        with self.lock:
+            try:
+                with open(self.path, "rb") as f:
+                    f.seek(self.stats_offset)
+                    for raw in f:
+                        if not raw.endswith(b"\n"):
+                            break
+                        self.stats_offset += len(raw)
+                        record = self.parse(raw)
+                        if not record:
+                            continue
+                        script = record.get("script")
+                        if record.get("duration") is not None:
+                            self.durations.setdefault(script, []).append(record["duration"])
+                        failed = record.get("exit_code") != 0 or record.get("timed_out")
+                        runs, failures = self.failures.get(script, (0, 0))
+                        self.failures[script] = (runs + 1, failures + (1 if failed else 0))
+            except FileNotFoundError:
+                pass
+            result = {}
+            for script, (runs, failures) in self.failures.items():
+                durations = sorted(self.durations.get(script, []))
+                result[script] = {
+                    "runs": runs,
+                    "failures": failures,
+                    "failure_rate": failures / runs if runs else 0.0,
+                    "p50": percentile(durations, 0.50),
+                    "p95": percentile(durations, 0.95),
+                    "max": durations[-1] if durations else None
+                }
+            return result
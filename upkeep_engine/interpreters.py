@@ -0,0 +1,308 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Which program runs which script, by file extension, and pools of long-lived
+# shell sessions. Starting cmd.exe for every run can cost hundreds of
+# milliseconds on machines with AV hooks, so a session is started ahead of time
+# and runs scripts one after another. The end of each script and its exit code
+# are marked by a sentinel line on stdout and stderr. A session is replaced
+# after max_runs scripts, after a script fails, and whenever it dies.
+
+import os
+import queue
+import secrets
+import shlex
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from .procstat import default_backend
+from .runner import Interpreter, default_interpreter, kill_process_tree, spawn_job
+
+BATCH_EXTENSIONS = (".bat", ".cmd")
+SCRIPT_EXTENSIONS = BATCH_EXTENSIONS + (".ps1", ".py", ".sh")
+# Runs one script for a cmd session. setlocal has no effect on commands typed at the prompt,
+# only inside a batch file, so this wrapper gives each script its own environment and folder:
+# the implicit endlocal when it returns undoes any set, path or cd the script did.
+CMD_WRAPPER = "@setlocal\r\n@call %*\r\n@exit /b %errorlevel%\r\n"
+
+def builtin_commands():
+    if os.name == "nt":
+        powershell = ["powershell.exe", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass", "-File"]
+    else:
+        powershell = ["pwsh", "-NoProfile", "-NonInteractive", "-File"]
+    # -u: Python scripts' output shows up line by line instead of when the buffer fills
+    return {".ps1": powershell, ".py": [sys.executable, "-u"], ".sh": ["sh"]}
+
+class InterpreterRegistry:
+    # batch_command is the 'interpreter' setting: it runs .bat and .cmd files, and any file
+    # whose extension has no entry. commands maps extensions to commands ("pwsh -File" or a
+    # list); None removes an extension.
+    def __init__(self, batch_command=None, commands=None):
+        self.batch = default_interpreter(batch_command)
+        self.interpreters = {extension: self.batch for extension in BATCH_EXTENSIONS}
+        merged = builtin_commands()
+        merged.update({extension.lower(): command for extension, command in (commands or {}).items()})
+        flags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        for extension, command in merged.items():
+            if not command:
+                self.interpreters.pop(extension, None)
+            else:
+                command = shlex.split(command) if isinstance(command, str) else command
+                self.interpreters[extension] = Interpreter(command, flags)
+        self.pools = []
+
+    @property
+    def extensions(self):
+        return tuple(self.interpreters)
+
+    def resolve(self, script_path):
+        return self.interpreters.get(os.path.splitext(script_path)[1].lower(), self.batch)
+
+    def start_sessions(self, size=2, max_runs=50):
+        # Gives every shell interpreter a pool of size warm sessions (0 keeps one process per run)
+        if size <= 0:
+            return
+        for interpreter in set(self.interpreters.values()):
+            if interpreter.session and interpreter.pool is None:
+                interpreter.pool = SessionPool(interpreter, size, max_runs)
+                interpreter.pool.warm()
+                self.pools.append(interpreter.pool)
+
+    def close(self):
+        for pool in self.pools:
+            pool.close()
+
+class ShellSession:
+    startup_timeout = 10
+
+    def __init__(self, interpreter, backend=None):
+        self.interpreter = interpreter
+        self.backend = backend
+        self.kind = interpreter.session
+        self.sentinel = f"__upkeep_{secrets.token_hex(8)}__"
+        self.runs = 0
+        self.healthy = True
+        self.cwd = os.getcwd()
+        self.wrapper = None
+        # cmd.exe reads commands from stdin without /c; /q turns echo off, /d skips AutoRun
+        argv = interpreter.command if self.kind == "sh" else [interpreter.command[0], "/q", "/d"]
+        self.process = subprocess.Popen(
+            argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            creationflags=interpreter.creationflags,
+            start_new_session=os.name != "nt"
+        )
+        self.lines = queue.Queue()
+        for name, stream in (("stdout", self.process.stdout), ("stderr", self.process.stderr)):
+            threading.Thread(target=self.pump, args=(stream, name), daemon=True).start()
+        # Whatever the shell prints on start (cmd's banner) comes before the first sentinel
+        try:
+            self.send(self.sentinel_commands())
+            code = self.collect(lambda line, stream: None, time.monotonic() + self.startup_timeout)
+        except OSError:
+            code = None
+        if code is None:
+            self.close()
+            raise OSError(f"{argv[0]} session did not start")
+
+    def pump(self, stream, name):
+        try:
+            for line in iter(stream.readline, ''):
+                self.lines.put((name, line))
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.lines.put((name, None))
+
+    def sentinel_commands(self):
+        if self.kind == "sh":
+            return f'echo "{self.sentinel} $?"\necho {self.sentinel} >&2\n'
+        # One command per line: cmd expands %errorlevel% when it reads a line, not when it runs it
+        return f"@echo {self.sentinel} %errorlevel%\n@echo {self.sentinel} 1>&2\n"
+
+    def script_commands(self, script_path):
+        path = os.path.abspath(script_path)
+        if self.kind == "sh":
+            # A subshell keeps the script's cd, variables and exit from reaching the session
+            return f"( . {shlex.quote(path)} ) </dev/null\n" + self.sentinel_commands()
+        if self.wrapper is None:
+            handle, self.wrapper = tempfile.mkstemp(prefix="upkeep_session_", suffix=".cmd")
+            with os.fdopen(handle, "w", newline="") as f:
+                f.write(CMD_WRAPPER)
+        # The wrapper keeps set/path/cd from reaching later scripts; echo is a prompt setting
+        return (f'@call "{self.wrapper}" "{path}" <nul\n' + self.sentinel_commands()
+                + f'@echo off\n@cd /d "{self.cwd}"\n')
+
+    def send(self, commands):
+        try:
+            self.process.stdin.write(commands)
+            self.process.stdin.flush()
+        except (OSError, ValueError) as e:
+            self.healthy = False
+            raise OSError(f"shell session closed: {e}") from e
+
+    def collect(self, on_output, deadline=None):
+        # Forwards output until the sentinel has shown up on both streams and returns the exit
+        # code; None when the session died or the deadline passed first
+        code = None
+        waiting = {"stdout", "stderr"}
+        ended = False
+        while waiting:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                self.healthy = False
+                return None
+            try:
+                stream, line = self.lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if line is None:
+                waiting.discard(stream)
+                ended = True
+                continue
+            index = line.find(self.sentinel)
+            if index < 0:
+                on_output(line, stream)
+                continue
+            if index:
+                on_output(line[:index], stream)  # The script's last line had no newline
+            waiting.discard(stream)
+            if stream == "stdout":
+                try:
+                    code = int(line[index + len(self.sentinel):].split()[0])
+                except (IndexError, ValueError):
+                    code = None
+        if ended or code is None:
+            self.healthy = False
+            return None
+        return code
+
+    def run(self, job, on_output):
+        # Like spawn_job; raises OSError before the script starts if the session is gone
+        # The shell's CPU and I/O counters include every earlier script it ran; ProcessSampler
+        # subtracts this reading so the run only gets what happened after it
+        if self.backend is not None:
+            job.baseline = self.backend.sample(self.process.pid)
+        self.send(self.script_commands(job.script_path))
+        job.started = job.started or time.time()
+        # Cancelling or timing out kills the session along with the script
+        with job.lock:
+            job.process = self.process
+            if job.cancelled:
+                kill_process_tree(self.process)
+        deadline = time.monotonic() + job.timeout if job.timeout else None
+        code = self.collect(on_output, deadline)
+        self.runs += 1
+        if code is None:
+            if self.process.poll() is None:
+                job.timed_out = not job.cancelled
+                kill_process_tree(self.process)
+            # A script that exits the shell itself (cmd's exit without /b) leaves its code here
+            code = self.process.wait()
+        if code != 0:
+            self.healthy = False
+        # The session goes back to the pool and may run the next script before the sampler or a
+        # late cancel lets go of the job
+        with job.lock:
+            job.process = None
+        job.finished = time.time()
+        job.returncode = code
+        return code
+
+    def close(self):
+        self.healthy = False
+        try:
+            self.process.stdin.close()
+        except (OSError, ValueError):
+            pass
+        kill_process_tree(self.process)
+        self.process.wait()
+        if self.wrapper is not None:
+            try:
+                os.remove(self.wrapper)
+            except OSError:
+                pass
+
+class SessionPool:
+    def __init__(self, interpreter, size=2, max_runs=50):
+        self.interpreter = interpreter
+        self.size = size
+        self.max_runs = max_runs
+        self.idle = []
+        self.starting = 0
+        self.disabled = False
+        self.closed = False
+        self.backend = default_backend()
+        self.lock = threading.Lock()
+
+    def warm(self):
+        # Starts sessions in the background until size of them are idle
+        with self.lock:
+            missing = self.size - len(self.idle) - self.starting
+            if self.closed or self.disabled or missing <= 0:
+                return
+            self.starting += missing
+        for _ in range(missing):
+            threading.Thread(target=self.start_session, daemon=True).start()
+
+    def start_session(self):
+        try:
+            session = ShellSession(self.interpreter, self.backend)
+        except OSError:
+            session = None
+        with self.lock:
+            self.starting -= 1
+            if session is None:
+                self.disabled = True  # The shell can't be started; every run spawns its own process
+                return
+            if not self.closed:
+                self.idle.append(session)
+                return
+        session.close()
+
+    def acquire(self):
+        with self.lock:
+            while self.idle:
+                session = self.idle.pop()
+                if session.process.poll() is None:
+                    return session
+        return None
+
+    def run_job(self, job, on_output):
+        # With every session busy (or none started yet) the job gets a process of its own,
+        # so a run is never slower than without the pool
+        session = self.acquire()
+        if session is None:
+            self.warm()
+            return spawn_job(job, self.interpreter, on_output)
+        try:
+            return session.run(job, on_output)
+        except OSError:
+            session.healthy = False
+            return spawn_job(job, self.interpreter, on_output)
+        finally:
+            self.release(session)
+
+    def release(self, session):
+        with self.lock:
+            keep = session.healthy and session.runs < self.max_runs and not self.closed
+            if keep:
+                self.idle.append(session)
+        if not keep:
+            session.close()
+            self.warm()
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for session in idle:
+            session.close()
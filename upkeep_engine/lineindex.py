@@ -0,0 +1,114 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Read-only, memory-mapped access to large text files by line number. The
+# line-offset index is built in chunks (usually on a background thread), and
+# lines that are already indexed can be read while the rest is still scanning.
+
+import bisect
+import mmap
+import re
+import threading
+from array import array
+
+NEWLINE = re.compile(b"\n")
+
+class LineIndex:
+    chunk_size = 4 * 1024 * 1024
+
+    def __init__(self, path, encoding="utf-8"):
+        self.path = path
+        self.encoding = encoding
+        self.file = open(path, "rb")
+        self.size = self.file.seek(0, 2)
+        # mmap refuses empty files; a plain empty bytes object behaves the same for us
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self.offsets = array("Q", [0])
+        self.scanned = 0
+        self.complete = self.size == 0
+        self.cancelled = False
+        self.builder = None
+        self.lock = threading.Lock()
+
+    def build(self, on_progress=None):
+        while not self.complete and not self.cancelled:
+            end = min(self.scanned + self.chunk_size, self.size)
+            found = array("Q", (m.end() for m in NEWLINE.finditer(self.data, self.scanned, end)))
+            with self.lock:
+                self.offsets.extend(found)
+                self.scanned = end
+                if end == self.size:
+                    # A last line without a trailing newline still counts as a line
+                    if self.offsets[-1] != self.size:
+                        self.offsets.append(self.size)
+                    self.complete = True
+            if on_progress:
+                on_progress(self.scanned, self.size)
+
+    def build_in_background(self, on_progress=None):
+        self.builder = threading.Thread(target=self.build, args=(on_progress,), daemon=True)
+        self.builder.start()
+        return self.builder
+
+    def line_count(self):
+        # Lines whose end has been indexed so far
+        with self.lock:
+            return len(self.offsets) - 1
+
+    def lines(self, start, count, max_chars=None):
+        with self.lock:
+            end = min(start + count, len(self.offsets) - 1)
+            spans = [(self.offsets[i], self.offsets[i + 1]) for i in range(max(start, 0), end)]
+        result = []
+        for begin, finish in spans:
+            if max_chars is not None:
+                finish = min(finish, begin + max_chars * 4)
+            line = self.data[begin:finish].decode(self.encoding, "replace").rstrip("\r\n")
+            result.append(line[:max_chars] if max_chars is not None else line)
+        return result
+
+    def line_at(self, offset):
+        with self.lock:
+            return max(bisect.bisect_right(self.offsets, offset) - 1, 0)
+
+    def search(self, pattern, start_line=0, backwards=False, ignore_case=True):
+        # pattern is a plain string; returns the line number of the next match or None.
+        # Only the part of the file that has been indexed is searched.
+        needle = re.compile(re.escape(pattern.encode(self.encoding)), re.IGNORECASE if ignore_case else 0)
+        with self.lock:
+            line_total = len(self.offsets) - 1
+            if line_total <= 0 or (not backwards and start_line >= line_total):
+                return None
+            start_line = min(max(start_line, 0), line_total - 1)
+            if backwards:
+                limit = self.offsets[start_line]
+            else:
+                begin = self.offsets[start_line]
+                limit = self.offsets[line_total]
+        if backwards:
+            match = None
+            # Scan backwards a chunk at a time so the common case stays close to the cursor
+            window_end = limit
+            while window_end > 0 and match is None:
+                window_start = max(window_end - self.chunk_size, 0)
+                for match in needle.finditer(self.data, window_start, window_end):
+                    pass
+                window_end = window_start + len(pattern) - 1 if window_start else 0
+            return self.line_at(match.start()) if match else None
+        match = needle.search(self.data, begin, limit)
+        return self.line_at(match.start()) if match else None
+
+    def close(self):
+        self.cancelled = True
+        if self.builder is not None:
+            self.builder.join()
+        with self.lock:
+            data, self.data = self.data, b""
+        try:
+            if isinstance(data, mmap.mmap):
+                data.close()
+        except BufferError:
+            # A search thread still holds the map; it is released when that thread finishes
+            pass
+        self.file.close()
@@ -0,0 +1,189 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Searchable store of everything written to the output pane. Every line gets a
+# sequence number and remembers its run and stream. Lines are kept in blocks;
+# a full block is sealed with its text joined once and its line offsets, so a
+# regex search is one scan per block instead of a Text.search over the widget.
+# Blocks also record which runs and streams they contain, so filtered searches
+# skip blocks that cannot match.
+
+import re
+from bisect import bisect_right
+
+BLOCK_LINES = 4096
+
+class Block:
+    def __init__(self, first_seq):
+        self.first_seq = first_seq
+        self.texts = []
+        self.runs = []
+        self.stderr = []
+        self.run_ids = set()
+        self.stderr_count = 0
+        self.joined = None
+        self.offsets = None
+        self.lowered = None
+
+    def seal(self):
+        self.joined, self.offsets = self.join()
+
+    def join(self):
+        offsets = []
+        position = 0
+        for text in self.texts:
+            offsets.append(position)
+            position += len(text) + 1
+        return "\n".join(self.texts), offsets
+
+    def may_match(self, stream, run):
+        if run is not None and run not in self.run_ids:
+            return False
+        if stream == "stderr" and not self.stderr_count:
+            return False
+        if stream == "stdout" and self.stderr_count == len(self.texts):
+            return False
+        return True
+
+    def folded(self):
+        # Lower-cased copy of a sealed block for case-insensitive searches, or None when
+        # lower-casing would change the length and break the line offsets
+        if self.lowered is None:
+            lowered = self.joined.lower()
+            self.lowered = lowered if len(lowered) == len(self.joined) else False
+        return self.lowered or None
+
+class OutputStore:
+    def __init__(self, max_lines=200000):
+        self.max_lines = max_lines
+        self.blocks = [Block(0)]
+        self.block_starts = [0]
+        self.next_seq = 0
+
+    @property
+    def first_seq(self):
+        return self.blocks[0].first_seq
+
+    def append(self, text, stream="stdout", run=None):
+        # Splits text into lines and returns the sequence number of the first one.
+        # A trailing newline ends the last line; text without one still counts as a line.
+        first = self.next_seq
+        lines = text.split("\n")
+        if text.endswith("\n"):
+            lines.pop()
+        is_stderr = stream == "stderr"
+        for line in lines:
+            block = self.blocks[-1]
+            if len(block.texts) >= BLOCK_LINES:
+                block.seal()
+                block = Block(self.next_seq)
+                self.blocks.append(block)
+                self.block_starts.append(self.next_seq)
+            block.texts.append(line.rstrip("\r"))
+            block.runs.append(run)
+            block.stderr.append(is_stderr)
+            block.run_ids.add(run)
+            block.stderr_count += is_stderr
+            self.next_seq += 1
+        # Drop whole blocks from the front once the oldest one is no longer needed
+        while len(self.blocks) > 1 and self.next_seq - self.blocks[1].first_seq >= self.max_lines:
+            self.blocks.pop(0)
+            self.block_starts.pop(0)
+        return first
+
+    def __len__(self):
+        return self.next_seq - self.first_seq
+
+    def block_for(self, seq):
+        return self.blocks[bisect_right(self.block_starts, seq) - 1]
+
+    def line(self, seq):
+        # (text, stream, run) for a stored line
+        block = self.block_for(seq)
+        index = seq - block.first_seq
+        return block.texts[index], "stderr" if block.stderr[index] else "stdout", block.runs[index]
+
+    def matches(self, seq, stream=None, run=None):
+        block = self.block_for(seq)
+        index = seq - block.first_seq
+        if run is not None and block.runs[index] != run:
+            return False
+        if stream is not None and block.stderr[index] != (stream == "stderr"):
+            return False
+        return True
+
+    def select(self, first, last, stream=None, run=None):
+        # Sequence numbers in [first, last) that pass the filters
+        first = max(first, self.first_seq)
+        last = min(last, self.next_seq)
+        selected = []
+        for block in self.blocks:
+            end = block.first_seq + len(block.texts)
+            if end <= first or block.first_seq >= last or not block.may_match(stream, run):
+                continue
+            for index in range(max(first, block.first_seq) - block.first_seq, min(last, end) - block.first_seq):
+                if run is not None and block.runs[index] != run:
+                    continue
+                if stream is not None and block.stderr[index] != (stream == "stderr"):
+                    continue
+                selected.append(block.first_seq + index)
+        return selected
+
+    def tail(self, count, stream=None, run=None, before=None):
+        # The last count lines passing the filters, oldest first, optionally ending before a seq
+        before = self.next_seq if before is None else before
+        selected = []
+        if count <= 0:
+            return selected
+        for block in reversed(self.blocks):
+            if block.first_seq >= before or not block.may_match(stream, run):
+                continue
+            end = min(before, block.first_seq + len(block.texts))
+            selected[:0] = self.select(block.first_seq, end, stream, run)[-(count - len(selected)):]
+            if len(selected) >= count:
+                break
+        return selected
+
+    def search(self, pattern, ignore_case=False, regex=True, stream=None, run=None, limit=10000):
+        # Returns [(seq, start column, end column)] in order, at most the newest limit of them
+        # (find starts from the latest output); raises re.error for a bad pattern
+        source = pattern if regex else re.escape(pattern)
+        compiled = re.compile(source, re.MULTILINE | (re.IGNORECASE if ignore_case else 0))
+        # re.IGNORECASE is several times slower than a plain scan, so when lower-casing the
+        # pattern can't change its meaning (no \w-style escapes or inline flags), search
+        # lower-cased text instead
+        folded = None
+        if ignore_case and not re.search(r"\\[A-Za-z]|\(\?", source):
+            folded = re.compile(source.lower(), re.MULTILINE)
+        found = []
+        total = 0
+        for block in reversed(self.blocks):
+            if not block.may_match(stream, run):
+                continue
+            if block.joined is not None:
+                joined, offsets = block.joined, block.offsets
+                if folded is not None and block.folded() is not None:
+                    joined, scan = block.folded(), folded
+                else:
+                    scan = compiled
+            else:
+                (joined, offsets), scan = block.join(), compiled
+            results = []
+            for match in scan.finditer(joined):
+                start, end = match.span()
+                if start == end:
+                    continue
+                index = bisect_right(offsets, start) - 1
+                if run is not None and block.runs[index] != run:
+                    continue
+                if stream is not None and block.stderr[index] != (stream == "stderr"):
+                    continue
+                column = start - offsets[index]
+                results.append((block.first_seq + index, column,
+                                min(end - offsets[index], len(block.texts[index]))))
+            found.append(results)
+            total += len(results)
+            if total >= limit:
+                break
+        return [match for results in reversed(found) for match in results][-limit:]
@@ -0,0 +1,213 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Named pipelines: scripts with dependencies between them, configured under
+# "pipelines" in settings.json:
+#     {"name": "Fix Network", "max_parallel": 2, "on_failure": "stop",
+#      "steps": [{"script": "flushdns.bat"},
+#                {"script": "iprenew.bat", "after": ["flushdns.bat"]},
+#                {"script": "netinfo.bat"}]}
+# A step starts as soon as everything it comes after has succeeded. With
+# on_failure "stop" nothing new starts after a failure; with "continue" only
+# the steps that depend on the failed one are skipped.
+
+import concurrent.futures
+import os
+import time
+
+from .history import OutputCapture, file_hash, run_record
+from .runner import ScriptJob, kill_job, run_job
+
+POLICIES = ("stop", "continue")
+
+class Step:
+    def __init__(self, script, id=None, after=None, timeout=None):
+        self.script = script
+        self.id = id or script
+        self.after = list(after or [])
+        self.timeout = timeout
+
+class Pipeline:
+    def __init__(self, name, steps, max_parallel=2, on_failure="stop"):
+        if on_failure not in POLICIES:
+            raise ValueError(f"{name}: on_failure must be one of {', '.join(POLICIES)}")
+        self.name = name
+        self.steps = {}
+        for step in steps:
+            if step.id in self.steps:
+                raise ValueError(f"{name}: step {step.id!r} appears twice (give one an \"id\")")
+            self.steps[step.id] = step
+        self.max_parallel = max(1, int(max_parallel))
+        self.on_failure = on_failure
+        self.order = self.topological_order()
+
+    def topological_order(self):
+        # Kahn's algorithm in definition order; anything left over is part of a cycle
+        for step in self.steps.values():
+            for dependency in step.after:
+                if dependency not in self.steps:
+                    raise ValueError(f"{self.name}: {step.id} comes after unknown step {dependency!r}")
+        remaining = {step_id: len(set(step.after)) for step_id, step in self.steps.items()}
+        order = []
+        ready = [step_id for step_id, count in remaining.items() if count == 0]
+        while ready:
+            step_id = ready.pop(0)
+            order.append(step_id)
+            for dependent in self.dependents(step_id):
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) != len(self.steps):
+            cycle = sorted(set(self.steps) - set(order))
+            raise ValueError(f"{self.name}: steps depend on each other in a cycle: {', '.join(cycle)}")
+        return order
+
+    def dependents(self, step_id):
+        return [other.id for other in self.steps.values() if step_id in other.after]
+
+def load_pipelines(definitions):
+    pipelines = {}
+    for definition in definitions or []:
+        steps = [Step(s["script"], s.get("id"), s.get("after"), s.get("timeout")) for s in definition["steps"]]
+        pipeline = Pipeline(definition["name"], steps, definition.get("max_parallel", 2),
+                            definition.get("on_failure", "stop"))
+        pipelines[pipeline.name] = pipeline
+    return pipelines
+
+def run_pipeline(pipeline, scripts_folder, interpreter, timeouts=None, history=None,
+                 on_step_start=None, on_step_done=None, should_stop=None, scheduler=None):
+    # Returns {step id: result} with result["status"] one of ok, failed, skipped, cancelled.
+    # on_step_done(step, result) gets the step's whole output at once, so concurrent steps
+    # never interleave their lines. Steps run on this pipeline's own threads. With a
+    # ScriptScheduler, each step claims its script there: a step whose script is already
+    # running fails instead of starting, and no more steps run at once than it has workers.
+    timeouts = timeouts or {}
+    results = {}
+    waiting = {step_id: set(step.after) for step_id, step in pipeline.steps.items()}
+    jobs = {}
+    stopping = False
+    max_parallel = pipeline.max_parallel
+    if scheduler is not None:
+        max_parallel = min(max_parallel, len(scheduler.workers))
+
+    def start_job(step):
+        path = os.path.join(scripts_folder, step.script)
+        timeout = step.timeout or timeouts.get(step.script)
+        job = scheduler.claim(path, timeout) if scheduler is not None else ScriptJob(path, timeout)
+        if job is not None:
+            jobs[step.id] = job
+        return job
+
+    def run_step(step, job):
+        try:
+            return execute_step(step, job)
+        finally:
+            if scheduler is not None:
+                scheduler.finish(job)
+
+    def execute_step(step, job):
+        path = job.script_path
+        if should_stop and should_stop():
+            job.cancelled = True  # Cancelled between being scheduled and starting
+        output = []
+        capture = OutputCapture()
+
+        def on_output(line, stream):
+            capture.feed(line, stream)
+            output.append((line, stream))
+
+        content_hash = file_hash(path)
+        if on_step_start:
+            on_step_start(step)
+        started = time.time()
+        try:
+            code = run_job(job, interpreter, on_output)
+        except OSError as e:
+            return {"status": "failed", "exit_code": None, "duration": time.time() - started,
+                    "output": output + [(f"Error: {e}\n", "stderr")]}
+        if history:
+            history.append(run_record(job, capture, content_hash))
+        if job.cancelled:
+            status = "cancelled"
+        else:
+            status = "ok" if code == 0 and not job.timed_out else "failed"
+        return {"status": status, "exit_code": code, "duration": time.time() - started,
+                "timed_out": job.timed_out, "output": output}
+
+    def skip(step_id, reason):
+        # Skips step_id and, transitively, everything that waits on it
+        pending = [step_id]
+        while pending:
+            current = pending.pop()
+            if current in results:
+                continue
+            results[current] = {"status": "skipped", "reason": reason, "output": []}
+            waiting.pop(current, None)
+            if on_step_done:
+                on_step_done(pipeline.steps[current], results[current])
+            pending.extend(pipeline.dependents(current))
+
+    def finished(step_id, result):
+        nonlocal stopping
+        results[step_id] = result
+        if on_step_done:
+            on_step_done(pipeline.steps[step_id], result)
+        if result["status"] == "ok":
+            for dependent in pipeline.dependents(step_id):
+                if dependent in waiting:
+                    waiting[dependent].discard(step_id)
+        elif pipeline.on_failure == "stop":
+            stopping = True
+        else:
+            for dependent in pipeline.dependents(step_id):
+                skip(dependent, f"{step_id} {result['status']}")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_parallel) as pool:
+        running = {}
+        while True:
+            if not stopping:
+                for step_id in pipeline.order:
+                    if len(running) >= max_parallel or stopping:
+                        break
+                    if step_id in waiting and not waiting[step_id]:
+                        del waiting[step_id]
+                        step = pipeline.steps[step_id]
+                        job = start_job(step)
+                        if job is None:
+                            # The script is running outside the pipeline; two copies at once could
+                            # undo each other's work
+                            finished(step_id, {"status": "failed", "exit_code": None, "duration": 0.0,
+                                               "output": [(f"Error: {step.script} is already running\n", "stderr")]})
+                            continue
+                        running[pool.submit(run_step, step, job)] = step_id
+            if not running:
+                break
+            done, _ = concurrent.futures.wait(running, timeout=0.5, return_when=concurrent.futures.FIRST_COMPLETED)
+            if should_stop and should_stop() and not stopping:
+                stopping = True
+                for step_id in running.values():
+                    job = jobs.get(step_id)
+                    if job is not None:
+                        job.cancelled = True
+                        kill_job(job)
+            for future in done:
+                finished(running.pop(future), future.result())
+    for step_id in pipeline.order:
+        if step_id not in results:
+            reason = "pipeline cancelled" if should_stop and should_stop() else "an earlier step failed"
+            results[step_id] = {"status": "skipped", "reason": reason, "output": []}
+            if on_step_done:
+                on_step_done(pipeline.steps[step_id], results[step_id])
+    return {step_id: results[step_id] for step_id in pipeline.order}
+
+def pipeline_succeeded(results):
+    return all(result["status"] == "ok" for result in results.values())
+
+def format_step(step, result):
+    # Header line printed above a finished step's output
+    if result["status"] == "skipped":
+        return f"== {step.id}: skipped ({result['reason']})"
+    code = result.get("exit_code")
+    return (f"== {step.id}: {result['status']}" + (f", exit {code}" if code is not None else "")
+            + f" after {result['duration']:.2f}s" + (" (timed out)" if result.get("timed_out") else ""))
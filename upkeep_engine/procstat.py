@@ -0,0 +1,286 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Resource sampling for running jobs. One sampler thread serves every job, and it
+# sleeps without waking while nothing is running. Backends: psutil when it is
+# installed, /proc on Linux, the Win32 API through ctypes on Windows.
+
+import os
+import sys
+import threading
+import time
+
+class ProcBackend:
+    # Linux /proc. CPU includes cutime/cstime so children that already exited still count.
+    def __init__(self):
+        self.ticks = os.sysconf("SC_CLK_TCK")
+        self.page_size = os.sysconf("SC_PAGE_SIZE")
+
+    def read_stat(self, pid):
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            data = f.read()
+        # The command name may contain spaces or parentheses, so split after the last ')'
+        fields = data[data.rindex(b")") + 2:].split()
+        return int(fields[1]), sum(int(v) for v in fields[11:15]), int(fields[21])
+
+    def children(self, pid):
+        result = []
+        try:
+            for tid in os.listdir(f"/proc/{pid}/task"):
+                with open(f"/proc/{pid}/task/{tid}/children", "rb") as f:
+                    result.extend(int(c) for c in f.read().split())
+        except OSError:
+            pass
+        return result
+
+    def read_io(self, pid):
+        read_bytes = write_bytes = 0
+        try:
+            with open(f"/proc/{pid}/io", "rb") as f:
+                for line in f:
+                    # rchar/wchar count pipe and disk traffic alike and need no extra privileges
+                    if line.startswith(b"rchar:"):
+                        read_bytes = int(line.split()[1])
+                    elif line.startswith(b"wchar:"):
+                        write_bytes = int(line.split()[1])
+        except OSError:
+            pass
+        return read_bytes, write_bytes
+
+    def sample(self, pid):
+        pids = [pid]
+        totals = {"cpu": 0.0, "rss": 0, "read_bytes": 0, "write_bytes": 0, "processes": 0}
+        while pids:
+            current = pids.pop()
+            try:
+                _, cpu_ticks, rss_pages = self.read_stat(current)
+            except (OSError, ValueError, IndexError):
+                continue
+            totals["cpu"] += cpu_ticks / self.ticks
+            totals["rss"] += rss_pages * self.page_size
+            read_bytes, write_bytes = self.read_io(current)
+            totals["read_bytes"] += read_bytes
+            totals["write_bytes"] += write_bytes
+            totals["processes"] += 1
+            pids.extend(self.children(current))
+        return totals if totals["processes"] else None
+
+class PsutilBackend:
+    def __init__(self, psutil):
+        self.psutil = psutil
+
+    def sample(self, pid):
+        try:
+            root = self.psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except self.psutil.Error:
+            return None
+        totals = {"cpu": 0.0, "rss": 0, "read_bytes": 0, "write_bytes": 0, "processes": 0}
+        for process in processes:
+            try:
+                with process.oneshot():
+                    times = process.cpu_times()
+                    totals["cpu"] += times.user + times.system
+                    totals["rss"] += process.memory_info().rss
+                    try:
+                        io = process.io_counters()
+                        totals["read_bytes"] += io.read_bytes
+                        totals["write_bytes"] += io.write_bytes
+                    except (self.psutil.Error, AttributeError):
+                        pass
+                totals["processes"] += 1
+            except self.psutil.Error:
+                continue
+        return totals if totals["processes"] else None
+
+class WindowsBackend:
+    # Toolhelp snapshot for the process tree, then GetProcessTimes / GetProcessMemoryInfo /
+    # GetProcessIoCounters per process
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+        self.ctypes = ctypes
+        self.kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        self.psapi = ctypes.WinDLL("psapi", use_last_error=True)
+
+        class PROCESSENTRY32W(ctypes.Structure):
+            _fields_ = [("dwSize", wintypes.DWORD), ("cntUsage", wintypes.DWORD),
+                        ("th32ProcessID", wintypes.DWORD), ("th32DefaultHeapID", ctypes.c_void_p),
+                        ("th32ModuleID", wintypes.DWORD), ("cntThreads", wintypes.DWORD),
+                        ("th32ParentProcessID", wintypes.DWORD), ("pcPriClassBase", wintypes.LONG),
+                        ("dwFlags", wintypes.DWORD), ("szExeFile", wintypes.WCHAR * 260)]
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        class IO_COUNTERS(ctypes.Structure):
+            _fields_ = [(name, ctypes.c_ulonglong) for name in
+                        ("ReadOperationCount", "WriteOperationCount", "OtherOperationCount",
+                         "ReadTransferCount", "WriteTransferCount", "OtherTransferCount")]
+
+        self.PROCESSENTRY32W = PROCESSENTRY32W
+        self.PROCESS_MEMORY_COUNTERS = PROCESS_MEMORY_COUNTERS
+        self.IO_COUNTERS = IO_COUNTERS
+        self.FILETIME = wintypes.FILETIME
+        self.kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+        self.kernel32.OpenProcess.restype = wintypes.HANDLE
+
+    def parents(self):
+        snapshot = self.kernel32.CreateToolhelp32Snapshot(0x00000002, 0)  # TH32CS_SNAPPROCESS
+        if snapshot in (None, self.ctypes.c_void_p(-1).value):
+            return {}
+        children = {}
+        try:
+            entry = self.PROCESSENTRY32W()
+            entry.dwSize = self.ctypes.sizeof(entry)
+            more = self.kernel32.Process32FirstW(snapshot, self.ctypes.byref(entry))
+            while more:
+                children.setdefault(entry.th32ParentProcessID, []).append(entry.th32ProcessID)
+                more = self.kernel32.Process32NextW(snapshot, self.ctypes.byref(entry))
+        finally:
+            self.kernel32.CloseHandle(snapshot)
+        return children
+
+    def sample(self, pid):
+        children = self.parents()
+        totals = {"cpu": 0.0, "rss": 0, "read_bytes": 0, "write_bytes": 0, "processes": 0}
+        pids, seen = [pid], set()
+        while pids:
+            current = pids.pop()
+            if current in seen:
+                continue  # Windows reuses PIDs, so parent links can form loops
+            seen.add(current)
+            pids.extend(children.get(current, []))
+            # PROCESS_QUERY_LIMITED_INFORMATION | PROCESS_VM_READ
+            handle = self.kernel32.OpenProcess(0x1000 | 0x0010, False, current)
+            if not handle:
+                continue
+            try:
+                created, exited, kernel, user = (self.FILETIME() for _ in range(4))
+                if self.kernel32.GetProcessTimes(handle, self.ctypes.byref(created), self.ctypes.byref(exited),
+                                                 self.ctypes.byref(kernel), self.ctypes.byref(user)):
+                    for value in (kernel, user):
+                        totals["cpu"] += ((value.dwHighDateTime << 32) | value.dwLowDateTime) / 1e7
+                memory = self.PROCESS_MEMORY_COUNTERS()
+                memory.cb = self.ctypes.sizeof(memory)
+                if self.psapi.GetProcessMemoryInfo(handle, self.ctypes.byref(memory), memory.cb):
+                    totals["rss"] += memory.WorkingSetSize
+                io = self.IO_COUNTERS()
+                if self.kernel32.GetProcessIoCounters(handle, self.ctypes.byref(io)):
+                    totals["read_bytes"] += io.ReadTransferCount
+                    totals["write_bytes"] += io.WriteTransferCount
+                totals["processes"] += 1
+            finally:
+                self.kernel32.CloseHandle(handle)
+        return totals if totals["processes"] else None
+
+class NullBackend:
+    def sample(self, pid):
+        return None
+
+def default_backend():
+    try:
+        import psutil
+        return PsutilBackend(psutil)
+    except ImportError:
+        pass
+    if sys.platform.startswith("linux") and os.path.isdir("/proc"):
+        return ProcBackend()
+    if os.name == "nt":
+        try:
+            return WindowsBackend()
+        except (OSError, AttributeError):
+            pass
+    return NullBackend()
+
+class ProcessSampler:
+    # Call watch(job) before the job starts and unwatch(job) when it ends. While it runs,
+    # job.sample holds the latest reading; unwatch() returns (and sets job.resources to)
+    # the run summary.
+    def __init__(self, interval=1.0, backend=None):
+        self.interval = interval
+        self.backend = backend or default_backend()
+        self.jobs = {}
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def watch(self, job, on_sample=None):
+        if not self.interval or isinstance(self.backend, NullBackend):
+            return
+        with self.condition:
+            self.jobs[job] = {"on_sample": on_sample, "last": None, "peak_rss": 0, "cpu": 0.0,
+                              "read_bytes": 0, "write_bytes": 0, "max_processes": 0, "samples": 0}
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.loop, daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def unwatch(self, job):
+        with self.condition:
+            state = self.jobs.pop(job, None)
+        if state is None:
+            return None
+        job.resources = {
+            "peak_rss": state["peak_rss"],
+            "cpu_seconds": round(state["cpu"], 3),
+            "read_bytes": state["read_bytes"],
+            "write_bytes": state["write_bytes"],
+            "max_processes": state["max_processes"],
+            "samples": state["samples"]
+        }
+        return job.resources
+
+    def loop(self):
+        while True:
+            with self.condition:
+                while not self.jobs:
+                    self.condition.wait()
+                watched = list(self.jobs.items())
+            for job, state in watched:
+                process = job.process
+                if process is None or process.poll() is not None:
+                    continue
+                totals = self.backend.sample(process.pid)
+                if totals is None:
+                    continue
+                baseline = job.baseline
+                if baseline is not None:
+                    for key in ("cpu", "read_bytes", "write_bytes"):
+                        totals[key] = max(totals[key] - baseline[key], 0)
+                self.update(job, state, totals)
+            with self.condition:
+                self.condition.wait(self.interval)
+
+    def update(self, job, state, totals):
+        now = time.monotonic()
+        last = state["last"]
+        cpu_percent = 0.0
+        if last is not None and now > last[0]:
+            cpu_percent = max(totals["cpu"] - last[1], 0.0) / (now - last[0]) * 100
+        state["last"] = (now, totals["cpu"])
+        # The tree shrinks as children exit, so keep the highest totals seen
+        state["peak_rss"] = max(state["peak_rss"], totals["rss"])
+        state["cpu"] = max(state["cpu"], totals["cpu"])
+        state["read_bytes"] = max(state["read_bytes"], totals["read_bytes"])
+        state["write_bytes"] = max(state["write_bytes"], totals["write_bytes"])
+        state["max_processes"] = max(state["max_processes"], totals["processes"])
+        state["samples"] += 1
+        job.sample = dict(totals, cpu_percent=cpu_percent)
+        if state["on_sample"]:
+            state["on_sample"](job, job.sample)
+
+def format_bytes(value):
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+def format_sample(sample):
+    return (f"CPU {sample['cpu_percent']:.0f}% ({sample['cpu']:.1f}s)  RSS {format_bytes(sample['rss'])}  "
+            f"IO r {format_bytes(sample['read_bytes'])} w {format_bytes(sample['write_bytes'])}  "
+            f"{sample['processes']} proc")
@@ -0,0 +1,57 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+
+import json
+import os
+import platform
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+class StartupProfiler:
+    # Records named phase timings relative to process start and writes them to path.
+    # Without a path the profiler accepts the same calls and records nothing.
+    def __init__(self, started=None, path=None, version=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.path = path
+        self.version = version
+        self.enabled = path is not None
+        self.written = False
+        self.phases = []
+
+    def record(self, name, start, end):
+        if self.enabled:
+            self.phases.append({"phase": name, "ms": round((end - start) * 1000, 3),
+                                "at_ms": round((end - self.started) * 1000, 3)})
+
+    def mark(self, name, since=None):
+        # Phase that ran from `since` (default: process start) until now
+        self.record(name, self.started if since is None else since, time.perf_counter())
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def write(self):
+        # Safe to call again later, e.g. when a lazily built tab adds a phase
+        if not self.enabled:
+            return
+        path = self.path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        profile = {
+            "version": self.version,
+            "recorded": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "phases": self.phases
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(profile, f, indent=2)
+        self.written = True
@@ -0,0 +1,232 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Remote execution. An agent (python UpKeep.py agent) runs scripts from its own
+# scripts folder on request; the controller (fan_out) sends one script to many
+# agents at once. The protocol is one JSON object per line over TCP: the
+# controller sends {"script", "timeout", "token"} and the agent answers with the
+# same start/output/exit/error events the CLI prints with --json, then closes.
+
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import os
+import time
+
+from .history import HISTORY_NAME, OutputCapture, RunHistory, file_hash, run_record
+from .runner import ScriptJob, kill_job, run_job
+
+DEFAULT_PORT = 47600
+# Output lines longer than this are split by the agent, so the controller's reader never overruns
+MAX_LINE = 64 * 1024
+STREAM_LIMIT = 4 * MAX_LINE
+# An agent's agent_token may be stored as this prefix plus the token's SHA-256, so
+# settings.json on agent-only machines doesn't hold the token itself
+TOKEN_HASH_PREFIX = "sha256:"
+
+def parse_host(host, default_port=DEFAULT_PORT):
+    # "pc-01", "pc-01:47601", "10.0.0.5", "[::1]:47601"
+    host = host.strip()
+    if host.startswith("["):
+        address, _, port = host[1:].partition("]")
+        return address, int(port.lstrip(":")) if port else default_port
+    if host.count(":") == 1:
+        address, port = host.split(":")
+        return address, int(port)
+    return host, default_port
+
+def read_hosts(path):
+    # One host per line; blank lines and # comments are skipped
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.split("#", 1)[0].strip() for line in f if line.split("#", 1)[0].strip()]
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def hash_token(token):
+    return TOKEN_HASH_PREFIX + hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def token_matches(expected, given):
+    given = str(given or "")
+    if expected.startswith(TOKEN_HASH_PREFIX):
+        given = hash_token(given)
+    return hmac.compare_digest(given.encode("utf-8"), expected.encode("utf-8"))
+
+def encode(record):
+    return (json.dumps(record) + "\n").encode("utf-8")
+
+class Agent:
+    def __init__(self, scripts_folder, interpreter, token=None, max_jobs=2, reports_folder=None):
+        self.scripts_folder = scripts_folder
+        self.interpreter = interpreter
+        self.token = token
+        self.slots = None
+        self.max_jobs = max_jobs
+        self.running = {}
+        self.history = RunHistory(os.path.join(reports_folder, HISTORY_NAME)) if reports_folder else None
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT, on_ready=None):
+        if not self.token and not is_loopback(host):
+            raise ValueError("an agent_token is required to listen on a non-loopback address")
+        self.slots = asyncio.Semaphore(self.max_jobs)
+        server = await asyncio.start_server(self.handle, host, port, limit=STREAM_LIMIT)
+        if on_ready:
+            on_ready(server)
+        async with server:
+            await server.serve_forever()
+
+    def resolve(self, script):
+        # Only bare names from the scripts folder; never a path chosen by the caller
+        if not isinstance(script, str) or not script or os.path.basename(script) != script or script.startswith("."):
+            return None
+        path = os.path.join(self.scripts_folder, script)
+        return path if os.path.isfile(path) else None
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                request = json.loads(await asyncio.wait_for(reader.readline(), 30))
+            except (asyncio.TimeoutError, ValueError, asyncio.LimitOverrunError):
+                return
+            if not isinstance(request, dict):
+                writer.write(encode({"event": "error", "message": "invalid request"}))
+                await writer.drain()
+                return
+            await self.run_request(request, reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def run_request(self, request, reader, writer):
+        if self.token and not token_matches(self.token, request.get("token")):
+            writer.write(encode({"event": "error", "message": "invalid token"}))
+            await writer.drain()
+            return
+        path = self.resolve(request.get("script"))
+        if path is None:
+            writer.write(encode({"event": "error", "message": f"{request.get('script')} not found"}))
+            await writer.drain()
+            return
+        timeout = request.get("timeout")
+        job = ScriptJob(path, timeout=float(timeout) if isinstance(timeout, (int, float)) and timeout > 0 else None)
+        if job.key in self.running:
+            writer.write(encode({"event": "error", "message": f"{job.name} is already running"}))
+            await writer.drain()
+            return
+        self.running[job.key] = job
+        try:
+            async with self.slots:
+                await self.run_script(job, reader, writer)
+        finally:
+            del self.running[job.key]
+
+    async def run_script(self, job, reader, writer):
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        capture = OutputCapture()
+        content_hash = file_hash(job.script_path)
+
+        def on_output(line, stream):
+            capture.feed(line, stream)
+            for start in range(0, len(line), MAX_LINE):
+                loop.call_soon_threadsafe(events.put_nowait, {"event": "output", "stream": stream,
+                                                              "line": line[start:start + MAX_LINE]})
+
+        def execute():
+            try:
+                run_job(job, self.interpreter, on_output)
+                if self.history:
+                    self.history.append(run_record(job, capture, content_hash))
+            finally:
+                loop.call_soon_threadsafe(events.put_nowait, None)
+
+        async def watch_disconnect():
+            # The controller hangs up when its per-host timeout expires; stop the script too
+            await reader.read()
+            job.cancelled = True
+            kill_job(job)
+
+        writer.write(encode({"event": "start", "script": job.name}))
+        watcher = asyncio.ensure_future(watch_disconnect())
+        worker = loop.run_in_executor(None, execute)
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                writer.write(encode(event))
+                await writer.drain()
+            try:
+                await worker
+            except OSError as e:
+                writer.write(encode({"event": "error", "message": str(e)}))
+            else:
+                writer.write(encode({"event": "exit", "code": job.returncode, "timed_out": job.timed_out,
+                                     "duration": (job.finished or time.time()) - (job.started or time.time())}))
+            await writer.drain()
+        finally:
+            watcher.cancel()
+            if not worker.done():
+                job.cancelled = True
+                kill_job(job)
+
+async def run_remote(host, script, timeout=None, token=None, on_event=None):
+    # Runs script on one agent and returns its exit event (or an error event)
+    address, port = parse_host(host)
+    reader, writer = await asyncio.open_connection(address, port, limit=STREAM_LIMIT)
+    try:
+        writer.write(encode({"script": script, "timeout": timeout, "token": token}))
+        await writer.drain()
+        result = {"event": "error", "message": "agent closed the connection"}
+        while True:
+            line = await reader.readline()
+            if not line:
+                return result
+            event = json.loads(line)
+            if on_event:
+                on_event(host, event)
+            if event["event"] in ("exit", "error"):
+                result = event
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+async def fan_out(hosts, script, concurrency=16, timeout=None, host_timeout=None, token=None, on_event=None):
+    # Runs script on every host, at most concurrency at a time. host_timeout bounds the
+    # whole exchange with one host (connect included); timeout is passed to the agent as
+    # the script timeout. Returns {host: exit or error event} in the order of hosts.
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(host):
+        async with slots:
+            try:
+                return await asyncio.wait_for(run_remote(host, script, timeout, token, on_event), host_timeout)
+            except asyncio.TimeoutError:
+                event = {"event": "error", "message": f"no result within {host_timeout}s"}
+            except (OSError, ValueError) as e:
+                event = {"event": "error", "message": str(e) or type(e).__name__}
+            if on_event:
+                on_event(host, event)
+            return event
+
+    results = await asyncio.gather(*(one(host) for host in hosts))
+    return dict(zip(hosts, results))
+
+def host_failed(result):
+    return result["event"] == "error" or result.get("code") != 0
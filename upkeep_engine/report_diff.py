@@ -0,0 +1,150 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Section-level comparison of two diagnostic reports. Each report is streamed
+# once to hash its [Section]s; only sections whose hashes differ are read again
+# and diffed line by line.
+
+import gzip
+import hashlib
+import re
+from collections import Counter
+
+from .reports import SECTION_HEADER
+
+WHOLE_REPORT = "Whole report"
+
+# Normalisers rewrite a whole section's text at once and keep its line count,
+# so normalised and original lines stay aligned.
+
+# Lines that change on every run without meaning anything changed
+VOLATILE_LINES = re.compile(
+    r"^[ \t]*(?:System Boot Time|Available Physical Memory|Virtual Memory: Available|Virtual Memory: In Use"
+    r"|Lease Obtained|Lease Expires|Generated on)[ .]*:.*$", re.IGNORECASE | re.MULTILINE)
+# tasklist: compare image names; PIDs and memory usage churn on every run
+TASKLIST_COLUMNS = re.compile(r"[ \t]+\d+[ \t]+\S+[ \t]+\d+[ \t]+[\d,. ]+K[ \t]*$", re.MULTILINE)
+SPACES = re.compile(r"[ \t]+")
+EDGE_SPACES = re.compile(r"^ | $", re.MULTILINE)
+
+def normalize_default(text):
+    return VOLATILE_LINES.sub("", text)
+
+def normalize_processes(text):
+    return TASKLIST_COLUMNS.sub("", text)
+
+def normalize_connections(text):
+    # netstat -ano: drop the PID column so a restarted service isn't a new port
+    return "\n".join(line.rsplit(None, 1)[0] if line.lstrip()[:3] in ("TCP", "UDP") else line
+                     for line in text.split("\n"))
+
+SECTION_NORMALIZERS = {
+    "Running Processes": normalize_processes,
+    "Active Network Connections": normalize_connections
+}
+
+def section_keys(name, text):
+    # One comparison key per line of text ("" for lines that don't count)
+    normalized = SECTION_NORMALIZERS.get(name, normalize_default)(text)
+    return EDGE_SPACES.sub("", SPACES.sub(" ", normalized)).split("\n")
+
+def open_report(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+def section_digests(path):
+    # {section: (digest, offset, length)} of the raw section bytes, streamed in one pass.
+    # The preamble before the first [Section] holds the generation time, so it is left out.
+    sections = {}
+    current = None
+    digest = None
+    start = offset = 0
+    with open_report(path) as f:
+        for raw in f:
+            match = SECTION_HEADER.match(raw.rstrip(b"\n")) if raw[:1] == b"[" else None
+            if match:
+                if current is not None:
+                    sections[current] = (digest.hexdigest(), start, offset - start)
+                current = match.group(1).decode("utf-8", "replace")
+                digest = hashlib.blake2b(digest_size=16)
+                start = offset
+            elif current is not None:
+                digest.update(raw)
+            offset += len(raw)
+    if current is not None:
+        sections[current] = (digest.hexdigest(), start, offset - start)
+    return sections
+
+def read_section(path, offset, length):
+    with open_report(path) as f:
+        f.seek(offset)
+        text = f.read(length).decode("utf-8", "replace").replace("\r\n", "\n")
+    return text.split("\n", 1)[1] if "\n" in text else ""  # drop the [Section] header
+
+def read_report(path):
+    with open_report(path) as f:
+        return f.read().decode("utf-8", "replace").replace("\r\n", "\n")
+
+def diff_lines(name, old_text, new_text):
+    # Order-preserving multiset difference on normalised lines: linear time, which
+    # matters for netstat/tasklist sections with thousands of reordered rows
+    old_lines = old_text.split("\n")
+    new_lines = new_text.split("\n")
+    old_keys = section_keys(name, old_text)
+    new_keys = section_keys(name, new_text)
+    old_counts = Counter(k for k in old_keys if k)
+    new_counts = Counter(k for k in new_keys if k)
+    added = []
+    for k, line in zip(new_keys, new_lines):
+        if k and old_counts[k] > 0:
+            old_counts[k] -= 1
+        elif k:
+            added.append(line)
+    removed = []
+    for k, line in zip(old_keys, old_lines):
+        if k and new_counts[k] > 0:
+            new_counts[k] -= 1
+        elif k:
+            removed.append(line)
+    return added, removed
+
+def diff_reports(old_path, new_path):
+    old_sections = section_digests(old_path)
+    new_sections = section_digests(new_path)
+    if not old_sections or not new_sections:
+        # Not in the [Section] layout (or from another tool); compare the files as a whole
+        added, removed = diff_lines(WHOLE_REPORT, read_report(old_path), read_report(new_path))
+        return [{"section": WHOLE_REPORT, "status": "changed" if added or removed else "unchanged",
+                 "added": added, "removed": removed}]
+    results = []
+    for name in list(new_sections) + [n for n in old_sections if n not in new_sections]:
+        old = old_sections.get(name)
+        new = new_sections.get(name)
+        result = {"section": name, "added": [], "removed": []}
+        if old is None:
+            result["status"] = "added"
+        elif new is None:
+            result["status"] = "removed"
+        elif old[0] == new[0]:
+            result["status"] = "unchanged"
+        else:
+            added, removed = diff_lines(
+                name, read_section(old_path, old[1], old[2]), read_section(new_path, new[1], new[2]))
+            # Sections that only differ in volatile values (PIDs, uptime) count as unchanged
+            result["status"] = "changed" if added or removed else "unchanged"
+            result["added"], result["removed"] = added, removed
+        results.append(result)
+    return results
+
+def format_diff(results):
+    for result in results:
+        status = result["status"]
+        if status == "changed":
+            yield f"[{result['section']}] changed: +{len(result['added'])} -{len(result['removed'])}"
+            for line in result["added"]:
+                yield f"+ {line.strip()}"
+            for line in result["removed"]:
+                yield f"- {line.strip()}"
+        else:
+            yield f"[{result['section']}] {status}"
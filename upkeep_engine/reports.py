@@ -0,0 +1,268 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Index of the diagnostic reports folder. The manifest lives in reports/archive/
+# next to the gzip archives, so writing it never changes the reports folder's
+# mtime, which is what tells us a report was added or removed by someone else.
+
+import bisect
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from datetime import datetime
+
+REPORT_PREFIX = "Diagnostic_Report_"
+REPORT_SUFFIX = ".txt"
+ARCHIVE_FOLDER = "archive"
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+
+# diagnostic.bat writes headers with "echo [Section] >> file", which leaves a space before the CRLF
+SECTION_HEADER = re.compile(rb"^\[(.+?)\]\s*$")
+NAME_TIMESTAMP = re.compile(r"(\d{8})_(\d{6})")
+
+def is_report(name):
+    return name.startswith(REPORT_PREFIX) and name.endswith(REPORT_SUFFIX)
+
+def scan_sections(path):
+    # {section: [offset, length]} for every [Section] header line in the report
+    sections = {}
+    current = None
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            match = SECTION_HEADER.match(line.rstrip(b"\n"))
+            if match:
+                if current is not None:
+                    sections[current][1] = offset - sections[current][0]
+                current = match.group(1).decode("utf-8", "replace")
+                sections[current] = [offset, 0]
+            offset += len(line)
+    if current is not None:
+        sections[current][1] = offset - sections[current][0]
+    return sections
+
+def report_timestamp(name, stat):
+    match = NAME_TIMESTAMP.search(name)
+    if match:
+        try:
+            return datetime.strptime("".join(match.groups()), "%Y%m%d%H%M%S").timestamp()
+        except ValueError:
+            pass
+    # diagnostic.bat names depend on the locale's date format, so fall back to the file time
+    return stat.st_mtime
+
+class ReportStore:
+    def __init__(self, reports_folder, keep_count=None, keep_days=None):
+        self.reports_folder = reports_folder
+        self.archive_folder = os.path.join(reports_folder, ARCHIVE_FOLDER)
+        self.index_file = os.path.join(self.archive_folder, INDEX_NAME)
+        self.keep_count = keep_count
+        self.keep_days = keep_days
+        self.entries = []
+        self.timestamps = []
+        self.folder_mtime = None
+        self.loaded = False
+        # The GUI adds reports from a worker thread while the UI thread looks them up
+        self.lock = threading.RLock()
+
+    def load(self):
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") != INDEX_VERSION:
+                raise ValueError("unknown index version")
+            self.entries = index["reports"]
+            self.folder_mtime = index.get("folder_mtime")
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            self.rebuild()
+            return
+        self.timestamps = [e["timestamp"] for e in self.entries]
+        self.loaded = True
+        self.refresh()
+
+    def rebuild(self):
+        # Recreate the index from whatever is on disk, archives included
+        with self.lock:
+            self.entries = []
+            self.timestamps = []
+            self.folder_mtime = None
+            if os.path.isdir(self.archive_folder):
+                for entry in os.scandir(self.archive_folder):
+                    if entry.name.endswith(REPORT_SUFFIX + ".gz") and entry.name.startswith(REPORT_PREFIX):
+                        name = entry.name[:-3]
+                        self.insert({"name": name, "timestamp": report_timestamp(name, entry.stat()),
+                                     "size": entry.stat().st_size, "sections": {},
+                                     "archive": os.path.join(ARCHIVE_FOLDER, entry.name)})
+            self.loaded = True
+            self.refresh(force=True)
+
+    def refresh(self, force=False):
+        # One stat when nothing changed; otherwise only new reports are opened and scanned
+        if not os.path.isdir(self.reports_folder):
+            return
+        os.makedirs(self.archive_folder, exist_ok=True)
+        mtime = os.stat(self.reports_folder).st_mtime_ns
+        if not force and mtime == self.folder_mtime:
+            return
+        on_disk = {e.name: e for e in os.scandir(self.reports_folder) if e.is_file() and is_report(e.name)}
+        known = set()
+        kept = []
+        for entry in self.entries:
+            if entry.get("archive") or entry["name"] in on_disk:
+                kept.append(entry)
+                known.add(entry["name"])
+        self.entries = kept
+        self.timestamps = [e["timestamp"] for e in self.entries]
+        for name, dir_entry in on_disk.items():
+            if name not in known:
+                self.insert(self.describe(dir_entry.path, dir_entry.stat()))
+        self.folder_mtime = mtime
+        self.save()
+
+    def describe(self, path, stat, sections=None):
+        name = os.path.basename(path)
+        if sections is None:
+            sections = self.sidecar_sections(path)
+        if sections is None:
+            try:
+                sections = scan_sections(path)
+            except OSError:
+                sections = {}
+        return {"name": name, "timestamp": report_timestamp(name, stat), "size": stat.st_size,
+                "sections": sections, "archive": None}
+
+    def sidecar_sections(self, path):
+        try:
+            with open(os.path.splitext(path)[0] + ".json", "r", encoding="utf-8") as f:
+                summary = json.load(f)
+            return {s["section"]: [s["offset"], s["length"]] for s in summary["sections"]}
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def insert(self, entry):
+        position = bisect.bisect_right(self.timestamps, entry["timestamp"])
+        self.entries.insert(position, entry)
+        self.timestamps.insert(position, entry["timestamp"])
+
+    def add(self, path, summary=None):
+        # Register a report we just wrote, reusing the section offsets from its summary
+        with self.lock:
+            self.ensure_loaded()
+            sections = None
+            if summary is not None:
+                sections = {s["section"]: [s["offset"], s["length"]] for s in summary["sections"]}
+            self.entries = [e for e in self.entries if e["name"] != os.path.basename(path)]
+            self.timestamps = [e["timestamp"] for e in self.entries]
+            self.insert(self.describe(path, os.stat(path), sections))
+            self.folder_mtime = os.stat(self.reports_folder).st_mtime_ns
+            self.save()
+
+    def ensure_loaded(self):
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            else:
+                self.refresh()
+
+    def latest(self):
+        with self.lock:
+            self.ensure_loaded()
+            for entry in reversed(self.entries):
+                if not entry.get("archive"):
+                    return entry
+            return None
+
+    def recent(self, count):
+        # The newest count reports that are still uncompressed, oldest first
+        with self.lock:
+            self.ensure_loaded()
+            live = []
+            for entry in reversed(self.entries):
+                if not entry.get("archive"):
+                    live.append(entry)
+                    if len(live) == count:
+                        break
+            return live[::-1]
+
+    def latest_path(self):
+        entry = self.latest()
+        return self.path(entry) if entry else None
+
+    def between(self, start=None, end=None):
+        # Reports with start <= timestamp <= end (epoch seconds), oldest first
+        with self.lock:
+            self.ensure_loaded()
+            lo = 0 if start is None else bisect.bisect_left(self.timestamps, start)
+            hi = len(self.entries) if end is None else bisect.bisect_right(self.timestamps, end)
+            return self.entries[lo:hi]
+
+    def path(self, entry):
+        if entry.get("archive"):
+            return os.path.join(self.reports_folder, entry["archive"])
+        return os.path.join(self.reports_folder, entry["name"])
+
+    def apply_retention(self, keep_count=None, keep_days=None, now=None):
+        # Compress every live report outside the policy into reports/archive/*.txt.gz
+        with self.lock:
+            self.ensure_loaded()
+            keep_count = self.keep_count if keep_count is None else keep_count
+            keep_days = self.keep_days if keep_days is None else keep_days
+            live = [e for e in self.entries if not e.get("archive")]
+            expired = set()
+            if keep_count is not None and len(live) > keep_count:
+                expired.update(e["name"] for e in live[:len(live) - keep_count])
+            if keep_days is not None:
+                cutoff = (now or time.time()) - keep_days * 86400
+                expired.update(e["name"] for e in live if e["timestamp"] < cutoff)
+            archived = []
+            for entry in live:
+                if entry["name"] in expired and self.archive(entry):
+                    archived.append(entry["name"])
+            if archived:
+                self.folder_mtime = os.stat(self.reports_folder).st_mtime_ns
+                self.save()
+            return archived
+
+    def archive(self, entry):
+        source = os.path.join(self.reports_folder, entry["name"])
+        target = os.path.join(ARCHIVE_FOLDER, entry["name"] + ".gz")
+        target_path = os.path.join(self.reports_folder, target)
+        os.makedirs(self.archive_folder, exist_ok=True)
+        try:
+            with open(source, "rb") as src, gzip.open(target_path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        except OSError:
+            if os.path.exists(target_path):
+                os.remove(target_path)
+            return False
+        try:
+            os.remove(source)
+        except OSError:
+            # Still open somewhere (e.g. in Notepad); keep the live copy and try again next time
+            os.remove(target_path)
+            return False
+        sidecar = os.path.splitext(source)[0] + ".json"
+        if os.path.exists(sidecar):
+            try:
+                os.replace(sidecar, os.path.join(self.archive_folder, os.path.basename(sidecar)))
+            except OSError:
+                pass
+        entry["archive"] = target
+        return True
+
+    def save(self):
+        os.makedirs(self.archive_folder, exist_ok=True)
+        index = {"version": INDEX_VERSION, "folder_mtime": self.folder_mtime, "reports": self.entries}
+        temp_file = self.index_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(temp_file, self.index_file)
+
+def latest_report(reports_folder):
+    return ReportStore(reports_folder).latest_path()
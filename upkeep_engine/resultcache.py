@@ -0,0 +1,76 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# In-memory results of read-only scripts (network info, task list, ...), keyed
+# by script path and a hash of the script's content, so editing a script can
+# never replay output from the old version. Entries expire after the script's
+# TTL, and the least recently used entries go first once the cache is full.
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+class ResultCache:
+    def __init__(self, max_entries=32, max_bytes=8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(script_path, content_hash):
+        return os.path.normcase(os.path.abspath(script_path)), content_hash
+
+    def get(self, script_path, content_hash, ttl, now=None):
+        # Returns the entry ({"output", "exit_code", "created"}) if it is younger than ttl seconds
+        key = self.key(script_path, content_hash)
+        now = time.time() if now is None else now
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if now - entry["created"] > ttl:
+                self.drop(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def put(self, script_path, content_hash, output, exit_code, now=None):
+        # output is a list of (text, stream); results too big for the whole cache are not kept
+        size = sum(len(text) for text, _ in output)
+        if size > self.max_bytes:
+            return False
+        key = self.key(script_path, content_hash)
+        with self.lock:
+            if key in self.entries:
+                self.drop(key)
+            self.entries[key] = {"output": output, "exit_code": exit_code, "size": size,
+                                 "created": time.time() if now is None else now}
+            self.size += size
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                self.drop(next(iter(self.entries)))
+        return True
+
+    def put_run(self, job, content_hash, output):
+        # Keeps a finished ScriptJob's output; only clean runs are worth replaying, never one
+        # that failed, timed out or was cancelled halfway
+        if job.returncode != 0 or job.timed_out or job.cancelled or job.error is not None:
+            return False
+        return self.put(job.script_path, content_hash, output, job.returncode)
+
+    def invalidate(self, script_path):
+        # Forgets every cached version of a script, e.g. after it was saved
+        path = self.key(script_path, None)[0]
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == path]:
+                self.drop(key)
+
+    def drop(self, key):
+        # Called with the lock held
+        self.size -= self.entries.pop(key)["size"]
+
+    def __len__(self):
+        return len(self.entries)
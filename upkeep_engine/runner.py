@@ -0,0 +1,147 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+
+import itertools
+import os
+import signal
+import subprocess
+import threading
+import time
+
+class Interpreter:
+    # The command a script is handed to, e.g. ['cmd.exe', '/c'] or ['sh']. session is "cmd"
+    # or "sh" when the command is a shell that can also run scripts in a long-lived session;
+    # pool, when set, is the SessionPool (see interpreters) that run_job hands jobs to.
+    def __init__(self, command, creationflags=0):
+        self.command = list(command)
+        self.creationflags = creationflags
+        self.session = session_kind(self.command)
+        self.pool = None
+
+    def argv(self, script_path):
+        return self.command + [script_path]
+
+    def resolve(self, script_path):
+        # Same call as InterpreterRegistry.resolve, so either can be passed to run_job
+        return self
+
+def session_kind(command):
+    name = os.path.splitext(os.path.basename(command[0]))[0].lower() if command else ""
+    if name in ("sh", "bash", "dash", "ash", "ksh") and len(command) == 1:
+        return "sh"
+    if name == "cmd" and [arg.lower() for arg in command[1:]] == ["/c"]:
+        return "cmd"
+    return None
+
+def default_interpreter(command=None):
+    if command:
+        return Interpreter(command, getattr(subprocess, "CREATE_NO_WINDOW", 0))
+    if os.name == "nt":
+        return Interpreter(['cmd.exe', '/c'], subprocess.CREATE_NO_WINDOW)
+    return Interpreter(['sh'])
+
+def kill_process_tree(process):
+    # cmd.exe hands work to child processes, so killing only the shell leaves them running
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == "nt":
+            subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                           creationflags=subprocess.CREATE_NO_WINDOW)
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except (OSError, subprocess.SubprocessError):
+        process.kill()
+
+def kill_job(job):
+    # Kills the job's process if the job still owns it. A pooled shell session clears
+    # job.process under the same lock before it can run another script, so the kill
+    # can never reach whatever that session runs next.
+    with job.lock:
+        if job.process is not None:
+            kill_process_tree(job.process)
+
+# Distinguishes runs of the same script, e.g. to filter output by run
+run_ids = itertools.count(1)
+
+class ScriptJob:
+    # action, when set, is called with the job instead of running script_path through an interpreter
+    def __init__(self, script_path, timeout=None, action=None):
+        self.run_id = next(run_ids)
+        self.script_path = script_path
+        self.action = action
+        self.name = os.path.basename(script_path)
+        self.key = os.path.normcase(os.path.abspath(script_path))
+        self.timeout = timeout
+        # The process running the script; set and cleared under lock, see kill_job
+        self.process = None
+        self.lock = threading.Lock()
+        self.state = "pending"
+        self.started = None
+        self.finished = None
+        self.returncode = None
+        self.cancelled = False
+        self.timed_out = False
+        # Exception raised while running, if the job failed that way (state "failed")
+        self.error = None
+        # Latest resource reading while running, and the summary once finished (see procstat)
+        self.sample = None
+        self.resources = None
+        # Counters of a shared shell session when the run started (see ShellSession.run)
+        self.baseline = None
+        self.done = threading.Event()
+
+def pump_stream(stream, name, on_output):
+    try:
+        for line in iter(stream.readline, ''):
+            on_output(line, name)
+    finally:
+        stream.close()
+
+def run_job(job, interpreter, on_output):
+    # Runs job to completion on the calling thread. on_output(text, stream) is
+    # called from reader threads with stream set to "stdout" or "stderr".
+    # interpreter is an Interpreter or an InterpreterRegistry.
+    if job.cancelled:
+        return None
+    interpreter = interpreter.resolve(job.script_path)
+    if interpreter.pool is not None:
+        return interpreter.pool.run_job(job, on_output)
+    return spawn_job(job, interpreter, on_output)
+
+def spawn_job(job, interpreter, on_output):
+    # Runs job in a new process of its own
+    job.started = job.started or time.time()
+    process = subprocess.Popen(
+        interpreter.argv(job.script_path),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+        creationflags=interpreter.creationflags,
+        start_new_session=os.name != "nt"
+    )
+    with job.lock:
+        job.process = process
+        if job.cancelled:
+            kill_process_tree(process)
+    # Drain both pipes at once so a script filling stderr can't block on a full pipe
+    readers = [
+        threading.Thread(target=pump_stream, args=(process.stdout, "stdout", on_output), daemon=True),
+        threading.Thread(target=pump_stream, args=(process.stderr, "stderr", on_output), daemon=True)
+    ]
+    for reader in readers:
+        reader.start()
+    try:
+        process.wait(timeout=job.timeout)
+    except subprocess.TimeoutExpired:
+        job.timed_out = True
+        kill_process_tree(process)
+        process.wait()
+    for reader in readers:
+        reader.join()
+    job.finished = time.time()
+    job.returncode = process.returncode
+    return job.returncode
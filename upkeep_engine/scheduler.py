@@ -0,0 +1,95 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+
+import threading
+import time
+from collections import deque
+
+from .runner import ScriptJob, kill_job
+
+class ScriptScheduler:
+    # Fixed pool of workers pulling from a FIFO of jobs. run_job(job) is called on a worker thread.
+    def __init__(self, run_job, workers=2, on_change=None):
+        self.run_job = run_job
+        self.on_change = on_change
+        self.pending = deque()
+        self.running = {}
+        self.condition = threading.Condition()
+        self.workers = [threading.Thread(target=self.worker_loop, daemon=True) for _ in range(max(1, workers))]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, script_path, timeout=None, action=None):
+        job = ScriptJob(script_path, timeout, action)
+        with self.condition:
+            # The same script never runs (or waits) twice at once
+            if self.busy(job.key):
+                return None
+            self.pending.append(job)
+            self.condition.notify()
+        self.changed()
+        return job
+
+    def claim(self, script_path, timeout=None):
+        # For a caller that runs a script on a thread of its own (pipeline steps): marks the
+        # script as running, so nothing else starts it meanwhile. None if it is already running
+        # or queued; otherwise pass the job to finish() once it is done.
+        job = ScriptJob(script_path, timeout)
+        with self.condition:
+            if self.busy(job.key):
+                return None
+            job.state = "running"
+            job.started = time.time()
+            self.running[job.key] = job
+        self.changed()
+        return job
+
+    def busy(self, key):
+        # Called with the lock held
+        return key in self.running or any(p.key == key for p in self.pending)
+
+    def cancel(self, job):
+        with self.condition:
+            job.cancelled = True
+            if job in self.pending:
+                self.pending.remove(job)
+                job.state = "cancelled"
+                job.done.set()
+        kill_job(job)
+        self.changed()
+
+    def jobs(self):
+        with self.condition:
+            return list(self.running.values()), list(self.pending)
+
+    def worker_loop(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                job = self.pending.popleft()
+                job.state = "running"
+                job.started = time.time()
+                self.running[job.key] = job
+            self.changed()
+            try:
+                self.run_job(job)
+            except Exception as e:
+                # A broken job must not take its worker down with it; the job is failed instead
+                job.error = e
+            self.finish(job)
+
+    def finish(self, job):
+        with self.condition:
+            self.running.pop(job.key, None)
+            if job.error is not None:
+                job.state = "failed"
+            else:
+                job.state = "cancelled" if job.cancelled else "done"
+        job.done.set()
+        self.changed()
+
+    def changed(self):
+        if self.on_change:
+            self.on_change()
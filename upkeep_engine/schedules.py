@@ -0,0 +1,226 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Recurring maintenance runs, configured under "schedules" in settings.json:
+#     {"script": "flushdns.bat", "every": "1h", "jitter": "5m"}
+#     {"script": "cleantemp.bat", "cron": "0 3 * * *"}
+# Due times sit in a heap and one thread sleeps until the earliest of them.
+# Runs missed while the machine was off or asleep collapse into a single run.
+
+import heapq
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+STATE_NAME = "schedule_state.json"
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+CRON_ALIASES = {"@hourly": "0 * * * *", "@daily": "0 0 * * *", "@weekly": "0 0 * * 0", "@monthly": "0 0 1 * *"}
+
+def parse_duration(value):
+    # 90, "90s", "15m", "1h", "1d" -> seconds
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().lower()
+    if text and text[-1] in UNITS:
+        return float(text[:-1]) * UNITS[text[-1]]
+    return float(text)
+
+def parse_cron_field(field, low, high):
+    values = set()
+    for part in field.split(","):
+        part, _, step = part.partition("/")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(v) for v in part.split("-"))
+        else:
+            start = end = int(part)
+            if step:
+                end = high
+        if start < low or end > high or start > end:
+            raise ValueError(f"{field!r} is outside {low}-{high}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return values
+
+class CronSpec:
+    # minute hour day-of-month month day-of-week (0 or 7 = Sunday), as in crontab
+    def __init__(self, expression):
+        self.expression = expression
+        fields = CRON_ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"cron spec needs 5 fields: {expression!r}")
+        self.minutes = parse_cron_field(fields[0], 0, 59)
+        self.hours = parse_cron_field(fields[1], 0, 23)
+        self.days = parse_cron_field(fields[2], 1, 31)
+        self.months = parse_cron_field(fields[3], 1, 12)
+        self.weekdays = {d % 7 for d in parse_cron_field(fields[4], 0, 7)}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def day_matches(self, moment):
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday  # crontab: either field may match when both are restricted
+
+    def next_after(self, timestamp):
+        moment = datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        # Skip whole months, days and hours that can't match instead of testing every minute
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self.day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f"cron spec never matches: {self.expression!r}")
+
+class Schedule:
+    def __init__(self, script, every=None, cron=None, jitter=0, enabled=True):
+        if (every is None) == (cron is None):
+            raise ValueError(f"{script}: give exactly one of 'every' and 'cron'")
+        if not isinstance(script, str) or not script:
+            raise ValueError(f"'script' must be a file name, not {script!r}")
+        if cron is not None and not isinstance(cron, str):
+            raise ValueError(f"{script}: 'cron' must be a string like \"0 3 * * *\"")
+        self.script = script
+        self.every = parse_duration(every) if every is not None else None
+        if self.every is not None and self.every <= 0:
+            raise ValueError(f"{script}: 'every' must be positive")
+        self.cron = CronSpec(cron) if cron is not None else None
+        self.jitter = parse_duration(jitter or 0)
+        self.enabled = enabled
+        self.key = f"{script}|{every if cron is None else cron}"
+
+    def describe(self):
+        return f"every {self.every:g}s" if self.every is not None else f"cron {self.cron.expression}"
+
+    def next_after(self, timestamp):
+        if self.every is not None:
+            return timestamp + self.every
+        return self.cron.next_after(timestamp)
+
+def load_schedules(definitions, on_error=None):
+    # A broken entry raises ValueError; with on_error it is reported as on_error(message) and
+    # skipped, so one typo doesn't turn off every other schedule
+    schedules = []
+    for definition in definitions or []:
+        try:
+            schedule = Schedule(definition["script"], definition.get("every"), definition.get("cron"),
+                                definition.get("jitter", 0), definition.get("enabled", True))
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            reason = f"missing {e}" if isinstance(e, KeyError) else str(e) if isinstance(e, ValueError) else repr(e)
+            message = f"{json.dumps(definition, default=repr)}: {reason}"
+            if on_error is None:
+                raise ValueError(message) from e
+            on_error(message)
+            continue
+        if schedule.enabled:
+            schedules.append(schedule)
+    return schedules
+
+class MaintenanceScheduler:
+    # dispatch(schedule) is called on the timer thread when a schedule is due; it should
+    # only hand the script to the runner. max_sleep bounds each wait so due times are
+    # rechecked against the wall clock after a suspend or a clock change.
+    max_sleep = 60
+
+    def __init__(self, schedules, dispatch, state_folder, clock=time.time, rand=random.random):
+        self.dispatch = dispatch
+        self.state_path = os.path.join(state_folder, STATE_NAME)
+        self.clock = clock
+        self.rand = rand
+        self.condition = threading.Condition()
+        self.heap = []
+        self.stopped = False
+        self.thread = None
+        self.state = self.load_state()
+        self.reload(schedules)
+
+    def load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            return state if isinstance(state, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save_state(self):
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=4)
+        os.replace(temp_path, self.state_path)
+
+    def first_due(self, schedule, now):
+        last_run = self.state.get(schedule.key, {}).get("last_run")
+        if last_run is None:
+            due = schedule.next_after(now)
+        else:
+            # However many runs were missed, at most one happens now
+            due = max(schedule.next_after(last_run), now)
+        return due + self.rand() * schedule.jitter
+
+    def reload(self, schedules):
+        with self.condition:
+            now = self.clock()
+            self.schedules = list(schedules)
+            # The index breaks ties between equal due times, so Schedule objects are never compared
+            self.heap = [(self.first_due(s, now), index, s) for index, s in enumerate(self.schedules)]
+            heapq.heapify(self.heap)
+            self.condition.notify()
+
+    def upcoming(self):
+        with self.condition:
+            return [(due, schedule) for due, _, schedule in sorted(self.heap)]
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.loop, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+
+    def loop(self):
+        while True:
+            with self.condition:
+                due = self.due_now()
+                while not due and not self.stopped:
+                    delay = self.heap[0][0] - self.clock() if self.heap else self.max_sleep
+                    self.condition.wait(max(min(delay, self.max_sleep), 0))
+                    due = self.due_now()
+                if self.stopped:
+                    return
+            for schedule in due:
+                try:
+                    self.dispatch(schedule)
+                except Exception:
+                    pass  # A failing dispatch must not stop the other schedules
+            try:
+                self.save_state()
+            except OSError:
+                pass
+
+    def due_now(self):
+        # Pops every due entry and queues its next run; called with the lock held
+        now = self.clock()
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            _, index, schedule = heapq.heappop(self.heap)
+            due.append(schedule)
+            self.state[schedule.key] = {"last_run": now}
+            next_due = schedule.next_after(now) + self.rand() * schedule.jitter
+            heapq.heappush(self.heap, (next_due, index, schedule))
+        return due
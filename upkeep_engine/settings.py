@@ -0,0 +1,167 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# settings.json handling. Writes go to a temp file that is fsynced and then
+# swapped in, so a crash can never leave a truncated file behind. SettingsStore
+# coalesces bursts of changes into one background write.
+
+import copy
+import json
+import os
+import threading
+
+SCHEMA_VERSION = 2
+
+DEFAULT_SETTINGS = {
+    'schema_version': SCHEMA_VERSION,
+    'theme': 'dark',
+    'extra_buttons': False,
+    'extra_button_configs': [{'name': f"Extra {i}", 'script': None, 'pipeline': None} for i in range(1, 11)],
+    'output_line_cap': 5000,
+    # Lines kept for searching the output pane; older lines are dropped in blocks
+    'output_store_lines': 200000,
+    'max_workers': 2,
+    'script_timeouts': {},
+    # Read-only scripts whose output is replayed for this many seconds after a successful run
+    # (Shift+click a button to run it anyway); results are kept for the most recent cache_entries
+    'cached_scripts': {'netinfo.bat': 30, 'tasklist.bat': 10, 'appinfo.bat': 300},
+    'cache_entries': 32,
+    # Runs .bat/.cmd files; None picks cmd.exe /c on Windows and sh elsewhere
+    'interpreter': None,
+    # Commands for other script types by extension, e.g. {".ps1": "pwsh -File"}; null drops a type
+    'interpreters': {},
+    # Shells kept running per interpreter to run scripts without starting a new process
+    # (0 turns this off); each is replaced after session_max_runs scripts or a failed one
+    'shell_sessions': 2,
+    'session_max_runs': 50,
+    # None uses the built-in collectors in upkeep_engine.diagnostics
+    'diagnostic_collectors': None,
+    # Live reports beyond these limits are compressed into reports/archive (None disables a limit)
+    'report_retention': {'keep_count': 100, 'keep_days': 30},
+    # Files bigger than this open in the read-only viewer instead of the UpEditor
+    'editor_max_bytes': 1024 * 1024,
+    # Seconds between CPU/memory/IO samples of running scripts (0 turns sampling off)
+    'sample_interval': 1.0,
+    # Remote runs: agents that accept connections from other machines must set a shared agent_token.
+    # Stored as plain text; agents may store "sha256:..." from "agent --hash-token" instead
+    'agent_token': None,
+    'agent_port': 47600,
+    'remote_hosts': [],
+    'remote_concurrency': 16,
+    'remote_host_timeout': 300,
+    # Scripts with dependencies, run as one unit (see upkeep_engine.pipelines)
+    'pipelines': [],
+    # Recurring runs, e.g. {"script": "flushdns.bat", "every": "1h", "jitter": "5m"} or
+    # {"script": "cleantemp.bat", "cron": "0 3 * * *"} (see upkeep_engine.schedules)
+    'schedules': [],
+    # Clean Temp: roots None means the user's temp folder; files younger than min_age and names
+    # matching exclude are kept
+    'temp_cleaner': {'roots': None, 'min_age': "1d", 'include': ["*"], 'exclude': [], 'workers': 8,
+                     'remove_empty_dirs': True},
+    # Checked in the background at startup; None turns update checks off
+    'update_url': "https://raw.githubusercontent.com/x-s0/UpKeep/main/update.json"
+}
+
+def migrate_v1(settings):
+    # v1 (unversioned) stored extra buttons as {name: script}, with "None" for unassigned.
+    # v2 keeps them as an ordered list, so renaming a button no longer moves it to the end.
+    configs = settings.get('extra_button_configs')
+    if isinstance(configs, dict):
+        settings['extra_button_configs'] = [
+            {'name': name, 'script': None if script in (None, "None") else script}
+            for name, script in configs.items()
+        ]
+    return settings
+
+# MIGRATIONS[n] upgrades a schema n file to schema n + 1
+MIGRATIONS = {
+    1: migrate_v1
+}
+
+def migrate(settings):
+    version = settings.get('schema_version', 1)
+    while version < SCHEMA_VERSION:
+        settings = MIGRATIONS[version](settings)
+        version += 1
+    settings['schema_version'] = version
+    return settings
+
+def load_settings(settings_file, write_defaults=True):
+    # Missing settings fall back to the defaults, which are written back out. A file that
+    # can't be parsed is kept as settings.json.corrupt instead of being overwritten.
+    settings = copy.deepcopy(DEFAULT_SETTINGS)
+    try:
+        with open(settings_file, 'r') as f:
+            settings.update(migrate(json.load(f)))
+        return settings
+    except FileNotFoundError:
+        pass
+    except (json.JSONDecodeError, UnicodeDecodeError, AttributeError, TypeError):
+        if write_defaults:
+            try:
+                os.replace(settings_file, settings_file + ".corrupt")
+            except OSError:
+                pass
+    if write_defaults:
+        save_settings(settings_file, settings)
+    return settings
+
+def save_settings(settings_file, settings):
+    folder = os.path.dirname(settings_file)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    temp_file = settings_file + ".tmp"
+    with open(temp_file, 'w') as f:
+        json.dump(settings, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, settings_file)
+
+class SettingsStore:
+    # Holds the live settings dict. set()/update() return immediately; the file is written
+    # on a background thread once no change has arrived for `delay` seconds.
+    def __init__(self, settings_file, delay=0.5):
+        self.settings_file = settings_file
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.timer = None
+        self.dirty = False
+        self.data = load_settings(settings_file)
+
+    # Values are handed out as copies so callers can't mutate them under the writer thread
+
+    def __getitem__(self, key):
+        with self.lock:
+            return copy.deepcopy(self.data[key])
+
+    def get(self, key, default=None):
+        with self.lock:
+            return copy.deepcopy(self.data.get(key, default))
+
+    def set(self, key, value):
+        self.update({key: value})
+
+    def update(self, values):
+        with self.lock:
+            self.data.update(copy.deepcopy(values))
+            self.dirty = True
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = threading.Timer(self.delay, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self):
+        # Also called directly on exit so a pending change is never lost
+        with self.write_lock:
+            with self.lock:
+                if self.timer is not None:
+                    self.timer.cancel()
+                    self.timer = None
+                if not self.dirty:
+                    return
+                snapshot = json.dumps(self.data)
+                self.dirty = False
+            save_settings(self.settings_file, json.loads(snapshot))
@@ -0,0 +1,229 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Built-in temp cleaner. Folders are listed with os.scandir on a thread pool
+# (each folder is one task, and its subfolders become new tasks), so profiles
+# with hundreds of thousands of small files are walked in parallel instead of
+# one "del /s" at a time. scan() only measures what would go; delete() removes
+# it in batches on the same pool and skips files that are locked or in use.
+# Progress callbacks are rate limited, so the output pane isn't flooded.
+
+import fnmatch
+import os
+import queue
+import stat
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .procstat import format_bytes
+from .schedules import parse_duration
+
+BATCH_SIZE = 256
+
+def default_roots():
+    # The user's temp folder; on Windows also %TEMP% and %TMP% when they point elsewhere
+    roots = []
+    for path in (tempfile.gettempdir(), os.environ.get("TEMP"), os.environ.get("TMP")):
+        if path and os.path.isdir(path) and os.path.normcase(os.path.abspath(path)) not in \
+                [os.path.normcase(r) for r in roots]:
+            roots.append(os.path.abspath(path))
+    return roots
+
+class Throttle:
+    # Calls callback(progress) at most once per interval; force=True always gets through
+    def __init__(self, callback, interval=1.0, clock=time.monotonic):
+        self.callback = callback
+        self.interval = interval
+        self.clock = clock
+        self.last = None
+        self.sent = None
+
+    def __call__(self, progress, force=False):
+        if self.callback is None or progress == self.sent:
+            return
+        now = self.clock()
+        if force or self.last is None or now - self.last >= self.interval:
+            self.last = now
+            self.sent = dict(progress)
+            self.callback(dict(progress))
+
+def is_junction(entry):
+    # Directory junctions on Windows look like plain folders; following one could leave the temp folder
+    check = getattr(entry, "is_junction", None)
+    if check is not None:
+        return check()
+    try:
+        return bool(entry.stat(follow_symlinks=False).st_file_attributes & 0x400)  # FILE_ATTRIBUTE_REPARSE_POINT
+    except (AttributeError, OSError):
+        return False
+
+class TempCleaner:
+    # min_age: files changed or created more recently than this are kept ("1d", "12h", seconds).
+    # include/exclude: name patterns, case-insensitive; an excluded folder is skipped entirely.
+    def __init__(self, roots=None, min_age="1d", include=("*",), exclude=(), workers=8,
+                 remove_empty_dirs=True, clock=time.time):
+        self.roots = [os.path.abspath(r) for r in (roots or default_roots())]
+        self.min_age = parse_duration(min_age or 0)
+        self.include = [p.lower() for p in include or ("*",)]
+        self.exclude = [p.lower() for p in exclude or ()]
+        self.workers = max(1, int(workers))
+        self.remove_empty_dirs = remove_empty_dirs
+        self.clock = clock
+
+    def wanted(self, name):
+        return (any(fnmatch.fnmatchcase(name, p) for p in self.include)
+                and not any(fnmatch.fnmatchcase(name, p) for p in self.exclude))
+
+    def scan_folder(self, path, cutoff):
+        # One task: returns (files [(path, size)], subfolders [(path, mtime)], errors)
+        files, folders, errors = [], [], 0
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    name = entry.name.lower()
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not is_junction(entry) and not any(fnmatch.fnmatchcase(name, p) for p in self.exclude):
+                                folders.append((entry.path, entry.stat(follow_symlinks=False).st_mtime))
+                            continue
+                        if not self.wanted(name):
+                            continue
+                        info = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        errors += 1
+                        continue
+                    # st_ctime is the creation time on Windows, so freshly extracted old files stay too
+                    if max(info.st_mtime, info.st_ctime) <= cutoff:
+                        files.append((entry.path, info.st_size))
+        except OSError:
+            errors += 1
+        return files, folders, errors
+
+    def scan(self, on_progress=None, should_stop=None, interval=1.0):
+        # Dry run. Returns {"files": [(path, size)], "folders": [...], "directories": {top folder:
+        # {"files", "bytes"}}, "total_files", "total_bytes", "errors", "cutoff"}, where a top
+        # folder is a root or a folder directly inside one.
+        cutoff = self.clock() - self.min_age
+        plan = {"files": [], "folders": [], "directories": {}, "total_files": 0, "total_bytes": 0,
+                "errors": 0, "cutoff": cutoff, "stopped": False}
+        progress = {"phase": "scan", "folders": 0, "files": 0, "bytes": 0}
+        report = Throttle(on_progress, interval)
+        results = queue.Queue()
+        outstanding = 0
+
+        def submit(path, top):
+            future = pool.submit(self.scan_folder, path, cutoff)
+            future.add_done_callback(lambda f: results.put((path, top, f)))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for root in self.roots:
+                submit(root, root)
+                outstanding += 1
+            while outstanding:
+                path, top, future = results.get()
+                outstanding -= 1
+                files, folders, errors = future.result()
+                plan["errors"] += errors
+                if files:
+                    size = sum(s for _, s in files)
+                    totals = plan["directories"].setdefault(top, {"files": 0, "bytes": 0})
+                    totals["files"] += len(files)
+                    totals["bytes"] += size
+                    plan["files"].extend(files)
+                    plan["total_files"] += len(files)
+                    plan["total_bytes"] += size
+                progress.update(folders=progress["folders"] + 1, files=plan["total_files"], bytes=plan["total_bytes"])
+                report(progress)
+                if should_stop and should_stop():
+                    plan["stopped"] = True
+                    continue  # Drain what is already running, start nothing new
+                for folder, mtime in folders:
+                    plan["folders"].append((folder, mtime))
+                    submit(folder, folder if path in self.roots else top)
+                    outstanding += 1
+        report(progress, force=True)
+        return plan
+
+    def delete_batch(self, batch, cutoff):
+        deleted = freed = skipped = skipped_bytes = 0
+        for path, size in batch:
+            try:
+                info = os.lstat(path)
+                if max(info.st_mtime, info.st_ctime) > cutoff:
+                    continue  # Changed since the scan; it's in use again
+                try:
+                    os.remove(path)
+                except PermissionError:
+                    if os.name != "nt" or info.st_mode & stat.S_IWRITE:
+                        raise
+                    os.chmod(path, stat.S_IWRITE)  # Read-only file, which del /f removed as well
+                    os.remove(path)
+            except FileNotFoundError:
+                continue
+            except OSError:
+                # Locked by a running program, or not ours to delete
+                skipped += 1
+                skipped_bytes += size
+                continue
+            deleted += 1
+            freed += info.st_size
+        return deleted, freed, skipped, skipped_bytes
+
+    def delete(self, plan, on_progress=None, should_stop=None, interval=1.0):
+        # Deletes what scan() found. Returns {"deleted", "freed", "skipped", "skipped_bytes",
+        # "removed_folders", "stopped"}.
+        cutoff = plan["cutoff"]
+        result = {"deleted": 0, "freed": 0, "skipped": 0, "skipped_bytes": 0, "removed_folders": 0,
+                  "stopped": False}
+        progress = {"phase": "delete", "total": plan["total_files"], "done": 0, "freed": 0, "skipped": 0}
+        report = Throttle(on_progress, interval)
+        files = plan["files"]
+        results = queue.Queue()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            batches = [files[i:i + BATCH_SIZE] for i in range(0, len(files), BATCH_SIZE)]
+            for batch in batches:
+                future = pool.submit(self.delete_batch, batch, cutoff)
+                future.add_done_callback(lambda f, n=len(batch): results.put((n, f)))
+            for _ in batches:
+                count, future = results.get()
+                if future.cancelled():
+                    continue
+                deleted, freed, skipped, skipped_bytes = future.result()
+                result["deleted"] += deleted
+                result["freed"] += freed
+                result["skipped"] += skipped
+                result["skipped_bytes"] += skipped_bytes
+                progress.update(done=progress["done"] + count, freed=result["freed"], skipped=result["skipped"])
+                report(progress)
+                if should_stop and should_stop() and not result["stopped"]:
+                    result["stopped"] = True
+                    pool.shutdown(wait=False, cancel_futures=True)
+        if self.remove_empty_dirs and not result["stopped"]:
+            # Deepest first, so a folder emptied by removing its subfolders goes too. Only folders
+            # that were already old at scan time; rmdir refuses anything that isn't empty.
+            for folder, mtime in sorted(plan["folders"], key=lambda item: item[0].count(os.sep), reverse=True):
+                if mtime <= cutoff:
+                    try:
+                        os.rmdir(folder)
+                        result["removed_folders"] += 1
+                    except OSError:
+                        pass
+        report(progress, force=True)
+        return result
+
+def largest_directories(plan, count=20):
+    return sorted(plan["directories"].items(), key=lambda item: item[1]["bytes"], reverse=True)[:count]
+
+def format_progress(progress):
+    if progress["phase"] == "scan":
+        return (f"Scanned {progress['folders']} folders: {progress['files']} files, "
+                f"{format_bytes(progress['bytes'])} reclaimable")
+    return (f"Deleted {progress['done']} of {progress['total']} files, {format_bytes(progress['freed'])} freed"
+            + (f", {progress['skipped']} in use" if progress["skipped"] else ""))
+
+def format_result(result):
+    return (f"Freed {format_bytes(result['freed'])} ({result['deleted']} files, {result['removed_folders']} folders)"
+            + (f"; skipped {result['skipped']} files in use ({format_bytes(result['skipped_bytes'])})"
+               if result["skipped"] else ""))
@@ -0,0 +1,237 @@
+# UpKeep - Version 1.6
+# Copyright (c) 2025 x-so
+# Licensed under the MIT License (see LICENSE for details)
+#
+# Update checks and delta updates. update.json names the latest version and,
+# optionally, a manifest_url: a JSON list of files with their SHA-256 hashes.
+# Only files whose hash differs from the local copy are downloaded. Every
+# download is resumable and verified, everything is staged first, and files
+# are swapped in one by one with os.replace, version.json last.
+#
+# Manifest format (python UpKeep.py update --write-manifest writes one):
+#     {"version": "1.7.0", "base_url": "https://.../",
+#      "files": {"UpKeep.py": {"sha256": "...", "size": 1234}, ...}}
+
+import fnmatch
+import hashlib
+import http.client
+import json
+import os
+import shutil
+import urllib.error
+import urllib.parse
+import urllib.request
+
+DEFAULT_UPDATE_URL = "https://raw.githubusercontent.com/x-s0/UpKeep/main/update.json"
+STATE_NAME = "update_state.json"
+STAGING_FOLDER = "update_staging"
+# What a manifest covers. User data (settings, reports) never is.
+MANIFEST_PATTERNS = ("UpKeep.py", "upkeep_engine/*.py", "docs/*", "scripts/*.bat", "README.md", "LICENSE",
+                     "patch_notes.txt", "update.json", "version.json")
+# Existing scripts may have been edited by the user, so updates only add missing ones
+USER_EDITABLE = ("scripts/*",)
+CHUNK_SIZE = 64 * 1024
+
+class UpdateError(Exception):
+    pass
+
+def parse_version(version):
+    # "1.6.0" -> (1, 6, 0); anything after a non-digit in a part is ignored ("1.7.0-beta" -> (1, 7, 0))
+    parts = []
+    for part in str(version).strip().lstrip("vV").split("."):
+        digits = ""
+        for char in part:
+            if not char.isdigit():
+                break
+            digits += char
+        parts.append(int(digits or 0))
+    while len(parts) > 1 and parts[-1] == 0:
+        parts.pop()
+    return tuple(parts)
+
+def is_newer(remote, local):
+    return local is None or parse_version(remote) > parse_version(local)
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def safe_path(root, relative):
+    # Manifest paths are relative, forward-slashed and must stay inside root
+    if not relative or relative.startswith(("/", "\\")) or ":" in relative:
+        raise UpdateError(f"bad path in manifest: {relative!r}")
+    parts = relative.split("/")
+    if any(part in ("", ".", "..") for part in parts):
+        raise UpdateError(f"bad path in manifest: {relative!r}")
+    return os.path.join(root, *parts)
+
+def build_manifest(root, version, base_url=None, patterns=MANIFEST_PATTERNS):
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".") and d != "__pycache__"]
+        for name in filenames:
+            relative = os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, "/")
+            if any(fnmatch.fnmatch(relative, pattern) for pattern in patterns):
+                path = os.path.join(dirpath, name)
+                files[relative] = {"sha256": sha256_file(path), "size": os.path.getsize(path)}
+    manifest = {"version": version, "files": dict(sorted(files.items()))}
+    if base_url:
+        manifest["base_url"] = base_url
+    return manifest
+
+class Updater:
+    def __init__(self, root, state_folder, update_url=DEFAULT_UPDATE_URL, timeout=15):
+        self.root = root
+        self.update_url = update_url
+        self.timeout = timeout
+        self.state_path = os.path.join(state_folder, STATE_NAME)
+        self.staging_folder = os.path.join(state_folder, STAGING_FOLDER)
+        self.state = self.load_state()
+
+    def load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            return state if isinstance(state, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save_state(self):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=4)
+        os.replace(temp_path, self.state_path)
+
+    def local_version(self):
+        try:
+            with open(os.path.join(self.root, "version.json"), "r", encoding="utf-8") as f:
+                return json.load(f).get("version")
+        except (OSError, ValueError):
+            return None
+
+    def fetch_json(self, url):
+        # Conditional GET: an unchanged document costs a 304 and is served from the saved copy
+        cached = self.state.get(url, {})
+        request = urllib.request.Request(url, headers={"User-Agent": "UpKeep-updater"})
+        if cached.get("body") is not None:
+            if cached.get("etag"):
+                request.add_header("If-None-Match", cached["etag"])
+            if cached.get("last_modified"):
+                request.add_header("If-Modified-Since", cached["last_modified"])
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read().decode("utf-8")
+                self.state[url] = {"etag": response.headers.get("ETag"),
+                                   "last_modified": response.headers.get("Last-Modified"), "body": body}
+                self.save_state()
+        except urllib.error.HTTPError as e:
+            if e.code != 304 or cached.get("body") is None:
+                raise UpdateError(f"{url}: HTTP {e.code}") from e
+            body = cached["body"]
+        except (urllib.error.URLError, OSError) as e:
+            raise UpdateError(f"{url}: {getattr(e, 'reason', e)}") from e
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise UpdateError(f"{url}: not valid JSON") from e
+
+    def check(self):
+        # Returns the remote update.json with "current" and "available" added
+        info = self.fetch_json(self.update_url)
+        if not isinstance(info, dict) or "version" not in info:
+            raise UpdateError(f"{self.update_url}: no version field")
+        info["current"] = self.local_version()
+        info["available"] = is_newer(info["version"], info["current"])
+        return info
+
+    def manifest(self, info):
+        if not info.get("manifest_url"):
+            raise UpdateError("this release has no file manifest; download the full archive from "
+                              + str(info.get("download_url")))
+        manifest = self.fetch_json(urllib.parse.urljoin(self.update_url, info["manifest_url"]))
+        if not isinstance(manifest, dict) or not isinstance(manifest.get("files"), dict):
+            raise UpdateError("manifest has no file list")
+        return manifest
+
+    def plan(self, manifest):
+        # Manifest entries whose local copy is missing or different, as (relative path, entry)
+        changed = []
+        for relative, entry in manifest["files"].items():
+            path = safe_path(self.root, relative)
+            if os.path.exists(path):
+                if any(fnmatch.fnmatch(relative, pattern) for pattern in USER_EDITABLE):
+                    continue
+                if sha256_file(path) == entry["sha256"]:
+                    continue
+            changed.append((relative, entry))
+        return changed
+
+    def file_url(self, manifest, relative, entry):
+        if entry.get("url"):
+            return urllib.parse.urljoin(self.update_url, entry["url"])
+        base = urllib.parse.urljoin(self.update_url, manifest.get("base_url", "./"))
+        return urllib.parse.urljoin(base if base.endswith("/") else base + "/", urllib.parse.quote(relative))
+
+    def download(self, url, dest, sha256, size=None, on_progress=None):
+        # Resumes from dest + ".part" with a Range request; verifies the hash before keeping the file
+        part = dest + ".part"
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        have = os.path.getsize(part) if os.path.exists(part) else 0
+        if size is not None and have > size:
+            os.remove(part)
+            have = 0
+        if size is None or have < size:
+            request = urllib.request.Request(url, headers={"User-Agent": "UpKeep-updater"})
+            if have:
+                request.add_header("Range", f"bytes={have}-")
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    # A server that ignores Range answers 200 with the whole file
+                    mode = "ab" if have and response.status == 206 else "wb"
+                    if mode == "wb":
+                        have = 0
+                    with open(part, mode) as f:
+                        for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                            f.write(chunk)
+                            have += len(chunk)
+                            if on_progress:
+                                on_progress(have, size)
+            except urllib.error.HTTPError as e:
+                if e.code != 416:  # Range not satisfiable: the part file is already complete
+                    raise UpdateError(f"{url}: HTTP {e.code}") from e
+            except (urllib.error.URLError, OSError, http.client.HTTPException) as e:
+                # Keep the part file so the next attempt resumes where this one stopped
+                raise UpdateError(f"{url}: {getattr(e, 'reason', e) or type(e).__name__}") from e
+            if size is not None and have < size:
+                # The server closed the connection early; this is not a bad file, so keep what we got
+                raise UpdateError(f"{url}: connection closed after {have} of {size} bytes")
+        if sha256_file(part) != sha256:
+            os.remove(part)
+            raise UpdateError(f"{url}: hash mismatch, download discarded")
+        os.replace(part, dest)
+
+    def apply(self, info, on_status=None):
+        # Returns the list of updated paths. Nothing in the install is touched until every
+        # changed file has been downloaded and verified.
+        manifest = self.manifest(info)
+        changed = self.plan(manifest)
+        staging = os.path.join(self.staging_folder, str(manifest.get("version", info["version"])))
+        for index, (relative, entry) in enumerate(changed, 1):
+            if on_status:
+                on_status(f"Downloading {relative} ({index}/{len(changed)})")
+            staged = safe_path(staging, relative)
+            if os.path.exists(staged) and sha256_file(staged) == entry["sha256"]:
+                continue  # Already fetched by an earlier, interrupted update
+            self.download(self.file_url(manifest, relative, entry), staged, entry["sha256"], entry.get("size"))
+        # version.json goes last, so an interrupted swap is retried by the next check
+        changed.sort(key=lambda item: item[0] == "version.json")
+        for relative, _ in changed:
+            target = safe_path(self.root, relative)
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+            os.replace(safe_path(staging, relative), target)
+        shutil.rmtree(staging, ignore_errors=True)
+        return [relative for relative, _ in changed]